@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "supports_api.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -54,6 +55,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "supports_api.middleware.PerformanceMiddleware",
+    "supports_api.middleware.NPlusOneMiddleware",
 ]
 
 ROOT_URLCONF = "softdesk.urls"
@@ -105,6 +108,18 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Coût du hachage réglé par SOFTDESK_HASHING ; les anciens formats restent
+# vérifiables et sont réhachés à la connexion
+PASSWORD_HASHERS = [
+    "supports_api.hashing.ProfiledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+AUTHENTICATION_BACKENDS = ["supports_api.authentication.PooledModelBackend"]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -134,13 +149,19 @@ AUTH_USER_MODEL = "supports_api.User"
 # Configuration Django REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "supports_api.authentication.MeteredJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
-    "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "supports_api.instrumentation.InstrumentedJSONRenderer",
+    ),
     "DEFAULT_PARSER_CLASSES": ("rest_framework.parsers.JSONParser",),
+    "DEFAULT_THROTTLE_CLASSES": ("supports_api.throttling.EndpointThrottle",),
+    # Proxies de confiance devant l'application : l'IP des limitations par
+    # IP est lue dans X-Forwarded-For (0 : REMOTE_ADDR seul)
+    "NUM_PROXIES": int(os.environ.get("SOFTDESK_NUM_PROXIES", "0")),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
@@ -172,6 +193,9 @@ SPECTACULAR_SETTINGS = {
         {"name": "projects", "description": "Gestion des projets et contributeurs"},
         {"name": "issues", "description": "Gestion des problèmes et tâches"},
         {"name": "comments", "description": "Gestion des commentaires"},
+        {"name": "search", "description": "Recherche plein texte"},
+        {"name": "sync", "description": "Synchronisation incrémentale des clients"},
+        {"name": "deletions", "description": "Suivi des suppressions en arrière-plan"},
     ],
     "CONTACT": {
         "name": "Charles DZADU",
@@ -187,8 +211,11 @@ SPECTACULAR_SETTINGS = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
-    "ROTATE_REFRESH_TOKENS": False,
+    # Chaque rafraîchissement révoque le token présenté (supports_api.tokens)
+    "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    "TOKEN_REFRESH_SERIALIZER": "supports_api.tokens.RotatingTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "supports_api.tokens.RevokeTokenSerializer",
     "UPDATE_LAST_LOGIN": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
@@ -215,3 +242,214 @@ X_FRAME_OPTIONS = "DENY"
 SECURE_HSTS_SECONDS = 31536000
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
 SECURE_HSTS_PRELOAD = True
+
+# Configuration du flux de synchronisation incrémentale
+SOFTDESK_SYNC = {
+    "PAGE_SIZE": 500,
+    "MAX_PAGE_SIZE": 2000,
+    # Au-delà, un client doit refaire une synchronisation complète
+    "TOMBSTONE_RETENTION": timedelta(days=90),
+}
+
+# Configuration du flux d'événements temps réel (SSE)
+SOFTDESK_EVENTS = {
+    # "memory" pour un seul worker, "spool" pour plusieurs workers locaux
+    "BACKEND": os.environ.get("SOFTDESK_EVENTS_BACKEND", "memory"),
+    "SPOOL_PATH": BASE_DIR / "var" / "events" / "events.log",
+    "SPOOL_MAX_BYTES": 10 * 1024 * 1024,
+    "POLL_INTERVAL": 0.25,
+    "HEARTBEAT": 15,
+    "QUEUE_SIZE": 100,
+}
+
+# Sérialisation compilée (values_list) des listes en lecture seule
+SOFTDESK_FAST_SERIALIZATION = True
+
+# Instrumentation des requêtes (en-tête Server-Timing et journal JSON)
+SOFTDESK_PERF = {
+    "ENABLED": True,
+    # Fraction des requêtes mesurées (1.0 = toutes)
+    "SAMPLE_RATE": float(os.environ.get("SOFTDESK_PERF_SAMPLE_RATE", "1.0")),
+    "SERVER_TIMING": True,
+    "LOG": True,
+}
+
+# Détection des requêtes N+1 : "off", "log" (préproduction) ou "raise"
+SOFTDESK_NPLUSONE = {
+    "MODE": os.environ.get("SOFTDESK_NPLUSONE_MODE", "off"),
+    "THRESHOLD": 5,
+    "IGNORE": [],
+}
+
+# Métriques Prometheus exposées sur /api/metrics/, agrégées entre workers
+# via un fichier par processus dans DIRECTORY
+SOFTDESK_METRICS = {
+    "ENABLED": True,
+    "DIRECTORY": BASE_DIR / "var" / "metrics",
+    "FLUSH_INTERVAL": 5,
+    # Jeton du collecteur ; sans jeton, seuls les administrateurs y accèdent
+    "TOKEN": os.environ.get("SOFTDESK_METRICS_TOKEN"),
+    # Adresses admises sans jeton (REMOTE_ADDR, fiable seulement sans proxy)
+    "INTERNAL_IPS": [],
+}
+
+# Schéma OpenAPI précalculé, régénéré lorsque la version du code change
+# (par défaut une empreinte des sources ; SOFTDESK_CODE_VERSION au déploiement)
+SOFTDESK_SCHEMA = {
+    "DIRECTORY": BASE_DIR / "var" / "schema",
+    "VERSION": os.environ.get("SOFTDESK_CODE_VERSION"),
+}
+
+# Préchauffage des workers au démarrage : "sync", "background" ou "off"
+SOFTDESK_WARMUP = {
+    "MODE": os.environ.get("SOFTDESK_WARMUP_MODE", "sync"),
+    "CACHES": True,
+    "HOOKS": [],
+}
+
+# Limitation de débit par seau à jetons, partagée entre les workers via PATH
+SOFTDESK_THROTTLE = {
+    "ENABLED": True,
+    "PATH": BASE_DIR / "var" / "throttle" / "buckets.bin",
+    "SLOTS": 65536,
+    "RATES": {
+        # Par utilisateur et par vue
+        "read": "600/min",
+        "write": "120/min",
+        # Par IP, endpoints de token : connexion, rafraîchissement, révocation
+        "login": "10/min",
+        "refresh": "30/min",
+        "revoke": "30/min",
+    },
+    "OVERRIDES": {
+        "CommentViewSet.write": "60/min",
+    },
+}
+
+# Suppressions de projets et de comptes par lots (file "deletions")
+SOFTDESK_DELETION = {
+    "BATCH_SIZE": 500,
+    "PAUSE": 0.05,
+}
+
+# File de tâches d'arrière-plan en base (commande run_worker) ; CONCURRENCY
+# limite les tâches en cours par file, tous workers confondus
+SOFTDESK_JOBS = {
+    "MODULES": [
+        "supports_api.archive",
+        "supports_api.deletion",
+        "supports_api.search",
+        "supports_api.workload",
+    ],
+    "QUEUES": {
+        "default": {"CONCURRENCY": 4},
+        "deletions": {"CONCURRENCY": 2},
+        "search": {"CONCURRENCY": 1},
+    },
+    "VISIBILITY_TIMEOUT": 300,
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF": 10,
+    "MAX_BACKOFF": 3600,
+    "RETENTION": 7 * 24 * 3600,
+}
+
+# Cache par défaut de Django (mémoire locale) ; les statistiques ont leur
+# propre cache, partagé par les workers de la machine (fichiers dans
+# var/cache/stats) : une invalidation faite par un worker est vue par tous
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "stats": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "var" / "cache" / "stats",
+    },
+}
+
+# Statistiques des projets (/api/projects/stats/), en cache par projet et
+# invalidées à chaque écriture d'un problème
+SOFTDESK_STATS = {
+    "CACHE": "stats",
+    "TIMEOUT": 300,
+}
+
+# Archivage des problèmes terminés depuis AGE_DAYS jours (archive_issues)
+SOFTDESK_ARCHIVE = {
+    "AGE_DAYS": 180,
+    "BATCH_SIZE": 500,
+    "PAUSE": 0.05,
+}
+
+# Hachage des mots de passe : profil de coût (itérations PBKDF2) et pool
+# borné de vérification (POOL_SIZE calculs simultanés, QUEUE en attente)
+SOFTDESK_HASHING = {
+    "PROFILE": os.environ.get("SOFTDESK_HASHING_PROFILE", "standard"),
+    "PROFILES": {
+        "interactive": 600_000,
+        "standard": 1_000_000,
+        "strict": 1_500_000,
+    },
+    "POOL_SIZE": None,
+    "QUEUE": 16,
+}
+
+# Liste de révocation des tokens de rafraîchissement : purge des entrées
+# expirées au plus toutes les PRUNE_INTERVAL secondes par processus
+SOFTDESK_TOKENS = {
+    "PRUNE_INTERVAL": 3600,
+    "PRUNE_BATCH": 5000,
+}
+
+# Pagination (API et administration) : comptage arrêté à COUNT_LIMIT lignes,
+# total exact avec ?count=exact
+SOFTDESK_PAGINATION = {
+    "COUNT_LIMIT": 10000,
+}
+
+# Requêtes groupées (/api/batch/) : WORKERS lectures simultanées par processus
+SOFTDESK_BATCH = {
+    "MAX_REQUESTS": 20,
+    "WORKERS": 4,
+}
+
+# Boîte de réception (/api/issues/inbox/) : pagination par curseur
+SOFTDESK_INBOX = {
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+}
+
+# La suite de tests échoue sur toute requête N+1
+TEST_RUNNER = "supports_api.runner.NPlusOneTestRunner"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "perf": {"class": "logging.StreamHandler", "formatter": "message"},
+    },
+    "loggers": {
+        "supports_api.perf": {
+            "handlers": ["perf"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "supports_api.nplusone": {
+            "handlers": ["perf"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+        "supports_api.warmup": {
+            "handlers": ["perf"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "supports_api.jobs": {
+            "handlers": ["perf"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
@@ -0,0 +1,45 @@
+"""
+Profil de production « API seule » pour les workers qui ne servent que l'API
+JWT : ni administration, ni documentation, ni sessions, messages ou
+gabarits. Les workers démarrent plus vite et occupent moins de mémoire ;
+l'administration et Swagger/ReDoc restent servis par des workers lancés
+avec ``softdesk.settings``.
+
+    DJANGO_SETTINGS_MODULE=softdesk.settings_api gunicorn softdesk.wsgi
+
+Mesure : ``python manage.py boot_report softdesk.settings softdesk.settings_api``
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+# Applications propres à l'administration et à la documentation
+DOCS_AND_ADMIN_APPS = [
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "drf_spectacular",
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DOCS_AND_ADMIN_APPS]
+
+# Authentification JWT uniquement : ni session, ni CSRF, ni messages
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware
+    not in (
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.middleware.csrf.CsrfViewMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+    )
+]
+
+# Réponses JSON uniquement
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    key: value for key, value in REST_FRAMEWORK.items() if key != "DEFAULT_SCHEMA_CLASS"
+}
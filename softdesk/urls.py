@@ -15,20 +15,35 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
-from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
-                                   SpectacularSwaggerView)
+
+from supports_api.views import openapi_schema
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/", include("supports_api.urls")),
-    # Documentation Swagger/OpenAPI
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
 ]
+
+# Administration et documentation, absentes du profil API seule
+# (softdesk.settings_api)
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.append(path("admin/", admin.site.urls))
+
+if apps.is_installed("drf_spectacular"):
+    from drf_spectacular.views import (SpectacularRedocView,
+                                       SpectacularSwaggerView)
+
+    urlpatterns += [
+        # Documentation Swagger/OpenAPI (schéma précalculé, voir generate_schema)
+        path("api/schema/", openapi_schema, name="schema"),
+        path(
+            "api/docs/",
+            SpectacularSwaggerView.as_view(url_name="schema"),
+            name="swagger-ui",
+        ),
+        path(
+            "api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"
+        ),
+    ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "softdesk.settings")
 
 application = get_wsgi_application()
+
+# Préchauffage avant le fork (gunicorn --preload) ou au démarrage du worker
+from supports_api.warmup import boot  # noqa: E402
+
+boot()
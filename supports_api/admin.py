@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
 from .models import Comment, Contributor, Issue, Project, User
+from .pagination import CappedCountAdminMixin
 
 
 @admin.register(User)
@@ -57,7 +58,7 @@ class ContributorAdmin(admin.ModelAdmin):
 
 
 @admin.register(Issue)
-class IssueAdmin(admin.ModelAdmin):
+class IssueAdmin(CappedCountAdminMixin, admin.ModelAdmin):
     """Admin pour les problèmes"""
 
     list_display = (
@@ -83,7 +84,7 @@ class IssueAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(CappedCountAdminMixin, admin.ModelAdmin):
     """Admin pour les commentaires"""
 
     list_display = ("uuid", "issue", "author", "created_time")
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class SupportsApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "supports_api"
+
+    def ready(self):
+        # Connexion des signaux des modèles ; extensions drf-spectacular
+        # seulement si la documentation est servie
+        from . import signals  # noqa: F401
+        from .openapi import ENABLED
+
+        if ENABLED:
+            from . import schema  # noqa: F401
@@ -0,0 +1,191 @@
+"""
+Archivage des problèmes terminés et de leurs commentaires.
+
+Les problèmes « Finished » non modifiés depuis ``AGE_DAYS`` jours sont
+déplacés, avec leurs commentaires, dans ``ArchivedIssue`` et
+``ArchivedComment`` : les tables chaudes, leurs index et l'index de
+recherche ne contiennent plus que les données vivantes. Chaque lot copie
+les lignes par ``INSERT ... SELECT`` puis les supprime, dans une seule
+transaction ; la restauration fait la copie inverse en conservant
+identifiants, UUID et dates de création.
+
+Les problèmes archivés restent lisibles (``/api/issues/{id}/``,
+``/api/archive/issues/``) mais sortent des listes, de la recherche, des
+statistiques de projet et des charges de travail. Pour le flux de
+synchronisation, l'archivage est une suppression du problème (``Tombstone``,
+ses commentaires suivant comme pour une suppression) ; la restauration
+retire ces traces et date à nouveau le problème et ses commentaires.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import jobs, stats, workload
+from .models import ArchivedComment, ArchivedIssue, Comment, Issue, Tombstone
+
+DEFAULTS = {
+    "AGE_DAYS": 180,
+    "BATCH_SIZE": 500,
+    # Pause entre deux lots (s) : laisse passer les écritures concurrentes
+    "PAUSE": 0.05,
+}
+
+ISSUE_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "priority",
+    "status",
+    "tag",
+    "project_id",
+    "author_id",
+    "assigned_to_id",
+    "created_time",
+    "updated_time",
+)
+COMMENT_COLUMNS = (
+    "id",
+    "description",
+    "issue_id",
+    "author_id",
+    "uuid",
+    "created_time",
+    "updated_time",
+)
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_ARCHIVE", {}).get(name, DEFAULTS[name])
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _in(column, ids):
+    return f"{column} IN ({', '.join(['%s'] * len(ids))})"
+
+
+def _copy(source, target, columns, where, ids, archived_time=None):
+    """``INSERT INTO target SELECT ... FROM source WHERE where``"""
+    names = ", ".join(connection.ops.quote_name(column) for column in columns)
+    extra_name, extra_value, params = "", "", list(ids)
+    if archived_time is not None:
+        extra_name, extra_value = ", archived_time", ", %s"
+        params.insert(0, connection.ops.adapt_datetimefield_value(archived_time))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {_table(target)} ({names}{extra_name}) "
+            f"SELECT {names}{extra_value} FROM {_table(source)} WHERE {where}",
+            params,
+        )
+        return cursor.rowcount
+
+
+def _delete(model, where, ids):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {_table(model)} WHERE {where}", list(ids))
+        return cursor.rowcount
+
+
+def cutoff(age_days=None):
+    age_days = get_setting("AGE_DAYS") if age_days is None else age_days
+    return timezone.now() - timedelta(days=age_days)
+
+
+def eligible(before):
+    """Problèmes archivables : terminés, non modifiés depuis ``before``"""
+    return Issue.objects.filter(
+        status="Finished", updated_time__lt=before, project__pending_deletion=False
+    )
+
+
+""" Déplacements """
+
+
+def archive_batch(before, limit):
+    """Archive au plus ``limit`` problèmes ; retourne (problèmes, commentaires)"""
+    with transaction.atomic():
+        batch = list(
+            eligible(before)
+            .select_for_update()
+            .order_by("id")
+            .values_list("id", "project_id")[:limit]
+        )
+        if not batch:
+            return 0, 0
+        ids = [issue_id for issue_id, _ in batch]
+        # Les écritures en masse n'émettent pas de signal
+        workload.remove_issues(Issue.objects.filter(pk__in=ids))
+        Tombstone.objects.bulk_create(
+            Tombstone(kind="issue", object_id=issue_id, project_id=project_id)
+            for issue_id, project_id in batch
+        )
+        now = timezone.now()
+        _copy(Issue, ArchivedIssue, ISSUE_COLUMNS, _in("id", ids), ids, now)
+        comments = _copy(
+            Comment, ArchivedComment, COMMENT_COLUMNS, _in("issue_id", ids), ids, now
+        )
+        _delete(Comment, _in("issue_id", ids), ids)
+        _delete(Issue, _in("id", ids), ids)
+        project_ids = {project_id for _, project_id in batch}
+        transaction.on_commit(lambda: stats.invalidate(*project_ids))
+    return len(ids), comments
+
+
+def restore(issue_ids):
+    """Replace les problèmes archivés ``issue_ids`` (et leurs commentaires)
+    dans les tables chaudes ; retourne le nombre de problèmes restaurés"""
+    with transaction.atomic():
+        batch = list(
+            ArchivedIssue.objects.filter(
+                pk__in=issue_ids, project__pending_deletion=False
+            ).values_list("id", "project_id")
+        )
+        if not batch:
+            return 0
+        ids = [issue_id for issue_id, _ in batch]
+        _copy(ArchivedIssue, Issue, ISSUE_COLUMNS, _in("id", ids), ids)
+        _copy(ArchivedComment, Comment, COMMENT_COLUMNS, _in("issue_id", ids), ids)
+        _delete(ArchivedComment, _in("issue_id", ids), ids)
+        _delete(ArchivedIssue, _in("id", ids), ids)
+        # Problème de nouveau « modifié » : hors d'atteinte du prochain
+        # archivage et renvoyé par le flux de synchronisation, avec ses
+        # commentaires ; la trace de l'archivage n'a plus lieu d'être
+        now = timezone.now()
+        Issue.objects.filter(pk__in=ids).update(updated_time=now)
+        Comment.objects.filter(issue_id__in=ids).update(updated_time=now)
+        Tombstone.objects.filter(kind="issue", object_id__in=ids).delete()
+        workload.add_issues(Issue.objects.filter(pk__in=ids))
+        project_ids = {project_id for _, project_id in batch}
+        transaction.on_commit(lambda: stats.invalidate(*project_ids))
+    return len(ids)
+
+
+def run(before=None, batch_size=None, pause=None, heartbeat=None):
+    """Archive tous les problèmes éligibles, lot par lot ; retourne
+    (problèmes, commentaires)"""
+    before = before or cutoff()
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+    pause = get_setting("PAUSE") if pause is None else pause
+    issues = comments = 0
+    while True:
+        archived, archived_comments = archive_batch(before, batch_size)
+        if not archived:
+            return issues, comments
+        issues += archived
+        comments += archived_comments
+        if heartbeat is not None:
+            heartbeat()
+        if pause:
+            time.sleep(pause)
+
+
+@jobs.handler("archive.run", timeout=1800, max_attempts=3)
+def run_job(job):
+    before = cutoff(job.payload.get("age_days"))
+    run(before, heartbeat=lambda: jobs.heartbeat(job))
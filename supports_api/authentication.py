@@ -0,0 +1,79 @@
+import hmac
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authentication import (BaseAuthentication,
+                                           get_authorization_header)
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import hashing, metrics
+
+
+def _failure_reason(exc):
+    """Code d'erreur DRF/simplejwt, par exemple ``token_not_valid``"""
+    codes = exc.get_codes()
+    if isinstance(codes, dict):
+        codes = codes.get("code", exc.default_code)
+    return str(codes)
+
+
+class MeteredJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` qui comptabilise les échecs par motif"""
+
+    def authenticate(self, request):
+        try:
+            return super().authenticate(request)
+        except AuthenticationFailed as exc:
+            metrics.auth_failure(_failure_reason(exc))
+            raise
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """Jeton du collecteur Prometheus (``SOFTDESK_METRICS["TOKEN"]``) ; tout
+    autre en-tête est laissé à l'authentification JWT"""
+
+    def authenticate(self, request):
+        token = metrics.get_setting("TOKEN")
+        parts = get_authorization_header(request).split()
+        if not token or len(parts) != 2 or parts[0].lower() != b"bearer":
+            return None
+        if not hmac.compare_digest(parts[1], token.encode()):
+            return None
+        return AnonymousUser(), None
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
+
+
+class MeteredTokenViewMixin:
+    """Comptabilise les échecs d'obtention ou de rafraîchissement de token"""
+
+    failure_reason = "login"
+
+    def handle_exception(self, exc):
+        if isinstance(exc, AuthenticationFailed):
+            metrics.auth_failure(self.failure_reason)
+        return super().handle_exception(exc)
+
+
+class PooledModelBackend(ModelBackend):
+    """``ModelBackend`` dont la vérification du mot de passe passe par le
+    pool borné de ``hashing``"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Même coût qu'une vérification : ne révèle pas les comptes existants
+            hashing.make(password)
+            return None
+        if hashing.check(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,57 @@
+"""
+Suggestions d'utilisateurs par préfixe pour le sélecteur de contributeurs.
+
+Le préfixe est cherché dans ``username`` et ``email`` sans tenir compte de la
+casse, par un intervalle ``lower(colonne) >= 'abc' AND < 'abd'`` qui
+parcourt les index ``Lower("username")`` et ``Lower("email")`` dans l'ordre :
+chaque recherche lit au plus ``limit`` entrées d'index, quel que soit le
+nombre d'utilisateurs. Les contributeurs du projet indiqué sont proposés en
+premier.
+"""
+
+import sys
+
+from django.db.models.functions import Lower
+
+from .models import User
+
+LIMIT = 10
+MAX_LIMIT = 20
+
+COLUMNS = ("username", "email")
+
+
+def _matches(users, column, prefix, limit):
+    """(id, username) dont ``column`` commence par ``prefix``, dans l'ordre de
+    l'index"""
+    users = users.annotate(key=Lower(column))
+    if ord(prefix[-1]) < sys.maxunicode:
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        users = users.filter(key__gte=prefix, key__lt=upper)
+    else:  # aucun caractère après U+10FFFF : simple filtre par préfixe
+        users = users.filter(key__startswith=prefix)
+    return list(users.order_by("key").values_list("id", "username")[:limit])
+
+
+def suggest(prefix, limit=LIMIT, project_id=None):
+    """Au plus ``limit`` utilisateurs actifs {id, username} dont le nom ou
+    l'email commence par ``prefix``"""
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return []
+    users = User.objects.filter(is_active=True)
+    groups = [users]
+    if project_id is not None:
+        groups.insert(0, users.filter(contributions__project_id=project_id))
+    suggestions, seen = [], set()
+    for group in groups:
+        rows = {
+            row for column in COLUMNS for row in _matches(group, column, prefix, limit)
+        }
+        for user_id, username in sorted(rows, key=lambda row: row[1].lower()):
+            if user_id not in seen:
+                seen.add(user_id)
+                suggestions.append({"id": user_id, "username": username})
+        if len(suggestions) >= limit:
+            break
+    return suggestions[:limit]
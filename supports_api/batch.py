@@ -0,0 +1,195 @@
+"""
+Requêtes groupées : plusieurs appels à l'API en une seule requête HTTP.
+
+``POST /api/batch/`` reçoit une liste de sous-requêtes (méthode, chemin,
+corps) et les transmet directement aux ViewSets du router, sans repasser
+par les middlewares ni par le décodage du JWT : l'utilisateur authentifié
+de la requête groupée est imposé à chaque sous-requête. Les sous-requêtes
+partagent le cache de requête (``permissions.request_cache``, appartenance
+aux projets), vidé après chaque écriture.
+
+Les sous-requêtes sont traitées dans l'ordre ; une suite de lectures (GET)
+consécutives s'exécute en parallèle dans un pool de ``WORKERS`` threads,
+chaque écriture attend la fin des lectures qui la précèdent. Permissions
+et limitations de débit s'appliquent à chaque sous-requête comme à un appel
+isolé.
+"""
+
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from contextvars import copy_context
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection, connections
+from django.urls import Resolver404, resolve
+
+from . import instrumentation, metrics
+from .permissions import request_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MAX_REQUESTS": 20,
+    # Lectures simultanées (1 : tout en séquence)
+    "WORKERS": 4,
+}
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_BATCH", {}).get(name, DEFAULTS[name])
+
+
+_lock = threading.Lock()
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                get_setting("WORKERS"), thread_name_prefix="softdesk-batch"
+            )
+        return _pool
+
+
+def reset_pool():
+    """Arrête le pool ; le suivant est créé avec les réglages courants"""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def _sub_request(request, method, path, body):
+    """Requête Django d'une sous-requête, authentifiée comme ``request``"""
+    path, _, query = path.partition("?")
+    payload = b"" if body is None else json.dumps(body).encode()
+    environ = {
+        **request.META,
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "SCRIPT_NAME": "",
+        "QUERY_STRING": query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(payload)),
+        "wsgi.input": io.BytesIO(payload),
+    }
+    sub = WSGIRequest(environ)
+    # Lu par rest_framework.request.Request : pas de nouveau décodage du JWT
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    sub.softdesk_cache = request_cache(request)
+    return sub
+
+
+def _dispatch(request, item, viewsets):
+    """Exécute une sous-requête ; retourne (statut, corps)"""
+    method = item["method"]
+    try:
+        match = resolve(item["path"].partition("?")[0])
+    except Resolver404:
+        return 404, {"detail": "Chemin inconnu."}
+    if getattr(match.func, "cls", None) not in viewsets:
+        return 400, {"detail": "Chemin non disponible dans une requête groupée."}
+    sub = _sub_request(request, method, item["path"], item.get("body"))
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Sous-requête en échec : %s %s", method, item["path"])
+        return 500, {"detail": "Erreur interne du serveur."}
+    view = instrumentation.view_label(sub)
+    metrics.inc(
+        "softdesk_batch_subrequests_total",
+        (("view", view), ("method", method), ("status", str(response.status_code))),
+    )
+    return response.status_code, getattr(response, "data", None)
+
+
+def _release_connections():
+    """Connexions d'un thread du pool : conservées d'une sous-requête à
+    l'autre, fermées seulement après une erreur si elles sont inutilisables"""
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None and conn.errors_occurred:
+            conn.errors_occurred = False
+            if not conn.is_usable():
+                conn.close()
+
+
+def _dispatch_in_worker(request, item, viewsets, label):
+    """``_dispatch`` depuis un thread du pool : connexions propres au thread,
+    requêtes SQL comptées pour la requête groupée"""
+    profile = instrumentation.current_profile()
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count_query))
+                if profile is not None:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(profile.record_query)
+                    )
+            return _dispatch(request, item, viewsets)
+    finally:
+        _release_connections()
+        if queries:
+            metrics.inc("softdesk_db_queries_total", (("view", label),), queries)
+
+
+def _run_reads(request, items, viewsets):
+    """Exécute des lectures indépendantes, en parallèle si possible"""
+    # Dans une transaction, les autres threads ne verraient pas ses écritures
+    if len(items) == 1 or get_setting("WORKERS") <= 1 or connection.in_atomic_block:
+        return [_dispatch(request, item, viewsets) for item in items]
+    label = instrumentation.view_label(request._request)
+    pool = _get_pool()
+    futures = [
+        pool.submit(
+            copy_context().run,
+            _dispatch_in_worker,
+            request,
+            item,
+            viewsets,
+            label,
+        )
+        for item in items
+    ]
+    return [future.result() for future in futures]
+
+
+def execute(request, items, viewsets):
+    """Exécute les sous-requêtes ``items`` dans l'ordre ; retourne
+    [{id, status, body}]"""
+    results = []
+    reads = []
+    for item in items:
+        if item["method"] in SAFE_METHODS:
+            reads.append(item)
+            continue
+        if reads:
+            results += _run_reads(request, reads, viewsets)
+            reads = []
+        results.append(_dispatch(request, item, viewsets))
+        # Appartenance aux projets éventuellement modifiée
+        request_cache(request).clear()
+    if reads:
+        results += _run_reads(request, reads, viewsets)
+    return [
+        {"id": item.get("id") or str(index), "status": status, "body": body}
+        for index, (item, (status, body)) in enumerate(zip(items, results))
+    ]
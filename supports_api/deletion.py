@@ -0,0 +1,315 @@
+"""
+Suppression différée et par lots des projets et des comptes.
+
+La requête ne fait que le travail borné : traces de synchronisation,
+marquage (``Project.pending_deletion``, ``User.is_active = False``),
+suppression des quelques ``Contributor`` concernés — ce qui retire
+immédiatement le projet de toutes les vues filtrées par appartenance — et
+création d'une ``DeletionTask`` et de la tâche ``deletion`` de la file
+d'arrière-plan (``supports_api.jobs``). Le worker supprime ensuite les
+dépendants par ``DELETE`` SQL bornés à ``BATCH_SIZE`` lignes, sans charger
+les objets. Chaque lot et la progression de la tâche sont validés dans la
+même transaction : après un arrêt brutal, la tâche est relancée par la file
+et reprend à l'étape où elle s'était arrêtée, chaque étape étant idempotente.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import jobs, stats, sync, workload
+from .models import (ArchivedComment, ArchivedIssue, Comment, Contributor,
+                     DeletionTask, Issue, Project, User)
+
+DEFAULTS = {
+    "BATCH_SIZE": 500,
+    # Pause entre deux lots (s) : laisse passer les écritures concurrentes
+    "PAUSE": 0.05,
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_DELETION", {}).get(name, DEFAULTS[name])
+
+
+""" Marquage """
+
+
+def schedule_project_deletion(project, requested_by=None):
+    with transaction.atomic():
+        sync.record_project_deletion([project.pk])
+        Project.objects.filter(pk=project.pk).update(pending_deletion=True)
+        Contributor.objects.filter(project=project).delete()
+        workload.forget_project(project.pk)
+        task = DeletionTask.objects.create(
+            kind="project",
+            object_id=project.pk,
+            requested_by_id=requested_by.pk if requested_by else None,
+        )
+        jobs.enqueue("deletion", {"task": task.pk})
+        return task
+
+
+def schedule_user_deletion(user):
+    with transaction.atomic():
+        # Problèmes désassignés par record_user_deletion
+        assigned = set(
+            Issue.objects.filter(assigned_to=user).values_list("project_id", flat=True)
+        )
+        sync.record_user_deletion(user)
+        transaction.on_commit(lambda: stats.invalidate(*assigned))
+        own_projects = list(
+            Project.objects.filter(author=user).values_list("id", flat=True)
+        )
+        Project.objects.filter(id__in=own_projects).update(pending_deletion=True)
+        workload.forget_project(*own_projects)
+        workload.forget_user(user.pk)
+        Contributor.objects.filter(
+            Q(project_id__in=own_projects) | Q(user=user)
+        ).delete()
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        task = DeletionTask.objects.create(
+            kind="user", object_id=user.pk, requested_by_id=user.pk
+        )
+        jobs.enqueue("deletion", {"task": task.pk})
+        return task
+
+
+""" Étapes de purge """
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _delete_batch(model, where, params, limit):
+    """Supprime au plus ``limit`` lignes de ``model`` vérifiant ``where``"""
+    table = _table(model)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN "
+            f"(SELECT id FROM {table} WHERE {where} LIMIT %s)",
+            [*params, limit],
+        )
+        return cursor.rowcount
+
+
+def _delete_issues(ids):
+    """Supprime les problèmes ``ids`` et leurs commentaires dans la même
+    transaction : un commentaire ajouté depuis l'étape ``comments`` ne bloque
+    pas la suppression du lot"""
+    if not ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {_table(Comment)} WHERE issue_id IN ({placeholders})", ids
+        )
+        deleted = cursor.rowcount
+        cursor.execute(f"DELETE FROM {_table(Issue)} WHERE id IN ({placeholders})", ids)
+        return deleted + cursor.rowcount
+
+
+def _project_steps(project_id):
+    issues = f"SELECT id FROM {_table(Issue)} WHERE project_id = %s"
+    archived = f"SELECT id FROM {_table(ArchivedIssue)} WHERE project_id = %s"
+    return [
+        (
+            "comments",
+            lambda limit: _delete_batch(
+                Comment, f"issue_id IN ({issues})", [project_id], limit
+            ),
+        ),
+        (
+            "issues",
+            lambda limit: _delete_issues(
+                list(
+                    Issue.objects.filter(project_id=project_id).values_list(
+                        "id", flat=True
+                    )[:limit]
+                )
+            ),
+        ),
+        (
+            "contributors",
+            lambda limit: _delete_batch(
+                Contributor, "project_id = %s", [project_id], limit
+            ),
+        ),
+        (
+            "archived_comments",
+            lambda limit: _delete_batch(
+                ArchivedComment, f"issue_id IN ({archived})", [project_id], limit
+            ),
+        ),
+        (
+            "archived_issues",
+            lambda limit: _delete_batch(
+                ArchivedIssue, "project_id = %s", [project_id], limit
+            ),
+        ),
+        # Plus aucun dépendant volumineux : le collecteur reste borné
+        (
+            "project",
+            lambda limit: Project.objects.filter(pk=project_id).delete()[0],
+        ),
+    ]
+
+
+def _next_own_project(user_id):
+    return (
+        Project.objects.filter(author_id=user_id)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def _purge_own_projects(user_id, limit):
+    """Vide puis supprime les projets de l'utilisateur, un lot à la fois"""
+    project_id = _next_own_project(user_id)
+    if project_id is None:
+        return 0
+    for _, step in _project_steps(project_id):
+        deleted = step(limit)
+        if deleted:
+            return deleted
+    return 0
+
+
+def _issues_step(issues, write, roles=workload.ROLES):
+    """Étape appliquant ``write(ids)`` à ``limit`` lignes de ``issues`` ; les
+    écritures en masse n'émettant pas de signal, la synthèse des charges
+    (``roles``) et les statistiques des projets concernés sont mises à jour ici"""
+
+    def step(limit):
+        batch = list(issues.values_list("id", "project_id")[:limit])
+        if not batch:
+            return 0
+        ids = [issue_id for issue_id, _ in batch]
+        workload.remove_issues(Issue.objects.filter(pk__in=ids), roles)
+        affected = write(ids)
+        project_ids = {project_id for _, project_id in batch}
+        transaction.on_commit(lambda: stats.invalidate(*project_ids))
+        return affected
+
+    return step
+
+
+def _user_steps(user_id):
+    own_issues = f"SELECT id FROM {_table(Issue)} WHERE author_id = %s"
+    own_archived = f"SELECT id FROM {_table(ArchivedIssue)} WHERE author_id = %s"
+    return [
+        ("projects", lambda limit: _purge_own_projects(user_id, limit)),
+        (
+            "comments",
+            lambda limit: _delete_batch(
+                Comment,
+                f"author_id = %s OR issue_id IN ({own_issues})",
+                [user_id, user_id],
+                limit,
+            ),
+        ),
+        (
+            "issues",
+            _issues_step(Issue.objects.filter(author_id=user_id), _delete_issues),
+        ),
+        (
+            "assignments",
+            _issues_step(
+                Issue.objects.filter(assigned_to_id=user_id),
+                lambda ids: Issue.objects.filter(pk__in=ids).update(
+                    assigned_to=None, updated_time=timezone.now()
+                ),
+                roles=("assigned",),
+            ),
+        ),
+        (
+            "archived_comments",
+            lambda limit: _delete_batch(
+                ArchivedComment,
+                f"author_id = %s OR issue_id IN ({own_archived})",
+                [user_id, user_id],
+                limit,
+            ),
+        ),
+        (
+            "archived_issues",
+            lambda limit: _delete_batch(
+                ArchivedIssue, "author_id = %s", [user_id], limit
+            ),
+        ),
+        (
+            "archived_assignments",
+            lambda limit: ArchivedIssue.objects.filter(
+                pk__in=ArchivedIssue.objects.filter(assigned_to_id=user_id).values(
+                    "pk"
+                )[:limit]
+            ).update(assigned_to=None),
+        ),
+        (
+            "contributions",
+            lambda limit: _delete_batch(Contributor, "user_id = %s", [user_id], limit),
+        ),
+        ("user", lambda limit: User.objects.filter(pk=user_id).delete()[0]),
+    ]
+
+
+STEPS = {"project": _project_steps, "user": _user_steps}
+
+
+""" Exécution """
+
+
+def run(task, batch_size=None, pause=None, heartbeat=None, final=True):
+    """Exécute ``task`` jusqu'au bout, lot par lot, en reprenant à son étape.
+
+    ``heartbeat`` est appelé après chaque lot ; en cas d'erreur, la tâche
+    repasse en attente, ou en échec si ``final``.
+    """
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+    pause = get_setting("PAUSE") if pause is None else pause
+    steps = STEPS[task.kind](task.object_id)
+    task.status = "running"
+    task.attempts += 1
+    task.save(update_fields=["status", "attempts", "updated_time"])
+    try:
+        while task.step < len(steps):
+            _, step = steps[task.step]
+            with transaction.atomic():
+                deleted = step(batch_size)
+                task.deleted_rows += deleted
+                if not deleted:
+                    task.step += 1
+                task.save(update_fields=["step", "deleted_rows", "updated_time"])
+            if heartbeat is not None:
+                heartbeat()
+            if deleted and pause:
+                time.sleep(pause)
+    except Exception as exc:
+        DeletionTask.objects.filter(pk=task.pk).update(
+            status="failed" if final else "pending",
+            error=repr(exc),
+            updated_time=timezone.now(),
+        )
+        raise
+    task.status = "done"
+    task.finished_time = timezone.now()
+    task.error = ""
+    task.save(update_fields=["status", "finished_time", "error", "updated_time"])
+    return task
+
+
+@jobs.handler("deletion", queue="deletions", max_attempts=10)
+def run_job(job):
+    task = DeletionTask.objects.get(pk=job.payload["task"])
+    if task.status == "done":
+        return
+    run(
+        task,
+        heartbeat=lambda: jobs.heartbeat(job),
+        final=job.attempts >= job.max_attempts,
+    )
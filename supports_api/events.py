@@ -0,0 +1,232 @@
+"""
+Publication/abonnement d'événements pour le flux SSE (``/api/events/``).
+
+Les signaux des modèles publient des événements sur le bus du processus ;
+chaque connexion SSE y est abonnée via une file ``asyncio`` bornée. Lorsqu'un
+client ne consomme pas assez vite, sa file déborde : l'abonnement est marqué
+``overflow`` et le flux est fermé pour que le client se reconnecte et
+rafraîchisse ses données, plutôt que de laisser la mémoire croître.
+
+Deux transports sont disponibles (``SOFTDESK_EVENTS["BACKEND"]``) :
+
+- ``memory`` : diffusion directe dans le processus (un seul worker) ;
+- ``spool`` : les événements sont ajoutés à un fichier local partagé, que
+  chaque worker relit en continu. C'est un substitut local à un broker pour
+  les déploiements multi-processus sur une même machine.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULTS = {
+    "BACKEND": "memory",
+    "SPOOL_PATH": None,
+    "SPOOL_MAX_BYTES": 10 * 1024 * 1024,
+    "POLL_INTERVAL": 0.25,
+    "HEARTBEAT": 15,
+    "QUEUE_SIZE": 100,
+}
+
+# Sentinelle déposée dans la file d'un abonné débordé
+OVERFLOW = object()
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_EVENTS", {}).get(name, DEFAULTS[name])
+
+
+class Subscription:
+    """File bornée d'un abonné, rattachée à sa boucle asyncio"""
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Appelé dans la boucle de l'abonné"""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Client trop lent : on vide la file et on signale le débordement
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class EventBus:
+    """Bus d'événements du processus, alimenté par un transport"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, maxsize=None):
+        """Abonne la boucle asyncio courante"""
+        subscription = Subscription(
+            asyncio.get_running_loop(), maxsize or get_setting("QUEUE_SIZE")
+        )
+        with self._lock:
+            self._subscribers.add(subscription)
+        self.backend.start(self)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        """Publie un événement (sérialisable en JSON) depuis n'importe quel thread"""
+        self.backend.publish(self, event)
+
+    def dispatch(self, event):
+        """Distribue un événement aux abonnés du processus"""
+        event = dict(event, id=event.get("id") or f"{os.getpid()}-{next(self._ids)}")
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Boucle fermée : l'abonné a disparu sans se désabonner
+                self.unsubscribe(subscription)
+
+
+class MemoryBackend:
+    """Diffusion directe aux abonnés du processus"""
+
+    def start(self, bus):
+        pass
+
+    def publish(self, bus, event):
+        bus.dispatch(event)
+
+
+class SpoolBackend:
+    """Diffusion entre workers via un fichier local en ajout seul.
+
+    Chaque écriture est une ligne JSON ajoutée sous verrou ``fcntl`` ; un
+    thread par processus relit le fichier depuis sa fin au démarrage et
+    distribue les nouvelles lignes. Au-delà de ``SPOOL_MAX_BYTES`` le fichier
+    est remplacé, ce que les lecteurs détectent par changement d'inode.
+    """
+
+    def __init__(self, path, max_bytes, poll_interval):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, bus, event):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        while True:
+            with open(self.path, "a", encoding="utf-8") as spool:
+                if fcntl:
+                    fcntl.flock(spool, fcntl.LOCK_EX)
+                try:
+                    current = os.stat(self.path).st_ino
+                except FileNotFoundError:
+                    current = None
+                if current != os.fstat(spool.fileno()).st_ino:
+                    # Fichier remplacé pendant l'attente du verrou
+                    continue
+                if spool.tell() > self.max_bytes:
+                    os.replace(self.path, self.path.with_suffix(".old"))
+                    continue
+                spool.write(line)
+                return
+
+    def start(self, bus):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._tail, args=(bus,), name="events-spool", daemon=True
+                )
+                self._thread.start()
+
+    def _open(self, from_end):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        spool = open(self.path, "r", encoding="utf-8")
+        if from_end:
+            spool.seek(0, os.SEEK_END)
+        return spool
+
+    def _tail(self, bus):
+        spool = self._open(from_end=True)
+        pending = ""
+        while True:
+            chunk = spool.read()
+            if chunk:
+                pending += chunk
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    try:
+                        bus.dispatch(json.loads(line))
+                    except ValueError:
+                        continue
+                continue
+            try:
+                rotated = os.stat(self.path).st_ino != os.fstat(spool.fileno()).st_ino
+            except FileNotFoundError:
+                rotated = True
+            if rotated:
+                spool.close()
+                spool = self._open(from_end=False)
+                pending = ""
+                continue
+            time.sleep(self.poll_interval)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """Bus du processus, créé à la première utilisation"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                if get_setting("BACKEND") == "spool":
+                    backend = SpoolBackend(
+                        get_setting("SPOOL_PATH"),
+                        get_setting("SPOOL_MAX_BYTES"),
+                        get_setting("POLL_INTERVAL"),
+                    )
+                else:
+                    backend = MemoryBackend()
+                _bus = EventBus(backend)
+    return _bus
+
+
+def publish(event):
+    get_bus().publish(event)
+
+
+def format_sse(event):
+    """Encode un événement au format ``text/event-stream``"""
+    data = json.dumps(event["data"], separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
@@ -0,0 +1,184 @@
+"""
+Sérialisation rapide en lecture seule pour les listes.
+
+Un sérialiseur DRF est « compilé » une fois : ses champs (y compris les
+sérialiseurs imbriqués) sont traduits en une liste de colonnes lues par
+``values_list()`` et en une table de conversions précalculées. Les compteurs
+(``SerializerMethodField``) sont remplacés par des sous-requêtes annotées.
+Le résultat a exactement la même forme JSON que ``serializer.data``, sans
+instancier de modèles ni parcourir la machinerie des champs DRF par ligne.
+
+Un sérialiseur qui contient un champ non pris en charge n'est pas compilé :
+``compile_serializer`` retourne ``None`` et l'appelant garde le chemin
+standard.
+"""
+
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from . import fieldsets
+from .models import ArchivedComment, Comment, Contributor
+from .serializers import (ArchivedIssueSerializer, IssueSerializer,
+                          ProjectSerializer)
+
+
+class NotCompilable(Exception):
+    """Le sérialiseur contient un champ sans équivalent compilé"""
+
+
+def _count(model, fk_name, path):
+    """Sous-requête comptant les ``model`` rattachés à l'objet ``path``"""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{fk_name: OuterRef(path)})
+            .order_by()
+            .values(fk_name)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+# Équivalents SQL des SerializerMethodField : (sérialiseur, champ) -> fabrique
+# d'expression à partir du chemin de la clé primaire de l'objet sérialisé.
+COMPUTED_FIELDS = {
+    (ProjectSerializer, "contributors_count"): lambda path: _count(
+        Contributor, "project", path
+    ),
+    (IssueSerializer, "comments_count"): lambda path: _count(Comment, "issue", path),
+    (ArchivedIssueSerializer, "comments_count"): lambda path: _count(
+        ArchivedComment, "issue", path
+    ),
+}
+
+# Champs dont la valeur lue en base est déjà la représentation DRF
+IDENTITY_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.BooleanField,
+    serializers.FloatField,
+)
+
+
+def _iso_datetime(value):
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def _converter(field):
+    """Conversion d'une valeur lue en base vers sa représentation, ou ``None``
+    lorsque la valeur est déjà représentée telle quelle"""
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if (
+            settings.USE_TZ
+            and output_format
+            and output_format.lower() == ISO_8601
+            and getattr(field, "timezone", None) is None
+        ):
+            return _iso_datetime
+        return field.to_representation
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+        return str
+    if isinstance(field, IDENTITY_FIELDS):
+        return None
+    return field.to_representation
+
+
+class CompiledSerializer:
+    """Colonnes et mapper précalculés d'un sérialiseur en lecture"""
+
+    def __init__(self, serializer):
+        self.columns = []
+        self._mapper = self._compile(serializer, "")
+
+    def _column(self, expression):
+        self.columns.append(expression)
+        return len(self.columns) - 1
+
+    def _compile(self, serializer, prefix):
+        plan = []
+        pk_index = self._column(f"{prefix}pk")
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                raise NotCompilable(name)
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self._compile(field, f"{prefix}{field.source}__")
+                plan.append((name, None, None, nested))
+            elif isinstance(field, serializers.SerializerMethodField):
+                factory = COMPUTED_FIELDS.get((type(serializer), name))
+                if factory is None:
+                    raise NotCompilable(name)
+                plan.append((name, self._column(factory(f"{prefix}pk")), None, None))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                path = f"{prefix}{field.source.replace('.', '__')}_id"
+                plan.append((name, self._column(path), None, None))
+            elif field.source == "*" or isinstance(
+                field, (serializers.RelatedField, serializers.ManyRelatedField)
+            ):
+                raise NotCompilable(name)
+            else:
+                path = prefix + field.source.replace(".", "__")
+                plan.append((name, self._column(path), _converter(field), None))
+        return self._build(pk_index, plan)
+
+    @staticmethod
+    def _build(pk_index, plan):
+        def mapper(row):
+            if row[pk_index] is None:
+                return None
+            data = {}
+            for name, index, convert, nested in plan:
+                if nested is not None:
+                    data[name] = nested(row)
+                    continue
+                value = row[index]
+                if convert is None or value is None:
+                    data[name] = value
+                else:
+                    data[name] = convert(value)
+            return data
+
+        return mapper
+
+    def values(self, queryset):
+        """Restreint ``queryset`` aux seules colonnes nécessaires"""
+        return queryset.values_list(*self.columns)
+
+    def serialize(self, rows):
+        mapper = self._mapper
+        return [mapper(row) for row in rows]
+
+
+_compiled = {}
+
+
+def compile_serializer(serializer_class, context=None):
+    """Retourne la version compilée de ``serializer_class`` (mise en cache), ou
+    ``None`` si le chemin rapide est désactivé ou inapplicable"""
+    if not getattr(settings, "SOFTDESK_FAST_SERIALIZATION", True):
+        return None
+    if timezone.get_current_timezone_name() != "UTC":
+        return None
+    # Une version par forme demandée (?fields= / ?expand=)
+    key = (serializer_class, fieldsets.selection_key(context))
+    try:
+        return _compiled[key]
+    except KeyError:
+        pass
+    try:
+        compiled = CompiledSerializer(serializer_class(context=context or {}))
+    except NotCompilable:
+        compiled = None
+    return fieldsets.remember(_compiled, key, compiled)
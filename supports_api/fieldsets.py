@@ -0,0 +1,204 @@
+"""
+Champs à la demande : ``?fields=`` et ``?expand=``.
+
+Par défaut, les objets liés (auteur, projet, problème...) sont représentés
+par leur identifiant. ``?expand=issue,issue.project`` les remplace par
+l'objet complet ; ``?fields=id,description,issue.title`` limite la réponse
+aux champs indiqués (un chemin ``a.b`` étend ``a``).
+
+La sélection est aussi appliquée aux requêtes SQL des lectures : colonnes
+restreintes avec ``only()``, jointures (``select_related``) pour les seuls
+objets étendus, compteurs calculés seulement s'ils sont demandés. Le plan
+d'une forme (sérialiseur, sélection) est calculé une fois puis mis en cache,
+comme la version compilée du sérialiseur (``fast_serializers``).
+"""
+
+import threading
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+# Chemins retenus par paramètre ; formes mises en cache par processus
+MAX_PATHS = 32
+MAX_CACHED = 256
+
+
+def parse(value):
+    """``"a, b.c"`` -> frozenset({"a", "b.c"})"""
+    if not value:
+        return frozenset()
+    paths = (path.strip() for path in value.split(",")[:MAX_PATHS])
+    return frozenset(path for path in paths if path)
+
+
+def _top(paths):
+    return frozenset(path.partition(".")[0] for path in paths)
+
+
+def _below(paths, name):
+    prefix = f"{name}."
+    return frozenset(path[len(prefix) :] for path in paths if path.startswith(prefix))
+
+
+class Selection:
+    """Champs retenus et objets étendus à un niveau de la réponse"""
+
+    __slots__ = ("fields", "expand", "_top_fields", "_top_expand")
+
+    def __init__(self, fields=frozenset(), expand=frozenset()):
+        self.fields = fields
+        # Un chemin a.b (champ ou extension) étend a
+        self.expand = expand | {
+            path.rpartition(".")[0] for path in fields | expand if "." in path
+        }
+        self._top_fields = _top(fields)
+        self._top_expand = _top(self.expand)
+
+    @classmethod
+    def from_request(cls, request):
+        """Sélection de la requête ; ``?fields=`` est ignoré hors lecture (les
+        champs d'entrée d'une écriture ne sont pas restreints)"""
+        params = request.query_params
+        fields = frozenset()
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            fields = parse(params.get(FIELDS_PARAM))
+        return cls(fields, parse(params.get(EXPAND_PARAM)))
+
+    @property
+    def key(self):
+        return self.fields, self.expand
+
+    def includes(self, name):
+        return not self._top_fields or name in self._top_fields
+
+    def expands(self, name):
+        return name in self._top_expand
+
+    def child(self, name):
+        return Selection(_below(self.fields, name), _below(self.expand, name))
+
+
+def selection_key(context):
+    """Clé de cache de la forme demandée (``None`` : forme complète)"""
+    selection = (context or {}).get("selection")
+    return None if selection is None else selection.key
+
+
+_cache_lock = threading.Lock()
+
+
+def remember(cache, key, value):
+    """Ajoute ``key`` à un cache borné (la plus ancienne forme est oubliée)"""
+    with _cache_lock:
+        if len(cache) >= MAX_CACHED:
+            cache.pop(next(iter(cache)), None)
+        cache[key] = value
+    return value
+
+
+class SelectableFieldsMixin:
+    """Sérialiseur dont les champs suivent la ``Selection`` du contexte.
+
+    Sans sélection dans le contexte (usage interne, tests), tous les champs
+    et objets liés sont rendus comme auparavant.
+    """
+
+    _selection = None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self._selection or self.context.get("selection")
+        if selection is None:
+            return fields
+        for name in list(fields):
+            field = fields[name]
+            if not selection.includes(name):
+                del fields[name]
+            elif isinstance(field, serializers.BaseSerializer):
+                if selection.expands(name):
+                    child = getattr(field, "child", field)
+                    child._selection = selection.child(name)
+                else:
+                    fields[name] = _identifier(field)
+        return fields
+
+
+def _identifier(field):
+    """Champ identifiant remplaçant un sérialiseur imbriqué non étendu"""
+    kwargs = {"read_only": True}
+    if field.source:
+        kwargs["source"] = field.source
+    if isinstance(field, serializers.ListSerializer):
+        kwargs["many"] = True
+    return serializers.PrimaryKeyRelatedField(**kwargs)
+
+
+""" Requêtes SQL """
+
+
+def _plan(serializer, prefix, model):
+    """(colonnes, relations) lues par ``serializer``, ou ``None`` si un champ
+    ne correspond pas à une colonne"""
+    columns, related = {f"{prefix}{model._meta.pk.name}"}, set()
+    for field in serializer.fields.values():
+        if field.write_only or isinstance(field, serializers.SerializerMethodField):
+            continue
+        if field.source == "*" or "." in field.source:
+            return None
+        if isinstance(
+            field, (serializers.ListSerializer, serializers.ManyRelatedField)
+        ):
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if isinstance(field, serializers.BaseSerializer):
+            nested = _plan(
+                field, f"{prefix}{field.source}__", model_field.related_model
+            )
+            if nested is None:
+                return None
+            related.add(f"{prefix}{field.source}")
+            columns |= nested[0]
+            related |= nested[1]
+        elif model_field.concrete:
+            columns.add(f"{prefix}{field.source}")
+        else:
+            return None
+    return columns, related
+
+
+_plans = {}
+
+
+def plan(serializer_class, context):
+    """Plan SQL (colonnes, relations) d'une forme, mis en cache"""
+    key = (serializer_class, selection_key(context))
+    try:
+        return _plans[key]
+    except KeyError:
+        pass
+    serializer = serializer_class(context=context)
+    model = serializer.Meta.model
+    found = _plan(serializer, "", model)
+    if found is not None:
+        # Clés étrangères de l'objet : lues par les permissions
+        found[0].update(
+            field.name for field in model._meta.concrete_fields if field.is_relation
+        )
+    return remember(_plans, key, found)
+
+
+def narrow(queryset, serializer_class, context):
+    """Restreint ``queryset`` aux colonnes et jointures de la forme demandée"""
+    found = plan(serializer_class, context)
+    if found is None:
+        return queryset
+    columns, related = found
+    if related:
+        queryset = queryset.select_related(*sorted(related))
+    return queryset.only(*sorted(columns))
@@ -0,0 +1,124 @@
+"""
+Hachage des mots de passe : coût configurable et pool borné.
+
+``ProfiledPBKDF2PasswordHasher`` prend son nombre d'itérations dans le profil
+``SOFTDESK_HASHING["PROFILE"]`` : changer de profil réhache chaque mot de
+passe à la connexion suivante de son propriétaire, sans migration.
+
+Les vérifications et hachages de la connexion et de l'inscription passent
+par ``run()`` : au plus ``POOL_SIZE`` calculs simultanés dans le processus
+(``pbkdf2_hmac`` libère le GIL, les threads occupent chacun un cœur), et au
+plus ``QUEUE`` calculs en attente. Au-delà, la requête est refusée
+immédiatement (503) : une rafale de connexions ne peut plus occuper tous
+les threads ni tous les cœurs des workers de l'API.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (PBKDF2PasswordHasher, make_password,
+                                         verify_password)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import metrics
+
+DEFAULTS = {
+    "PROFILE": "standard",
+    # Profil -> itérations PBKDF2-SHA256
+    "PROFILES": {
+        "interactive": 600_000,
+        "standard": 1_000_000,
+        "strict": 1_500_000,
+    },
+    # Calculs simultanés (None : nombre de cœurs)
+    "POOL_SIZE": None,
+    # Calculs en attente d'un thread du pool avant refus
+    "QUEUE": 16,
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_HASHING", {}).get(name, DEFAULTS[name])
+
+
+def iterations():
+    return get_setting("PROFILES")[get_setting("PROFILE")]
+
+
+class ProfiledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 dont le coût suit ``SOFTDESK_HASHING["PROFILE"]``"""
+
+    @property
+    def iterations(self):
+        return iterations()
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Trop de connexions simultanées, réessayez dans un instant."
+    default_code = "hashing_busy"
+
+
+_lock = threading.Lock()
+_pool = None
+_slots = None
+
+
+def _get_pool():
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            size = get_setting("POOL_SIZE") or os.cpu_count() or 1
+            _pool = ThreadPoolExecutor(size, thread_name_prefix="softdesk-hashing")
+            _slots = threading.BoundedSemaphore(size + get_setting("QUEUE"))
+        return _pool, _slots
+
+
+def reset_pool():
+    """Arrête le pool ; le suivant est créé avec les réglages courants"""
+    global _pool, _slots
+    with _lock:
+        pool, _pool, _slots = _pool, None, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def run(operation, function, *args):
+    """Exécute ``function(*args)`` dans le pool ; lève ``HashingBusy`` si le
+    pool et sa file d'attente sont pleins"""
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        metrics.inc("softdesk_password_hashing_rejected_total")
+        raise HashingBusy()
+    start = time.perf_counter()
+    try:
+        return pool.submit(function, *args).result()
+    finally:
+        slots.release()
+        metrics.observe(
+            "softdesk_password_hashing_seconds",
+            (("operation", operation),),
+            time.perf_counter() - start,
+        )
+
+
+def make(raw_password):
+    """Hache un nouveau mot de passe"""
+    return run("make", make_password, raw_password)
+
+
+def check(user, raw_password):
+    """Vérifie le mot de passe de ``user`` et le réhache si son coût ne suit
+    plus le profil (la sauvegarde reste dans le thread de la requête)"""
+    is_correct, must_update = run("check", verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        try:
+            user.password = make(raw_password)
+        except HashingBusy:  # réhaché à une prochaine connexion
+            return True
+        user.save(update_fields=["password"])
+    return is_correct
@@ -0,0 +1,135 @@
+"""
+Boîte de réception : problèmes assignés à l'utilisateur, tous projets
+confondus, du plus récemment modifié au plus ancien.
+
+La liste est parcourue par keyset sur ``(updated_time, id)`` dans l'index
+``issue_inbox_idx`` (assigned_to, status, priority, updated_time) : les
+clés de la page sont lues par un ``LIMIT n+1`` par couple (statut,
+priorité), chacun dans l'ordre de l'index et sans tri, réunis en une seule
+requête ``UNION ALL`` puis fusionnés ; une seconde requête charge les
+lignes de ces seules clés. L'appartenance aux projets
+est vérifiée dans cette seconde requête, une fois pour toute la page : les
+problèmes d'un projet quitté sont écartés sans jointure ``DISTINCT``.
+
+Le curseur est opaque (signé) et contient la clé de la dernière ligne lue.
+"""
+
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+from django.db.models import Q
+
+from .models import Contributor, Issue
+
+CURSOR_SALT = "supports_api.inbox"
+
+DEFAULTS = {
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+}
+
+# Statuts par défaut : problèmes encore à traiter
+OPEN_STATUSES = ("To Do", "In Progress")
+
+# Parcours de l'index par page, si des problèmes de projets quittés
+# empêchent de la remplir ; au-delà, la page est retournée incomplète
+MAX_SCANS = 4
+
+ORDERING = ("-updated_time", "-id")
+
+
+class InvalidCursor(Exception):
+    """Curseur illisible ou altéré"""
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_INBOX", {}).get(name, DEFAULTS[name])
+
+
+def encode_cursor(key):
+    updated_time, pk = key
+    return signing.dumps([updated_time.isoformat(), pk], salt=CURSOR_SALT)
+
+
+def decode_cursor(token):
+    try:
+        updated_time, pk = signing.loads(token, salt=CURSOR_SALT)
+        return datetime.fromisoformat(updated_time), int(pk)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise InvalidCursor(token)
+
+
+def _before(key):
+    """Condition keyset « strictement après (updated_time, id) » dans l'ordre
+    décroissant ; la borne ``updated_time__lte`` garde le parcours de l'index"""
+    if key is None:
+        return Q()
+    updated_time, pk = key
+    return Q(updated_time__lte=updated_time) & (
+        Q(updated_time__lt=updated_time) | Q(id__lt=pk)
+    )
+
+
+def _keys(scopes, key, count):
+    """Les ``count`` premières clés après ``key``, toutes portées confondues.
+
+    Chaque portée est lue dans l'ordre de l'index avec son propre ``LIMIT`` ;
+    l'ORM refusant ``LIMIT`` dans un ``UNION`` sous SQLite, les requêtes
+    compilées sont réunies à la main, chacune dans une sous-requête.
+    """
+    parts, params = [], []
+    for scope in scopes:
+        sql, scope_params = (
+            scope.filter(_before(key))
+            .order_by(*ORDERING)
+            .values_list("updated_time", "id")[:count]
+            .query.sql_with_params()
+        )
+        parts.append(f"SELECT * FROM ({sql})")
+        params += scope_params
+    with connection.cursor() as cursor:
+        cursor.execute(" UNION ALL ".join(parts), params)
+        keys = [
+            (connection.ops.convert_datetimefield_value(value, None, connection), pk)
+            for value, pk in cursor.fetchall()
+        ]
+    return sorted(keys, reverse=True)[:count]
+
+
+def page(user, load, cursor=None, limit=None, statuses=OPEN_STATUSES, priority=None):
+    """Page de la boîte de réception de ``user`` : (lignes, curseur suivant
+    ou ``None``).
+
+    ``load(queryset)`` sérialise les problèmes d'un queryset déjà trié.
+    """
+    limit = limit or get_setting("PAGE_SIZE")
+    key = decode_cursor(cursor) if cursor else None
+    priorities = (
+        (priority,) if priority is not None else [p for p, _ in Issue.PRIORITY_CHOICES]
+    )
+    # Une portée par préfixe d'index : triée par l'index lui-même
+    scopes = [
+        Issue.objects.filter(assigned_to=user, status=status, priority=level)
+        for status in statuses
+        for level in priorities
+    ]
+    members = Contributor.objects.filter(user=user).values("project_id")
+
+    rows = []
+    for _ in range(MAX_SCANS):
+        wanted = limit - len(rows)
+        keys = _keys(scopes, key, wanted + 1)
+        has_more = len(keys) > wanted
+        keys = keys[:wanted]
+        if keys:
+            key = keys[-1]
+            rows += load(
+                Issue.objects.filter(
+                    id__in=[pk for _, pk in keys], project_id__in=members
+                ).order_by(*ORDERING)
+            )
+        if not has_more or len(rows) >= limit:
+            break
+    return rows, (encode_cursor(key) if has_more else None)
@@ -0,0 +1,155 @@
+"""
+Instrumentation des requêtes : requêtes SQL, temps base de données,
+permissions et sérialisation.
+
+Le profil de la requête en cours est porté par une ``ContextVar`` ; il est
+créé par ``PerformanceMiddleware`` (voir ``supports_api.middleware``) et
+alimenté par un ``execute_wrapper`` sur les connexions, par
+``InstrumentedViewMixin`` côté vues DRF et par ``InstrumentedJSONRenderer``.
+Hors requête échantillonnée, chaque point de mesure se réduit à la lecture
+de la ``ContextVar``.
+"""
+
+import time
+from contextvars import ContextVar
+
+from rest_framework.renderers import JSONRenderer
+
+_current_profile = ContextVar("supports_api_profile", default=None)
+
+
+class RequestProfile:
+    """Mesures collectées pendant une requête"""
+
+    __slots__ = (
+        "queries",
+        "db_time",
+        "duplicates",
+        "perm_time",
+        "perm_db_time",
+        "handler_time",
+        "handler_db_time",
+        "render_time",
+        "_seen",
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.duplicates = 0
+        self.perm_time = 0.0
+        self.perm_db_time = 0.0
+        self.handler_time = 0.0
+        self.handler_db_time = 0.0
+        self.render_time = 0.0
+        self._seen = set()
+
+    def record_query(self, execute, sql, params, many, context):
+        """``execute_wrapper`` : compte et chronomètre chaque requête SQL"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            key = (sql, repr(params))
+            if key in self._seen:
+                self.duplicates += 1
+            else:
+                self._seen.add(key)
+
+    @property
+    def serialization_time(self):
+        """Temps de la vue hors SQL et permissions, plus le rendu JSON"""
+        own_time = self.handler_time - self.handler_db_time
+        return max(own_time, 0.0) + self.render_time
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+def activate(profile):
+    return _current_profile.set(profile)
+
+
+def deactivate(token):
+    _current_profile.reset(token)
+
+
+def view_label(request):
+    """Nom ``ViewSet.action`` de la vue résolue, par exemple ``IssueViewSet.list``"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    func = match.func
+    view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    if view_class is None:
+        return f"{func.__module__}.{func.__name__}"
+    method = request.method.lower()
+    actions = getattr(func, "actions", None)
+    if actions:
+        return f"{view_class.__name__}.{actions.get(method, method)}"
+    return f"{view_class.__name__}.{method}"
+
+
+class InstrumentedViewMixin:
+    """Mesure le temps des permissions et du traitement d'une vue DRF"""
+
+    def _timed_permissions(self, check, *args):
+        profile = current_profile()
+        if profile is None:
+            return check(*args)
+        start, db_time = time.perf_counter(), profile.db_time
+        try:
+            return check(*args)
+        finally:
+            profile.perm_time += time.perf_counter() - start
+            profile.perm_db_time += profile.db_time - db_time
+
+    def check_permissions(self, request):
+        return self._timed_permissions(super().check_permissions, request)
+
+    def check_object_permissions(self, request, obj):
+        return self._timed_permissions(super().check_object_permissions, request, obj)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        profile = current_profile()
+        if profile is not None:
+            # Début du traitement proprement dit (après authentification,
+            # permissions et limitations)
+            self._handler_start = (
+                time.perf_counter(),
+                profile.db_time,
+                profile.perm_time,
+                profile.perm_db_time,
+            )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        profile = current_profile()
+        start = getattr(self, "_handler_start", None)
+        if profile is not None and start is not None:
+            started, db_time, perm_time, perm_db_time = start
+            # Les permissions objet vérifiées dans la vue sont exclues
+            profile.handler_time += (
+                time.perf_counter() - started - (profile.perm_time - perm_time)
+            )
+            profile.handler_db_time += (profile.db_time - db_time) - (
+                profile.perm_db_time - perm_db_time
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class InstrumentedJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` qui comptabilise son temps de rendu"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        profile = current_profile()
+        if profile is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            profile.render_time += time.perf_counter() - start
@@ -0,0 +1,311 @@
+"""
+File de tâches d'arrière-plan stockée dans la base de données.
+
+Aucun broker : une tâche est une ligne de ``Job``, créée dans la
+transaction de l'appelant (elle n'existe que si celle-ci est validée) et
+exécutée par ``manage.py run_worker``. La réservation est une seule
+instruction ``UPDATE`` conditionnelle qui vérifie à la fois l'état de la
+tâche et la limite de concurrence de sa file : deux workers ne peuvent pas réserver la
+même tâche, ni dépasser ``CONCURRENCY`` tâches en cours.
+
+Une tâche réservée reste invisible jusqu'à ``locked_until`` (délai de
+visibilité) ; une tâche longue le prolonge avec ``heartbeat()``. Si son
+worker meurt, elle redevient réservable à l'expiration du délai. Un échec
+replanifie la tâche avec un délai exponentiel jusqu'à ``max_attempts``.
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import metrics
+from .models import Job
+
+logger = logging.getLogger("supports_api.jobs")
+
+DEFAULTS = {
+    # Modules important leurs gestionnaires avec @handler
+    "MODULES": [],
+    # File -> {"CONCURRENCY": tâches en cours au plus, tous workers confondus}
+    "QUEUES": {"default": {"CONCURRENCY": 4}},
+    "VISIBILITY_TIMEOUT": 300,
+    "MAX_ATTEMPTS": 5,
+    # Délai avant la n-ième relance : BACKOFF * 2^(n-1), plafonné
+    "BACKOFF": 10,
+    "MAX_BACKOFF": 3600,
+    # Durée de conservation des tâches terminées (s)
+    "RETENTION": 7 * 24 * 3600,
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_JOBS", {}).get(name, DEFAULTS[name])
+
+
+class LeaseLost(Exception):
+    """La tâche a été reprise par un autre worker (délai de visibilité dépassé)"""
+
+
+""" Gestionnaires """
+
+
+@dataclass(frozen=True)
+class Handler:
+    function: object
+    queue: str
+    timeout: int | None
+    max_attempts: int | None
+
+
+HANDLERS = {}
+
+
+def handler(name, queue="default", timeout=None, max_attempts=None):
+    """Enregistre ``function(job)`` comme gestionnaire des tâches ``name``"""
+
+    def decorator(function):
+        HANDLERS[name] = Handler(function, queue, timeout, max_attempts)
+        return function
+
+    return decorator
+
+
+def autodiscover():
+    for module in get_setting("MODULES"):
+        import_module(module)
+
+
+@handler("jobs.noop", queue="benchmark")
+def noop(job):
+    """Tâche vide, utilisée par ``benchmark_jobs``"""
+
+
+def _timeout(name):
+    registered = HANDLERS.get(name)
+    return (registered and registered.timeout) or get_setting("VISIBILITY_TIMEOUT")
+
+
+def _concurrency(queue):
+    return get_setting("QUEUES").get(queue, {}).get("CONCURRENCY", 1)
+
+
+""" Production """
+
+
+def enqueue(name, payload=None, delay=0):
+    """Crée une tâche dans la transaction courante"""
+    registered = HANDLERS[name]
+    return Job.objects.create(
+        queue=registered.queue,
+        name=name,
+        payload=payload or {},
+        max_attempts=registered.max_attempts or get_setting("MAX_ATTEMPTS"),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+""" Consommation """
+
+
+def _adapt(value):
+    return connection.ops.adapt_datetimefield_value(value)
+
+
+def claim(queue, candidates=3):
+    """Réserve la prochaine tâche échue de ``queue`` ; ``None`` si la file est
+    vide ou si sa limite de concurrence est atteinte"""
+    table = connection.ops.quote_name(Job._meta.db_table)
+    now = timezone.now()
+    claimable = Q(queue=queue) & (
+        Q(status="pending", run_after__lte=now)
+        | Q(status="running", locked_until__lt=now, attempts__lt=F("max_attempts"))
+    )
+    ids = Job.objects.filter(claimable).order_by("run_after", "id")
+    for job_id in ids.values_list("id", flat=True)[:candidates]:
+        token = uuid.uuid4().hex
+        # Le délai de visibilité dépend du gestionnaire : celui par défaut est
+        # posé ici, puis corrigé une fois la tâche connue
+        until = now + timedelta(seconds=get_setting("VISIBILITY_TIMEOUT"))
+        # Réservation conditionnelle : la tâche doit être encore réservable
+        # et la file sous sa limite de concurrence au moment de l'écriture
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET status = 'running', attempts = attempts + 1, "
+                "locked_by = %s, locked_until = %s, updated_time = %s "
+                "WHERE id = %s AND ((status = 'pending' AND run_after <= %s) "
+                "OR (status = 'running' AND locked_until < %s "
+                "AND attempts < max_attempts)) "
+                f"AND (SELECT COUNT(*) FROM {table} WHERE queue = %s "
+                "AND status = 'running' AND locked_until >= %s) < %s",
+                [
+                    token,
+                    _adapt(until),
+                    _adapt(now),
+                    job_id,
+                    _adapt(now),
+                    _adapt(now),
+                    queue,
+                    _adapt(now),
+                    _concurrency(queue),
+                ],
+            )
+            claimed = cursor.rowcount
+        if claimed:
+            job = Job.objects.get(pk=job_id)
+            timeout = _timeout(job.name)
+            if timeout != get_setting("VISIBILITY_TIMEOUT"):
+                heartbeat(job, timeout)
+            return job
+    return None
+
+
+def heartbeat(job, timeout=None):
+    """Prolonge le délai de visibilité de ``job`` ; lève ``LeaseLost`` si la
+    tâche a été reprise par un autre worker"""
+    timeout = timeout or _timeout(job.name)
+    job.locked_until = timezone.now() + timedelta(seconds=timeout)
+    updated = Job.objects.filter(
+        pk=job.pk, status="running", locked_by=job.locked_by
+    ).update(locked_until=job.locked_until, updated_time=timezone.now())
+    if not updated:
+        raise LeaseLost(f"Tâche #{job.pk} reprise par un autre worker")
+
+
+def backoff(attempts):
+    delay = min(
+        get_setting("BACKOFF") * 2 ** max(attempts - 1, 0), get_setting("MAX_BACKOFF")
+    )
+    # Gigue : évite que des tâches échouées ensemble soient relancées ensemble
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _finish(job, **fields):
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        locked_until=None, updated_time=timezone.now(), **fields
+    )
+
+
+def perform(job):
+    """Exécute une tâche réservée et enregistre son issue ; retourne le
+    nouveau statut"""
+    start = time.perf_counter()
+    try:
+        registered = HANDLERS.get(job.name)
+        if registered is None:
+            raise LookupError(f"Aucun gestionnaire pour la tâche {job.name!r}")
+        registered.function(job)
+    except LeaseLost:
+        # La tâche appartient désormais à un autre worker
+        status = "lost"
+        logger.warning("Tâche #%s abandonnée : délai de visibilité dépassé", job.pk)
+    except Exception as exc:
+        if job.attempts >= job.max_attempts:
+            status = "failed"
+            _finish(job, status=status, error=repr(exc), finished_time=timezone.now())
+        else:
+            status = "retry"
+            _finish(
+                job,
+                status="pending",
+                error=repr(exc),
+                run_after=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+            )
+        logger.exception("Échec de la tâche %s #%s (%s)", job.name, job.pk, status)
+    else:
+        status = "done"
+        _finish(job, status=status, error="", finished_time=timezone.now())
+    labels = (("queue", job.queue), ("name", job.name))
+    metrics.inc("softdesk_jobs_total", (*labels, ("outcome", status)))
+    metrics.observe(
+        "softdesk_job_duration_seconds", labels, time.perf_counter() - start
+    )
+    metrics.flush()
+    return status
+
+
+def reap():
+    """Marque en échec les tâches dont le dernier essai a dépassé son délai
+    de visibilité (worker mort sans pouvoir la replanifier)"""
+    now = timezone.now()
+    return Job.objects.filter(
+        status="running", locked_until__lt=now, attempts__gte=F("max_attempts")
+    ).update(
+        status="failed",
+        locked_until=None,
+        error="Délai de visibilité dépassé",
+        finished_time=now,
+        updated_time=now,
+    )
+
+
+def prune():
+    """Supprime les tâches terminées plus anciennes que ``RETENTION``"""
+    limit = timezone.now() - timedelta(seconds=get_setting("RETENTION"))
+    deleted, _ = Job.objects.filter(
+        status__in=("done", "failed"), finished_time__lt=limit
+    ).delete()
+    return deleted
+
+
+def retry(job_id):
+    """Replanifie immédiatement une tâche en échec"""
+    return Job.objects.filter(pk=job_id, status="failed").update(
+        status="pending",
+        attempts=0,
+        run_after=timezone.now(),
+        finished_time=None,
+        updated_time=timezone.now(),
+    )
+
+
+""" Worker """
+
+
+def work(queues=None, once=False, poll=1.0, stop=None, maintenance=60):
+    """Boucle d'un worker : réserve et exécute les tâches de ``queues`` (toutes
+    les files configurées par défaut) ; avec ``once``, s'arrête dès
+    qu'aucune tâche n'est réservable. ``stop`` (``threading.Event``) interrompt
+    la boucle entre deux tâches."""
+    stop = stop or threading.Event()
+    queues = list(queues or get_setting("QUEUES"))
+    processed = 0
+    last_maintenance = 0.0
+    offset = 0
+    while not stop.is_set():
+        if time.monotonic() - last_maintenance > maintenance:
+            reap()
+            prune()
+            last_maintenance = time.monotonic()
+        job = None
+        # Parcours tournant des files : une file chargée n'affame pas les autres
+        for index in range(len(queues)):
+            job = claim(queues[(offset + index) % len(queues)])
+            if job is not None:
+                break
+        offset += 1
+        if job is None:
+            if once:
+                break
+            stop.wait(poll)
+            continue
+        perform(job)
+        processed += 1
+    return processed
+
+
+def stats():
+    """Nombre de tâches par file et par statut"""
+    counts = {}
+    for row in Job.objects.values("queue", "status").annotate(total=Count("id")):
+        counts.setdefault(row["queue"], {})[row["status"]] = row["total"]
+    return counts
@@ -0,0 +1,447 @@
+"""
+Test de charge de ``softdesk.wsgi.application``.
+
+Des clients simulés (threads ou processus) rejouent un mélange pondéré de
+scénarios proche du trafic réel : consultation des problèmes, commentaires,
+changements de statut, ajouts de contributeurs et connexions. Les requêtes
+passent soit directement par l'application WSGI (``inprocess``), soit par un
+serveur HTTP local (``socket``). Chaque client travaille sur son propre
+projet, pour mesurer l'application plutôt que la contention sur quelques
+lignes.
+
+Le rapport (latences p50/p95/p99, requêtes par seconde, requêtes SQL) est un
+dictionnaire sérialisable en JSON, comparable à un rapport de référence.
+"""
+
+import http.client
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connections
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import metrics
+from .models import Contributor, Issue, Project, User
+
+# Scénario -> poids par défaut (sur 100 requêtes)
+DEFAULT_MIX = {
+    "list_issues": 55,
+    "post_comment": 20,
+    "update_status": 15,
+    "add_contributor": 5,
+    "login": 5,
+}
+
+PASSWORD = "Loadtest-softdesk-2024!"
+ISSUES_PER_CLIENT = 20
+CANDIDATES_PER_CLIENT = 3
+
+
+""" Transports """
+
+
+class InProcessTransport:
+    """Appelle l'application WSGI dans le thread du client"""
+
+    def __init__(self, application):
+        self.application = application
+
+    def request(self, method, path, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body).encode()
+        path, _, query = path.partition("?")
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": "127.0.0.1",
+            "HTTP_HOST": "localhost",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(payload)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(payload),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in (headers or {}).items():
+            environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+        status = []
+        result = self.application(
+            environ, lambda line, headers, exc_info=None: status.append(line)
+        )
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return int(status[0].split(" ", 1)[0])
+
+
+class SocketTransport:
+    """Envoie les requêtes à un serveur HTTP local"""
+
+    def __init__(self, address):
+        self.address = address
+
+    def request(self, method, path, body=None, headers=None):
+        connection = http.client.HTTPConnection(*self.address, timeout=60)
+        try:
+            connection.request(
+                method,
+                path,
+                None if body is None else json.dumps(body),
+                {"Content-Type": "application/json", **(headers or {})},
+            )
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(application):
+    """Démarre un serveur HTTP local multi-thread ; retourne (serveur, adresse)"""
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietRequestHandler)
+    server.daemon_threads = True
+    server.set_app(application)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[:2]
+
+
+""" Données """
+
+
+@dataclass
+class Client:
+    """Données d'un client simulé"""
+
+    username: str
+    project_id: int
+    issue_ids: list
+    candidate_ids: list
+    token: str
+    candidates: object = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.candidates = itertools.cycle(self.candidate_ids)
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+def seed(prefix, clients):
+    """Crée un utilisateur, un projet et ses problèmes par client"""
+    password = make_password(PASSWORD)
+    result = []
+    for n in range(clients):
+        users = User.objects.bulk_create(
+            User(username=f"{prefix}{n}-{k}", password=password, age=30)
+            for k in range(1 + CANDIDATES_PER_CLIENT)
+        )
+        owner = users[0]
+        project = Project.objects.create(
+            title=f"{prefix}{n}",
+            description="Projet de test de charge",
+            type="back-end",
+            author=owner,
+        )
+        Contributor.objects.create(user=owner, project=project)
+        issues = [
+            Issue.objects.create(
+                title=f"{prefix}{n}-{k}",
+                description="Problème de test de charge",
+                tag=("BUG", "FEATURE", "TASK")[k % 3],
+                project=project,
+                author=owner,
+                assigned_to=owner,
+            )
+            for k in range(ISSUES_PER_CLIENT)
+        ]
+        result.append(
+            Client(
+                username=owner.username,
+                project_id=project.pk,
+                issue_ids=[issue.pk for issue in issues],
+                candidate_ids=[user.pk for user in users[1:]],
+                token=str(AccessToken.for_user(owner)),
+            )
+        )
+    return result
+
+
+def cleanup(prefix):
+    Project.objects.filter(title__startswith=prefix).delete()
+    User.objects.filter(username__startswith=prefix).delete()
+
+
+""" Scénarios """
+
+# Chaque scénario prépare sa requête (hors mesure) et retourne
+# (méthode, chemin, corps, authentifiée, statut attendu)
+
+
+def list_issues(client, rng):
+    return "GET", "/api/issues/", None, True, 200
+
+
+def post_comment(client, rng):
+    body = {
+        "description": "Commentaire de test de charge",
+        "issue": rng.choice(client.issue_ids),
+    }
+    return "POST", "/api/comments/", body, True, 201
+
+
+def update_status(client, rng):
+    issue_id = rng.choice(client.issue_ids)
+    body = {"status": rng.choice(("To Do", "In Progress", "Finished"))}
+    return "PATCH", f"/api/issues/{issue_id}/", body, True, 200
+
+
+def add_contributor(client, rng):
+    user_id = next(client.candidates)
+    # Le candidat ne doit pas déjà contribuer au projet
+    Contributor.objects.filter(project_id=client.project_id, user_id=user_id).delete()
+    body = {"user_id": user_id, "project": client.project_id}
+    path = f"/api/projects/{client.project_id}/add_contributor/"
+    return "POST", path, body, True, 201
+
+
+def project_screen(client, rng):
+    # Écran d'un projet en une requête groupée (hors mélange par défaut)
+    issue_id = rng.choice(client.issue_ids)
+    paths = (
+        f"/api/projects/{client.project_id}/",
+        f"/api/projects/{client.project_id}/contributors/",
+        "/api/issues/",
+        f"/api/issues/{issue_id}/comments/",
+    )
+    body = {"requests": [{"method": "GET", "path": path} for path in paths]}
+    return "POST", "/api/batch/", body, True, 200
+
+
+def login(client, rng):
+    body = {"username": client.username, "password": PASSWORD}
+    return "POST", "/api/auth/token/", body, False, 200
+
+
+SCENARIOS = {
+    "list_issues": list_issues,
+    "post_comment": post_comment,
+    "update_status": update_status,
+    "add_contributor": add_contributor,
+    "project_screen": project_screen,
+    "login": login,
+}
+
+
+""" Exécution """
+
+
+def parse_mix(value):
+    """``"list_issues=50,login=5"`` -> {scénario: poids}"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Scénario inconnu : {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _queries():
+    counters, _ = metrics.snapshot()
+    return sum(
+        value
+        for (name, _), value in counters.items()
+        if name == "softdesk_db_queries_total"
+    )
+
+
+def _client_loop(transport, client, mix, requests, seed_value):
+    """Rejoue ``requests`` scénarios ; retourne {scénario: [latences, erreurs]}"""
+    rng = random.Random(seed_value)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    results = {name: [[], 0] for name in mix}
+    try:
+        for name in names:
+            method, path, body, authenticated, expected = SCENARIOS[name](client, rng)
+            headers = client.headers if authenticated else None
+            start = time.perf_counter()
+            try:
+                failed = transport.request(method, path, body, headers) != expected
+            except Exception:
+                failed = True
+            results[name][0].append(time.perf_counter() - start)
+            results[name][1] += failed
+    finally:
+        connections.close_all()
+    return results
+
+
+def _process_main(transport, client, mix, requests, seed_value, queue):
+    before = _queries()
+    results = _client_loop(transport, client, mix, requests, seed_value)
+    queue.put((results, _queries() - before))
+
+
+def run(
+    application,
+    clients,
+    mix,
+    requests,
+    workers="thread",
+    transport="inprocess",
+    seed_value=0,
+):
+    """Exécute le test de charge ; retourne le rapport"""
+    server = None
+    if transport == "socket":
+        server, address = serve(application)
+        channel = SocketTransport(address)
+    else:
+        channel = InProcessTransport(application)
+    per_client = [
+        requests // len(clients) + (index < requests % len(clients))
+        for index in range(len(clients))
+    ]
+    collected = []
+    before = _queries()
+    start = time.perf_counter()
+    try:
+        if workers == "process":
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            queue = context.Queue()
+            processes = [
+                context.Process(
+                    target=_process_main,
+                    args=(channel, client, mix, count, seed_value + index, queue),
+                )
+                for index, (client, count) in enumerate(zip(clients, per_client))
+            ]
+            for process in processes:
+                process.start()
+            child_queries = 0
+            for _ in processes:
+                results, queries = queue.get()
+                collected.append(results)
+                child_queries += queries
+            for process in processes:
+                process.join()
+        else:
+            child_queries = 0
+
+            def target(index, client, count):
+                collected.append(
+                    _client_loop(channel, client, mix, count, seed_value + index)
+                )
+
+            threads = [
+                threading.Thread(target=target, args=(index, client, count))
+                for index, (client, count) in enumerate(zip(clients, per_client))
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    queries = _queries() - before + child_queries
+    return report(collected, elapsed, queries)
+
+
+""" Rapport """
+
+
+def percentile(values, rank):
+    """Percentile « nearest rank » de ``values`` triées"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(rank / 100 * len(values)) - 1))]
+
+
+def _summary(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def report(collected, elapsed, queries):
+    scenarios = {}
+    everything, errors = [], 0
+    for results in collected:
+        for name, (latencies, failed) in results.items():
+            merged = scenarios.setdefault(name, [[], 0])
+            merged[0].extend(latencies)
+            merged[1] += failed
+            everything.extend(latencies)
+            errors += failed
+    total = _summary(everything, errors, elapsed)
+    total["seconds"] = round(elapsed, 2)
+    total["queries"] = queries
+    total["queries_per_request"] = round(queries / max(len(everything), 1), 2)
+    return {
+        "total": total,
+        "scenarios": {
+            name: _summary(latencies, failed, elapsed)
+            for name, (latencies, failed) in sorted(scenarios.items())
+        },
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Régressions de ``current`` par rapport à ``baseline`` : latence p95 ou
+    requêtes SQL par requête en hausse, débit en baisse, au-delà de
+    ``tolerance`` (fraction)"""
+    regressions = []
+    sections = [("total", current["total"], baseline.get("total", {}))]
+    sections += [
+        (name, values, baseline.get("scenarios", {}).get(name))
+        for name, values in current["scenarios"].items()
+    ]
+    for name, values, reference in sections:
+        if not reference:
+            continue
+        for key, worse in (
+            ("p95_ms", 1),
+            ("queries_per_request", 1),
+            ("rps", -1),
+        ):
+            if key not in values or not reference.get(key):
+                continue
+            change = (values[key] - reference[key]) / reference[key]
+            if change * worse > tolerance:
+                regressions.append((name, key, reference[key], values[key], change))
+    return regressions
@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from supports_api import archive, jobs
+from supports_api.models import ArchivedIssue, Job
+
+
+class Command(BaseCommand):
+    """Archive les problèmes terminés anciens, ou restaure des problèmes archivés"""
+
+    help = (
+        "Déplace les problèmes « Finished » non modifiés depuis --older-than jours "
+        "(SOFTDESK_ARCHIVE['AGE_DAYS'] par défaut), et leurs commentaires, dans les "
+        "tables d'archive. --restore replace des problèmes archivés dans les "
+        "tables chaudes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, metavar="DAYS")
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Affiche le nombre de problèmes archivables sans rien déplacer.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Confie l'archivage à la file de tâches (run_worker).",
+        )
+        parser.add_argument(
+            "--restore",
+            type=int,
+            nargs="+",
+            metavar="ID",
+            help="Problèmes à restaurer.",
+        )
+        parser.add_argument(
+            "--restore-project",
+            type=int,
+            metavar="PROJECT",
+            help="Restaure tous les problèmes archivés d'un projet.",
+        )
+
+    def handle(self, *args, **options):
+        if options["restore"] or options["restore_project"]:
+            ids = list(options["restore"] or [])
+            if options["restore_project"]:
+                ids += ArchivedIssue.objects.filter(
+                    project_id=options["restore_project"]
+                ).values_list("id", flat=True)
+            restored = archive.restore(ids)
+            if not restored:
+                raise CommandError("Aucun problème archivé correspondant.")
+            self.stdout.write(
+                self.style.SUCCESS(f"{restored} problème(s) restauré(s).")
+            )
+            return
+
+        before = archive.cutoff(options["older_than"])
+        if options["dry_run"]:
+            count = archive.eligible(before).count()
+            self.stdout.write(f"{count} problème(s) archivable(s).")
+            return
+
+        if options["background"]:
+            if Job.objects.filter(
+                name="archive.run", status__in=("pending", "running")
+            ).exists():
+                self.stdout.write("Archivage déjà programmé.")
+                return
+            job = jobs.enqueue("archive.run", {"age_days": options["older_than"]})
+            self.stdout.write(self.style.SUCCESS(f"Archivage programmé (#{job.pk})."))
+            return
+
+        issues, comments = archive.run(before, options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{issues} problème(s) et {comments} commentaire(s) archivé(s)."
+            )
+        )
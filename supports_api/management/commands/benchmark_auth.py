@@ -0,0 +1,165 @@
+import itertools
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from supports_api import hashing
+from supports_api.models import User
+from supports_api.serializers import UserCreateSerializer
+
+PREFIX = "benchmark-auth-"
+PASSWORD = "Benchmark-auth-2024!"
+
+
+class Command(BaseCommand):
+    """Mesure le débit de connexion et d'inscription"""
+
+    help = (
+        "Mesure le débit d'obtention de token (connexion) et de création de "
+        "compte (inscription) pour chaque profil de hachage et nombre de "
+        "threads clients, par cœur et au total. Vérifie que la connexion "
+        "réhache le mot de passe au coût du profil. Les comptes créés sont "
+        "supprimés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=40)
+        parser.add_argument("--registrations", type=int, default=20)
+        parser.add_argument(
+            "--threads",
+            default="1,2,4",
+            help="Nombres de threads clients à comparer, séparés par des virgules.",
+        )
+        parser.add_argument(
+            "--profiles",
+            default=hashing.get_setting("PROFILE"),
+            help="Profils de SOFTDESK_HASHING à comparer, séparés par des virgules.",
+        )
+        parser.add_argument(
+            "--pool-size", type=int, help="Taille du pool (POOL_SIZE par défaut)."
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"].split(",")
+        unknown = set(profiles) - set(hashing.get_setting("PROFILES"))
+        if unknown:
+            raise CommandError(f"Profil(s) inconnu(s) : {', '.join(sorted(unknown))}")
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError(f"Des comptes « {PREFIX}* » existent déjà.")
+        threads = [int(value) for value in options["threads"].split(",")]
+        cores = os.cpu_count() or 1
+        self.sequence = itertools.count()
+        self.stdout.write(f"{cores} cœur(s)")
+        user = User.objects.create_user(f"{PREFIX}login", password=PASSWORD, age=30)
+        try:
+            for profile in profiles:
+                config = {
+                    **hashing.DEFAULTS,
+                    **getattr(settings, "SOFTDESK_HASHING", {}),
+                    "PROFILE": profile,
+                }
+                if options["pool_size"]:
+                    config["POOL_SIZE"] = options["pool_size"]
+                with override_settings(SOFTDESK_HASHING=config):
+                    hashing.reset_pool()
+                    self._check_rehash(user, profile)
+                    for count in threads:
+                        self._report(
+                            profile,
+                            "connexion",
+                            count,
+                            cores,
+                            *self._run(self._login, options["logins"], count),
+                        )
+                        self._report(
+                            profile,
+                            "inscription",
+                            count,
+                            cores,
+                            *self._run(self._register, options["registrations"], count),
+                        )
+        finally:
+            hashing.reset_pool()
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+    def _check_rehash(self, user, profile):
+        self._login(0)
+        user.refresh_from_db(fields=["password"])
+        stored = int(user.password.split("$")[1])
+        if stored != hashing.iterations():
+            raise CommandError(
+                f"Mot de passe non réhaché : {stored} itérations au lieu de "
+                f"{hashing.iterations()}."
+            )
+        self.stdout.write(f"{profile} : {stored} itérations, réhachage vérifié")
+
+    def _login(self, n):
+        serializer = TokenObtainPairSerializer(
+            data={"username": f"{PREFIX}login", "password": PASSWORD}
+        )
+        if not serializer.is_valid():
+            raise CommandError(f"Connexion refusée : {serializer.errors}")
+
+    def _register(self, n):
+        serializer = UserCreateSerializer(
+            data={
+                "username": f"{PREFIX}{next(self.sequence)}",
+                "email": f"benchmark{n}@example.com",
+                "password": PASSWORD,
+                "password_confirm": PASSWORD,
+                "age": 30,
+            }
+        )
+        if not serializer.is_valid():
+            raise CommandError(f"Inscription refusée : {serializer.errors}")
+        serializer.save()
+
+    def _run(self, operation, total, count):
+        """Exécute ``total`` opérations réparties sur ``count`` threads ;
+        retourne (opérations réussies, durée, refus)"""
+        counter = iter(range(total))
+        lock = threading.Lock()
+        rejected = []
+        errors = []
+
+        def work():
+            try:
+                while True:
+                    with lock:
+                        n = next(counter, None)
+                    if n is None:
+                        return
+                    try:
+                        operation(n)
+                    except hashing.HashingBusy:
+                        rejected.append(n)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=work) for _ in range(count)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise CommandError(str(errors[0]))
+        return total - len(rejected), elapsed, len(rejected)
+
+    def _report(self, profile, label, count, cores, done, elapsed, rejected):
+        rate = done / elapsed
+        self.stdout.write(
+            f"{profile:<12} {label:<12} {count} thread(s) : {rate:7.1f}/s, "
+            f"{rate / min(count, cores):7.1f}/s par cœur, "
+            f"{elapsed * 1000 / max(done, 1):7.1f} ms par opération"
+            + (f", {rejected} refus (pool saturé)" if rejected else "")
+        )
@@ -0,0 +1,87 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from supports_api import autocomplete
+from supports_api.models import Contributor, Project, User
+
+
+class Rollback(Exception):
+    """Annule les données de test à la fin du benchmark"""
+
+
+class Command(BaseCommand):
+    """Mesure les suggestions d'utilisateurs sur un grand nombre de comptes"""
+
+    help = (
+        "Crée --users utilisateurs, puis mesure les suggestions par préfixe "
+        "(nom ou email, avec et sans projet) pour des préfixes de 1 à 4 "
+        "caractères. Les données créées sont annulées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                project = self._seed(options["users"], options["batch_size"])
+                self._measure(project, options["repeat"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _seed(self, users, batch_size):
+        rng = random.Random(0)
+        letters = string.ascii_lowercase
+        start = time.perf_counter()
+        for offset in range(0, users, batch_size):
+            User.objects.bulk_create(
+                User(
+                    username=f"{''.join(rng.choices(letters, k=6))}-bench-{n}",
+                    email=f"{''.join(rng.choices(letters, k=5))}{n}@bench.example",
+                    password="!",
+                    age=30,
+                )
+                for n in range(offset, min(offset + batch_size, users))
+            )
+        members = list(User.objects.filter(username__contains="-bench-")[:50])
+        project = Project.objects.create(
+            title="bench-autocomplete",
+            description="Projet de benchmark",
+            type="back-end",
+            author=members[0],
+        )
+        Contributor.objects.bulk_create(
+            Contributor(user=user, project=project) for user in members
+        )
+        if connection.vendor == "sqlite":
+            # Statistiques à jour pour le planificateur
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.stdout.write(
+            f"{users} utilisateurs créés en {time.perf_counter() - start:.1f} s"
+        )
+        return project
+
+    def _measure(self, project, repeat):
+        rng = random.Random(1)
+        self.stdout.write(f"{'préfixe':<10} {'projet':<7} {'p50 ms':>8} {'max ms':>8}")
+        for length in (1, 2, 3, 4):
+            for project_id in (None, project.pk):
+                timings = []
+                for _ in range(repeat):
+                    prefix = "".join(rng.choices(string.ascii_lowercase, k=length))
+                    start = time.perf_counter()
+                    autocomplete.suggest(prefix, project_id=project_id)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"{length} car.{'':<4} {'oui' if project_id else 'non':<7} "
+                    f"{timings[len(timings) // 2]:>8.2f} {timings[-1]:>8.2f}"
+                )
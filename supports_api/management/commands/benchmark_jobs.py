@@ -0,0 +1,75 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from supports_api import jobs
+from supports_api.models import Job
+
+
+class Command(BaseCommand):
+    """Mesure le débit de la file de tâches d'arrière-plan"""
+
+    help = (
+        "Crée des tâches vides dans la file « benchmark », puis mesure le débit "
+        "de mise en file et d'exécution pour différents nombres de workers. "
+        "Vérifie qu'aucune tâche n'est exécutée deux fois. Les tâches créées "
+        "sont supprimées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            default="1,2,4",
+            help="Nombres de workers (threads) à comparer, séparés par des virgules.",
+        )
+
+    def handle(self, *args, **options):
+        counts = [int(value) for value in options["workers"].split(",")]
+        if Job.objects.filter(queue="benchmark").exists():
+            raise CommandError("La file « benchmark » n'est pas vide.")
+        try:
+            for workers in counts:
+                self._run(options["jobs"], workers)
+        finally:
+            Job.objects.filter(queue="benchmark").delete()
+
+    def _run(self, total, workers):
+        start = time.perf_counter()
+        with transaction.atomic():
+            for n in range(total):
+                jobs.enqueue("jobs.noop", {"n": n})
+        enqueue_rate = total / (time.perf_counter() - start)
+
+        queues = {**jobs.get_setting("QUEUES"), "benchmark": {"CONCURRENCY": workers}}
+        with override_settings(SOFTDESK_JOBS={**jobs.DEFAULTS, "QUEUES": queues}):
+
+            def work():
+                try:
+                    jobs.work(["benchmark"], once=True, maintenance=float("inf"))
+                finally:
+                    connection.close()
+
+            threads = [threading.Thread(target=work) for _ in range(workers)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+        benchmark = Job.objects.filter(queue="benchmark")
+        done = benchmark.filter(status="done", attempts=1).count()
+        self.stdout.write(
+            f"{workers} worker(s) : mise en file {enqueue_rate:8.0f} tâches/s, "
+            f"exécution {total / elapsed:8.0f} tâches/s "
+            f"({elapsed * 1000 / total:.2f} ms par tâche)"
+        )
+        benchmark.delete()
+        if done != total:
+            raise CommandError(
+                f"{total - done} tâche(s) non exécutée(s) ou exécutée(s) plusieurs fois."
+            )
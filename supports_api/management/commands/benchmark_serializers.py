@@ -0,0 +1,165 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from supports_api import fast_serializers, fieldsets
+from supports_api.models import Comment, Contributor, Issue, Project, User
+from supports_api.serializers import CommentSerializer, IssueSerializer
+
+
+class Rollback(Exception):
+    """Annule les données de test à la fin du benchmark"""
+
+
+class Command(BaseCommand):
+    """Compare la sérialisation standard et la sérialisation compilée"""
+
+    help = (
+        "Mesure la sérialisation d'une page de problèmes et de commentaires "
+        "(ModelSerializer vs sérialiseur compilé) et vérifie que le JSON produit "
+        "est identique octet pour octet. Sans --fields ni --expand, les objets "
+        "liés sont sérialisés en entier. Les données créées sont annulées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--fields", default=None, help="Sélection ?fields= (forme de l'API)."
+        )
+        parser.add_argument(
+            "--expand", default=None, help="Sélection ?expand= (forme de l'API)."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options["rows"])
+                failures = [
+                    self._compare(label, queryset, serializer_class, options)
+                    for label, queryset, serializer_class in (
+                        (
+                            "issues",
+                            Issue.objects.filter(title__startswith="bench-"),
+                            IssueSerializer,
+                        ),
+                        (
+                            "comments",
+                            Comment.objects.filter(description__startswith="bench-"),
+                            CommentSerializer,
+                        ),
+                    )
+                ]
+                raise Rollback(failures)
+        except Rollback as rollback:
+            failures = [label for label in rollback.args[0] if label]
+        if failures:
+            raise CommandError(f"Sortie différente pour : {', '.join(failures)}")
+
+    def _seed(self, rows):
+        """Crée un jeu de données réaliste : quelques auteurs et projets"""
+        users = [
+            User.objects.create_user(f"bench-user-{n}", f"bench{n}@example.com", age=30)
+            for n in range(5)
+        ]
+        projects = []
+        for n in range(3):
+            project = Project.objects.create(
+                title=f"bench-project-{n}",
+                description="Projet de benchmark",
+                type="back-end",
+                author=users[n],
+            )
+            Contributor.objects.bulk_create(
+                Contributor(user=user, project=project) for user in users
+            )
+            projects.append(project)
+        issues = Issue.objects.bulk_create(
+            Issue(
+                title=f"bench-issue-{n}",
+                description="Description du problème " * 5,
+                priority=("LOW", "MEDIUM", "HIGH")[n % 3],
+                tag=("BUG", "FEATURE", "TASK")[n % 3],
+                project=projects[n % len(projects)],
+                author=users[n % len(users)],
+                assigned_to=users[(n + 1) % len(users)] if n % 4 else None,
+            )
+            for n in range(rows)
+        )
+        Comment.objects.bulk_create(
+            Comment(
+                description=f"bench-comment-{n}",
+                issue=issues[n % len(issues)],
+                author=users[n % len(users)],
+            )
+            for n in range(rows)
+        )
+
+    def _timeit(self, function, repeat):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    def _compare(self, label, queryset, serializer_class, options):
+        queryset = queryset.order_by("id")
+        renderer = JSONRenderer()
+        context = {}
+        if options["fields"] is not None or options["expand"] is not None:
+            context["selection"] = fieldsets.Selection(
+                fieldsets.parse(options["fields"]), fieldsets.parse(options["expand"])
+            )
+        compiled = fast_serializers.compile_serializer(serializer_class, context)
+        if compiled is None:
+            raise CommandError(f"{serializer_class.__name__} n'est pas compilable")
+
+        def standard():
+            return serializer_class(queryset, many=True, context=context).data
+
+        def fast():
+            return compiled.serialize(compiled.values(queryset))
+
+        identical = renderer.render(standard()) == renderer.render(fast())
+
+        # Sérialisation seule, objets/lignes déjà chargés en mémoire
+        related = {
+            "issues": ("project__author", "author", "assigned_to"),
+            "comments": (
+                "author",
+                "issue__project__author",
+                "issue__author",
+                "issue__assigned_to",
+            ),
+        }[label]
+        instances = list(queryset.select_related(*related))
+        rows = list(compiled.values(queryset))
+
+        timings = {
+            "ORM + ModelSerializer": self._timeit(standard, options["repeat"]),
+            "values_list + compilé": self._timeit(fast, options["repeat"]),
+            "ModelSerializer (objets chargés)": self._timeit(
+                lambda: serializer_class(instances, many=True, context=context).data,
+                options["repeat"],
+            ),
+            "compilé (lignes chargées)": self._timeit(
+                lambda: compiled.serialize(rows), options["repeat"]
+            ),
+        }
+        self.stdout.write(f"\n{label} ({len(rows)} lignes)")
+        for name, duration in timings.items():
+            self.stdout.write(f"  {name:<34} {duration:8.2f} ms")
+        self.stdout.write(
+            "  accélération bout en bout : "
+            f"x{timings['ORM + ModelSerializer'] / timings['values_list + compilé']:.1f}"
+            ", sérialisation seule : "
+            f"x{timings['ModelSerializer (objets chargés)'] / timings['compilé (lignes chargées)']:.1f}"
+        )
+        if identical:
+            self.stdout.write(self.style.SUCCESS("  JSON identique"))
+            return None
+        self.stdout.write(self.style.ERROR("  JSON différent"))
+        return label
@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Démarrage d'un worker : configuration, application WSGI et URLconf
+BOOT_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+print(json.dumps({"boot_ms": elapsed * 1000, "rss_kb": rss, "modules": len(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr):
+    """Temps d'import propre (µs) par paquet de premier niveau"""
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us)
+    return packages
+
+
+class Command(BaseCommand):
+    """Mesure le démarrage d'un worker pour un ou plusieurs profils de réglages"""
+
+    help = (
+        "Démarre un worker dans un processus neuf (python -X importtime) et "
+        "rapporte le temps de démarrage, la mémoire résidente maximale, le nombre "
+        "de modules chargés et les paquets les plus coûteux à importer. Exemple : "
+        "boot_report softdesk.settings softdesk.settings_api"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "settings_modules",
+            nargs="*",
+            help="Modules de réglages à comparer (par défaut le profil courant).",
+        )
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Sortie JSON, pour suivre l'évolution d'une version à l'autre.",
+        )
+
+    def handle(self, *args, **options):
+        modules = options["settings_modules"] or [
+            os.environ.get("DJANGO_SETTINGS_MODULE", "softdesk.settings")
+        ]
+        reports = {
+            module: self._measure(module, max(1, options["runs"])) for module in modules
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(reports, indent=2))
+            return
+
+        for module, report in reports.items():
+            self.stdout.write(self.style.SUCCESS(f"\n{module}"))
+            self.stdout.write(
+                f"  démarrage   {report['boot_ms']:8.1f} ms (meilleur de "
+                f"{options['runs']})\n"
+                f"  mémoire     {report['rss_kb'] / 1024:8.1f} Mo (RSS max)\n"
+                f"  modules     {report['modules']:8d}\n"
+                f"  imports     {report['import_ms']:8.1f} ms"
+            )
+            for package, duration in list(report["packages"].items())[: options["top"]]:
+                self.stdout.write(f"    {package:<28} {duration:8.1f} ms")
+
+    def _measure(self, module, runs):
+        environment = {**os.environ, "DJANGO_SETTINGS_MODULE": module}
+        best = None
+        for _ in range(runs):
+            process = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+                cwd=settings.BASE_DIR,
+                env=environment,
+                capture_output=True,
+                text=True,
+            )
+            if process.returncode != 0:
+                raise CommandError(
+                    f"Échec du démarrage avec {module} :\n{process.stderr[-2000:]}"
+                )
+            report = json.loads(process.stdout.strip().splitlines()[-1])
+            if best is None or report["boot_ms"] < best["boot_ms"]:
+                packages = parse_importtime(process.stderr)
+                report["import_ms"] = sum(packages.values()) / 1000
+                report["packages"] = {
+                    package: duration / 1000
+                    for package, duration in sorted(
+                        packages.items(), key=lambda item: item[1], reverse=True
+                    )
+                }
+                best = report
+        best["boot_ms"] = round(best["boot_ms"], 1)
+        return best
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from supports_api import schema
+
+
+class Command(BaseCommand):
+    """Précalcule le schéma OpenAPI servi sur /api/schema/"""
+
+    help = (
+        "Génère le schéma OpenAPI de la version courante du code (YAML, JSON et "
+        "leurs versions gzip). À lancer au déploiement, avant le démarrage des "
+        "workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-missing",
+            action="store_true",
+            help="Ne régénère pas un schéma déjà présent pour cette version.",
+        )
+
+    def handle(self, *args, **options):
+        version = schema.code_version()
+        if options["if_missing"] and schema.is_generated(version):
+            self.stdout.write(f"Schéma déjà généré (version {version}).")
+            return
+        paths = schema.generate()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Schéma généré (version {version}) : "
+                + ", ".join(str(path) for path in paths)
+            )
+        )
@@ -0,0 +1,151 @@
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from supports_api import loadtest
+
+
+class Command(BaseCommand):
+    """Test de charge de l'application WSGI"""
+
+    help = (
+        "Rejoue un mélange pondéré de scénarios (connexion, liste des problèmes, "
+        "commentaire, changement de statut, ajout de contributeur, écran de projet "
+        "en requête groupée) contre "
+        "softdesk.wsgi.application, en direct ou via un serveur HTTP local, avec "
+        "des clients threads ou processus. Affiche latences p50/p95/p99, débit et "
+        "requêtes SQL, et compare à un rapport de référence. Les données créées "
+        "sont supprimées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--clients", type=int, default=4, help="Clients simultanés."
+        )
+        parser.add_argument(
+            "--workers", choices=("thread", "process"), default="thread"
+        )
+        parser.add_argument(
+            "--transport",
+            choices=("inprocess", "socket"),
+            default="inprocess",
+            help="Appel direct de l'application WSGI ou serveur HTTP local.",
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join(
+                f"{name}={weight}" for name, weight in loadtest.DEFAULT_MIX.items()
+            ),
+            help="Poids des scénarios, par exemple list_issues=50,login=5.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", metavar="PATH", help="Enregistre le rapport JSON."
+        )
+        parser.add_argument(
+            "--baseline",
+            metavar="PATH",
+            help="Rapport de référence ; code de sortie non nul en cas de régression.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Écart toléré par rapport à la référence (fraction).",
+        )
+        parser.add_argument(
+            "--throttle",
+            action="store_true",
+            help="Conserve la limitation de débit (désactivée par défaut).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = loadtest.parse_mix(options["mix"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        baseline = None
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+
+        from softdesk.wsgi import application
+
+        overrides = {
+            "SOFTDESK_PERF": {**getattr(settings, "SOFTDESK_PERF", {}), "LOG": False}
+        }
+        if not options["throttle"]:
+            overrides["SOFTDESK_THROTTLE"] = {
+                **getattr(settings, "SOFTDESK_THROTTLE", {}),
+                "ENABLED": False,
+            }
+        prefix = f"loadtest-{os.getpid()}-"
+        try:
+            clients = loadtest.seed(prefix, options["clients"])
+            with override_settings(**overrides):
+                report = loadtest.run(
+                    application,
+                    clients,
+                    mix,
+                    options["requests"],
+                    workers=options["workers"],
+                    transport=options["transport"],
+                    seed_value=options["seed"],
+                )
+        finally:
+            loadtest.cleanup(prefix)
+
+        report["config"] = {
+            key: options[key]
+            for key in ("requests", "clients", "workers", "transport", "mix", "seed")
+        }
+        self._print(report)
+        if options["output"]:
+            path = Path(options["output"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Rapport enregistré : {path}")
+        if baseline is not None:
+            self._compare(report, baseline, options["tolerance"])
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{'scénario':<16} {'requêtes':>8} {'erreurs':>7} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        rows = [*report["scenarios"].items(), ("total", report["total"])]
+        for name, values in rows:
+            self.stdout.write(
+                f"{name:<16} {values['requests']:>8} {values['errors']:>7} "
+                f"{values['rps']:>8.1f} {values['p50_ms']:>8.2f} "
+                f"{values['p95_ms']:>8.2f} {values['p99_ms']:>8.2f}"
+            )
+        total = report["total"]
+        self.stdout.write(
+            f"{total['seconds']} s, {total['queries']} requêtes SQL "
+            f"({total['queries_per_request']} par requête)"
+        )
+
+    def _compare(self, report, baseline, tolerance):
+        if baseline.get("config") != report["config"]:
+            self.stderr.write(
+                "Attention : la référence a été mesurée avec d'autres paramètres."
+            )
+        regressions = loadtest.compare(report, baseline, tolerance)
+        if not regressions:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Aucune régression au-delà de {tolerance:.0%} par rapport à la "
+                    "référence."
+                )
+            )
+            return
+        for name, key, before, after, change in regressions:
+            self.stderr.write(f"  {name} {key} : {before} -> {after} ({change:+.0%})")
+        raise CommandError(
+            f"{len(regressions)} régression(s) par rapport à la référence."
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from supports_api import sync
+
+
+class Command(BaseCommand):
+    """Purge les traces de suppression au-delà de la rétention"""
+
+    help = "Supprime les traces de suppression plus anciennes que SOFTDESK_SYNC."
+
+    def handle(self, *args, **options):
+        deleted = sync.prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} trace(s) supprimée(s)."))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from supports_api import jobs, search
+from supports_api.models import Job
+
+
+class Command(BaseCommand):
+    """Reconstruit ou vérifie l'index de recherche plein texte"""
+
+    help = "Reconstruit l'index FTS5 des problèmes et commentaires."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Vérifie l'index sans le reconstruire (code de sortie non nul si "
+            "l'index est incohérent).",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Confie la reconstruction à la file de tâches (run_worker search).",
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("L'index FTS5 n'est disponible que sur SQLite.")
+
+        if options["check"]:
+            try:
+                indexed, expected = search.check_index()
+            except DatabaseError as exc:
+                raise CommandError(f"Index corrompu : {exc}")
+            if indexed != expected:
+                raise CommandError(
+                    f"Index désynchronisé : {indexed} entrées pour {expected} objets. "
+                    "Lancez la commande sans --check pour le reconstruire."
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f"Index cohérent ({indexed} entrées).")
+            )
+            return
+
+        if options["background"]:
+            if Job.objects.filter(
+                name="search.rebuild", status__in=("pending", "running")
+            ).exists():
+                self.stdout.write("Reconstruction déjà programmée.")
+                return
+            job = jobs.enqueue("search.rebuild")
+            self.stdout.write(
+                self.style.SUCCESS(f"Reconstruction programmée (#{job.pk}).")
+            )
+            return
+
+        total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Index reconstruit ({total} entrées)."))
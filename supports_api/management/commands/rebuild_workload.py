@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from supports_api import jobs, workload
+from supports_api.models import Job
+
+
+class Command(BaseCommand):
+    """Reconstruit ou vérifie la synthèse des charges de travail"""
+
+    help = (
+        "Recalcule la table WorkloadSummary depuis les problèmes, ou la compare "
+        "au recalcul avec --check."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Vérifie la synthèse sans la reconstruire (code de sortie non nul "
+            "si elle diverge).",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Confie la reconstruction à la file de tâches (run_worker).",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            differences = workload.check()
+            if differences:
+                for key, (stored, expected) in sorted(
+                    differences.items(), key=lambda item: str(item[0])
+                )[:20]:
+                    role, user_id, project_id, status, priority = key
+                    self.stderr.write(
+                        f"  {role} utilisateur {user_id} projet {project_id} "
+                        f"{status}/{priority} : {stored} au lieu de {expected}"
+                    )
+                raise CommandError(
+                    f"Synthèse désynchronisée : {len(differences)} ligne(s). "
+                    "Lancez la commande sans --check pour la reconstruire."
+                )
+            self.stdout.write(self.style.SUCCESS("Synthèse cohérente."))
+            return
+
+        if options["background"]:
+            if Job.objects.filter(
+                name="workload.rebuild", status__in=("pending", "running")
+            ).exists():
+                self.stdout.write("Reconstruction déjà programmée.")
+                return
+            job = jobs.enqueue("workload.rebuild")
+            self.stdout.write(
+                self.style.SUCCESS(f"Reconstruction programmée (#{job.pk}).")
+            )
+            return
+
+        rows = workload.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Synthèse reconstruite ({rows} lignes)."))
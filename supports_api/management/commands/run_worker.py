@@ -0,0 +1,98 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from supports_api import jobs
+
+
+class Command(BaseCommand):
+    """Worker de la file de tâches d'arrière-plan"""
+
+    help = (
+        "Réserve et exécute les tâches d'arrière-plan stockées en base "
+        "(suppressions, réindexation, ...). Plusieurs workers peuvent tourner "
+        "en parallèle : la limite de concurrence de chaque file est globale. "
+        "SIGINT/SIGTERM arrêtent le worker après la tâche en cours."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "queues",
+            nargs="*",
+            help="Files à traiter (par défaut toutes les files configurées).",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=1,
+            help="Nombre de tâches exécutées en parallèle par ce processus.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="S'arrête lorsqu'aucune tâche n'est réservable au lieu d'attendre.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1.0,
+            help="Attente entre deux scrutations d'une file vide (s).",
+        )
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Affiche le nombre de tâches par file et par statut et quitte.",
+        )
+        parser.add_argument(
+            "--retry",
+            type=int,
+            metavar="ID",
+            help="Replanifie immédiatement la tâche en échec ID et quitte.",
+        )
+
+    def handle(self, *args, **options):
+        jobs.autodiscover()
+
+        if options["status"]:
+            for queue, counts in sorted(jobs.stats().items()):
+                detail = ", ".join(f"{status} {n}" for status, n in counts.items())
+                self.stdout.write(f"{queue:<12} {detail}")
+            return
+
+        if options["retry"] is not None:
+            if not jobs.retry(options["retry"]):
+                raise CommandError(f"Aucune tâche en échec #{options['retry']}.")
+            self.stdout.write(self.style.SUCCESS("Tâche replanifiée."))
+            return
+
+        queues = options["queues"] or list(jobs.get_setting("QUEUES"))
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        processed = []
+
+        def work():
+            try:
+                processed.append(
+                    jobs.work(queues, options["once"], options["poll"], stop)
+                )
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=work, name=f"worker-{n}")
+            for n in range(max(1, options["threads"]))
+        ]
+        self.stdout.write(
+            f"Worker démarré : files {', '.join(queues)}, {len(threads)} thread(s)."
+        )
+        for thread in threads:
+            thread.start()
+        # join() avec délai : laisse le thread principal recevoir les signaux
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+        self.stdout.write(self.style.SUCCESS(f"{sum(processed)} tâche(s) exécutée(s)."))
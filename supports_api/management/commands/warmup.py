@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from supports_api import warmup
+
+
+class Command(BaseCommand):
+    """Exécute le préchauffage et affiche la durée de chaque étape"""
+
+    help = (
+        "Préchauffe le processus comme au démarrage d'un worker (routes, "
+        "sérialiseurs, JWT, connexions, caches) et affiche la durée de chaque "
+        "étape. Utile pour vérifier le préchauffage et générer les caches "
+        "(schéma OpenAPI) avant le démarrage des workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-caches",
+            action="store_true",
+            help="Ne précharge pas les caches applicatifs.",
+        )
+
+    def handle(self, *args, **options):
+        timings = warmup.warmup(caches=not options["no_caches"])
+        for step, duration in timings.items():
+            self.stdout.write(f"  {step:<12} {duration:8.2f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Préchauffage terminé en {sum(timings.values()):.2f} ms."
+            )
+        )
@@ -0,0 +1,390 @@
+"""
+Métriques au format Prometheus, agrégées sans collecteur externe.
+
+Chaque thread incrémente ses propres compteurs (aucun verrou sur le chemin
+chaud) ; la lecture fusionne les fragments de tous les threads. Pour les
+déploiements multi-processus, chaque worker écrit périodiquement son
+instantané dans ``SOFTDESK_METRICS["DIRECTORY"]`` (un fichier JSON par PID,
+remplacé atomiquement) et ``/api/metrics/`` additionne ces fichiers à
+l'instantané vivant du processus qui répond.
+
+Les compteurs d'un worker arrêté sont reportés dans ``retired.json`` puis son
+fichier est supprimé : les totaux restent monotones malgré les redémarrages.
+Le répertoire doit être local à la machine (les PID y sont vérifiés par
+``os.kill(pid, 0)``).
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+
+DEFAULTS = {
+    "ENABLED": True,
+    "DIRECTORY": None,
+    "FLUSH_INTERVAL": 5,
+    # Jeton du collecteur (en-tête ``Authorization: Bearer <jeton>``)
+    "TOKEN": None,
+    # Adresses admises sans jeton ; vide par défaut, REMOTE_ADDR n'étant
+    # fiable que sans proxy devant l'application
+    "INTERNAL_IPS": [],
+}
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# nom -> (type, description)
+METRICS = {
+    "softdesk_http_requests_total": (
+        "counter",
+        "Requêtes HTTP par action de vue, méthode et code de statut",
+    ),
+    "softdesk_http_request_duration_seconds": (
+        "histogram",
+        "Durée des requêtes HTTP par action de vue",
+    ),
+    "softdesk_db_queries_total": (
+        "counter",
+        "Requêtes SQL exécutées par action de vue",
+    ),
+    "softdesk_cache_requests_total": (
+        "counter",
+        "Lectures de cache par cache et résultat (hit/miss)",
+    ),
+    "softdesk_cache_hit_ratio": (
+        "gauge",
+        "Taux de succès des lectures de cache",
+    ),
+    "softdesk_jwt_auth_failures_total": (
+        "counter",
+        "Échecs d'authentification JWT par motif",
+    ),
+    "softdesk_throttled_requests_total": (
+        "counter",
+        "Requêtes refusées par limitation de débit, par budget",
+    ),
+    "softdesk_jobs_total": (
+        "counter",
+        "Tâches d'arrière-plan exécutées par file, tâche et issue",
+    ),
+    "softdesk_job_duration_seconds": (
+        "histogram",
+        "Durée d'exécution des tâches d'arrière-plan",
+    ),
+    "softdesk_password_hashing_seconds": (
+        "histogram",
+        "Durée des hachages de mot de passe (attente du pool comprise)",
+    ),
+    "softdesk_password_hashing_rejected_total": (
+        "counter",
+        "Hachages refusés, pool de hachage saturé",
+    ),
+    "softdesk_batch_subrequests_total": (
+        "counter",
+        "Sous-requêtes des requêtes groupées par action de vue, méthode et statut",
+    ),
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_METRICS", {}).get(name, DEFAULTS[name])
+
+
+class _Shard:
+    """Compteurs d'un thread"""
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        # clé -> [compteurs par bucket..., somme, nombre]
+        self.histograms = {}
+
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+
+
+def _shard():
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append(shard)
+        return shard
+
+
+def inc(name, labels=(), value=1):
+    """Incrémente un compteur ; ``labels`` est un tuple de paires (clé, valeur)"""
+    counters = _shard().counters
+    key = (name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name, labels, value, buckets=DURATION_BUCKETS):
+    """Ajoute une observation à un histogramme"""
+    histograms = _shard().histograms
+    key = (name, labels)
+    state = histograms.get(key)
+    if state is None:
+        state = histograms[key] = [0] * (len(buckets) + 2)
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            state[index] += 1
+            break
+    state[-2] += value
+    state[-1] += 1
+
+
+def cache_hit(cache_name):
+    inc("softdesk_cache_requests_total", (("cache", cache_name), ("result", "hit")))
+
+
+def cache_miss(cache_name):
+    inc("softdesk_cache_requests_total", (("cache", cache_name), ("result", "miss")))
+
+
+def auth_failure(reason):
+    inc("softdesk_jwt_auth_failures_total", (("reason", reason),))
+
+
+""" Agrégation """
+
+
+def snapshot():
+    """Fusion des fragments de tous les threads du processus"""
+    counters, histograms = {}, {}
+    with _shards_lock:
+        shards = list(_shards)
+    for shard in shards:
+        for key, value in shard.counters.copy().items():
+            counters[key] = counters.get(key, 0) + value
+        for key, state in shard.histograms.copy().items():
+            merged = histograms.setdefault(key, [0] * len(state))
+            for index, value in enumerate(list(state)):
+                merged[index] += value
+    return counters, histograms
+
+
+def _encode(counters, histograms):
+    return {
+        "counters": [
+            [name, list(labels), value] for (name, labels), value in counters.items()
+        ],
+        "histograms": [
+            [name, list(labels), state] for (name, labels), state in histograms.items()
+        ],
+    }
+
+
+def _decode(data):
+    counters = {
+        (name, tuple(tuple(pair) for pair in labels)): value
+        for name, labels, value in data.get("counters", [])
+    }
+    histograms = {
+        (name, tuple(tuple(pair) for pair in labels)): state
+        for name, labels, state in data.get("histograms", [])
+    }
+    return counters, histograms
+
+
+_last_flush = 0.0
+
+# Compteurs cumulés des workers arrêtés
+RETIRED_FILE = "retired.json"
+
+
+def _directory():
+    directory = get_setting("DIRECTORY")
+    return Path(directory) if directory else None
+
+
+def flush(force=False):
+    """Écrit l'instantané du processus pour les autres workers"""
+    global _last_flush
+    directory = _directory()
+    now = time.monotonic()
+    if directory is None or (
+        not force and now - _last_flush < get_setting("FLUSH_INTERVAL")
+    ):
+        return
+    _last_flush = now
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"metrics-{os.getpid()}.json"
+    temporary = directory / f".metrics-{os.getpid()}.tmp"
+    temporary.write_text(json.dumps(_encode(*snapshot())))
+    os.replace(temporary, target)
+
+
+atexit.register(flush, force=True)
+
+
+def _merge(totals, other):
+    """Ajoute les compteurs et histogrammes ``other`` à ``totals``"""
+    counters, histograms = totals
+    other_counters, other_histograms = other
+    for key, value in other_counters.items():
+        counters[key] = counters.get(key, 0) + value
+    for key, state in other_histograms.items():
+        merged = histograms.setdefault(key, [0] * len(state))
+        for index, value in enumerate(state):
+            merged[index] += value
+
+
+def _read(path):
+    """Instantané lu dans ``path``, ou ``None`` s'il est absent ou illisible"""
+    try:
+        return _decode(json.loads(path.read_text()))
+    except (OSError, ValueError):
+        return None
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Processus d'un autre utilisateur
+        return True
+    return True
+
+
+def _retire(directory, paths):
+    """Reporte les fichiers de workers arrêtés dans ``RETIRED_FILE`` puis les
+    supprime, sous verrou pour qu'un fichier ne soit compté qu'une fois"""
+    with open(directory / ".retired.lock", "a") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        target = directory / RETIRED_FILE
+        retired = _read(target) or ({}, {})
+        # Relus sous verrou : un autre worker a pu les reporter entre-temps
+        stale = [(path, _read(path)) for path in paths if path.exists()]
+        for _, data in stale:
+            if data is not None:
+                _merge(retired, data)
+        temporary = directory / f".retired-{os.getpid()}.tmp"
+        temporary.write_text(json.dumps(_encode(*retired)))
+        os.replace(temporary, target)
+        for path, _ in stale:
+            path.unlink(missing_ok=True)
+
+
+def collect():
+    """Métriques de tous les workers : fichiers des autres processus, cumul
+    des workers arrêtés et instantané vivant du processus courant"""
+    totals = snapshot()
+    directory = _directory()
+    if directory is not None and directory.is_dir():
+        dead = []
+        for path in directory.glob("metrics-*.json"):
+            try:
+                pid = int(path.stem.split("-", 1)[1])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            if not _is_alive(pid):
+                dead.append(path)
+                continue
+            data = _read(path)
+            if data is not None:
+                _merge(totals, data)
+        if dead:
+            _retire(directory, dead)
+        retired = _read(directory / RETIRED_FILE)
+        if retired is not None:
+            _merge(totals, retired)
+    return totals
+
+
+""" Exposition """
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in pairs
+    )
+    return "{" + body + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Texte d'exposition Prometheus (format 0.0.4)"""
+    counters, histograms = collect()
+
+    # Taux de succès des caches, dérivé des compteurs hit/miss
+    totals = {}
+    for (name, labels), value in counters.items():
+        if name == "softdesk_cache_requests_total":
+            labels = dict(labels)
+            hits, lookups = totals.get(labels["cache"], (0, 0))
+            if labels["result"] == "hit":
+                hits += value
+            totals[labels["cache"]] = (hits, lookups + value)
+    gauges = {
+        ("softdesk_cache_hit_ratio", (("cache", cache),)): hits / lookups
+        for cache, (hits, lookups) in totals.items()
+        if lookups
+    }
+
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (metric, labels), state in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS, state):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}"
+                    )
+                lines.append(
+                    f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {state[-1]}"
+                )
+                lines.append(f"{name}_sum{_labels(labels)} {_number(state[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {state[-1]}")
+            continue
+        source = gauges if kind == "gauge" else counters
+        for (metric, labels), value in sorted(source.items()):
+            if metric == name:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Rendu texte de ``/api/metrics/`` (les erreurs restent lisibles)"""
+
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return json.dumps(data).encode(self.charset)
@@ -0,0 +1,169 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import instrumentation, metrics, nplusone
+
+logger = logging.getLogger("supports_api.perf")
+
+PERF_DEFAULTS = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 1.0,
+    "SERVER_TIMING": True,
+    "LOG": True,
+}
+
+
+def perf_setting(name):
+    return getattr(settings, "SOFTDESK_PERF", {}).get(name, PERF_DEFAULTS[name])
+
+
+class PerformanceMiddleware:
+    """Mesure chaque requête échantillonnée et publie un en-tête ``Server-Timing``
+
+    Les mesures (requêtes SQL, temps base, requêtes dupliquées, permissions,
+    sérialisation, taille de réponse) sont aussi écrites sur une ligne JSON du
+    logger ``supports_api.perf``, étiquetée par ``ViewSet.action``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not perf_setting("ENABLED") or random.random() >= perf_setting(
+            "SAMPLE_RATE"
+        ):
+            return self.get_response(request)
+
+        profile = instrumentation.RequestProfile()
+        token = instrumentation.activate(profile)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(profile.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+        total = time.perf_counter() - start
+
+        size = None if response.streaming else len(response.content)
+        metrics = {
+            "db": (profile.db_time, f"{profile.queries} queries"),
+            "dup": (None, f"{profile.duplicates} duplicated"),
+            "perm": (profile.perm_time, None),
+            "ser": (profile.serialization_time, None),
+            "total": (total, None),
+            "size": (None, f"{size} bytes" if size is not None else "streaming"),
+        }
+        if perf_setting("SERVER_TIMING"):
+            response["Server-Timing"] = self.server_timing(metrics)
+        if perf_setting("LOG"):
+            logger.info(
+                json.dumps(
+                    {
+                        "view": instrumentation.view_label(request),
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "queries": profile.queries,
+                        "duplicated_queries": profile.duplicates,
+                        "db_ms": round(profile.db_time * 1000, 3),
+                        "perm_ms": round(profile.perm_time * 1000, 3),
+                        "ser_ms": round(profile.serialization_time * 1000, 3),
+                        "total_ms": round(total * 1000, 3),
+                        "response_bytes": size,
+                    }
+                )
+            )
+        return response
+
+    @staticmethod
+    def server_timing(metrics):
+        entries = []
+        for name, (duration, description) in metrics.items():
+            entry = name
+            if duration is not None:
+                entry += f";dur={duration * 1000:.2f}"
+            if description:
+                entry += f';desc="{description}"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+class NPlusOneMiddleware:
+    """Inspecte les requêtes SQL de chaque requête HTTP à la recherche de N+1
+
+    Inactif lorsque ``SOFTDESK_NPLUSONE["MODE"]`` vaut ``off``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = nplusone.get_setting("MODE")
+        if mode == "off":
+            return self.get_response(request)
+
+        inspector = nplusone.QueryInspector()
+        with nplusone.inspect_queries(inspector):
+            response = self.get_response(request)
+        scope = instrumentation.view_label(request) or request.path
+        inspector.check(f"{request.method} {request.path} ({scope})", mode)
+        return response
+
+
+class MetricsMiddleware:
+    """Alimente les métriques Prometheus : requêtes par action de vue, méthode
+    et statut, histogramme de latence et nombre de requêtes SQL
+
+    Les URL non résolues (404) sont regroupées sous ``unresolved`` pour
+    borner la cardinalité des séries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics.get_setting("ENABLED"):
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        view = instrumentation.view_label(request) or "unresolved"
+        metrics.inc(
+            "softdesk_http_requests_total",
+            (
+                ("view", view),
+                ("method", request.method),
+                ("status", str(response.status_code)),
+            ),
+        )
+        metrics.observe(
+            "softdesk_http_request_duration_seconds",
+            (("view", view), ("method", request.method)),
+            duration,
+        )
+        if queries:
+            metrics.inc("softdesk_db_queries_total", (("view", view),), queries)
+        metrics.flush()
+        return response
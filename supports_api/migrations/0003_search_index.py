@@ -0,0 +1,131 @@
+from django.db import migrations
+
+SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE supports_api_search USING fts5(
+        title,
+        body,
+        kind UNINDEXED,
+        object_id UNINDEXED,
+        project_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER supports_api_issue_search_ai
+    AFTER INSERT ON supports_api_issue
+    BEGIN
+        INSERT INTO supports_api_search
+            (rowid, title, body, kind, object_id, project_id)
+        VALUES
+            (NEW.id * 2, NEW.title, NEW.description, 'issue', NEW.id, NEW.project_id);
+    END
+    """,
+    """
+    CREATE TRIGGER supports_api_issue_search_au
+    AFTER UPDATE ON supports_api_issue
+    WHEN OLD.title IS NOT NEW.title
+        OR OLD.description IS NOT NEW.description
+        OR OLD.project_id IS NOT NEW.project_id
+    BEGIN
+        DELETE FROM supports_api_search WHERE rowid = OLD.id * 2;
+        INSERT INTO supports_api_search
+            (rowid, title, body, kind, object_id, project_id)
+        VALUES
+            (NEW.id * 2, NEW.title, NEW.description, 'issue', NEW.id, NEW.project_id);
+        UPDATE supports_api_search SET project_id = NEW.project_id
+        WHERE OLD.project_id IS NOT NEW.project_id
+            AND rowid IN (
+                SELECT id * 2 + 1 FROM supports_api_comment WHERE issue_id = NEW.id
+            );
+    END
+    """,
+    """
+    CREATE TRIGGER supports_api_issue_search_ad
+    AFTER DELETE ON supports_api_issue
+    BEGIN
+        DELETE FROM supports_api_search WHERE rowid = OLD.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER supports_api_comment_search_ai
+    AFTER INSERT ON supports_api_comment
+    BEGIN
+        INSERT INTO supports_api_search
+            (rowid, title, body, kind, object_id, project_id)
+        VALUES (
+            NEW.id * 2 + 1, '', NEW.description, 'comment', NEW.id,
+            (SELECT project_id FROM supports_api_issue WHERE id = NEW.issue_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER supports_api_comment_search_au
+    AFTER UPDATE ON supports_api_comment
+    WHEN OLD.description IS NOT NEW.description
+        OR OLD.issue_id IS NOT NEW.issue_id
+    BEGIN
+        DELETE FROM supports_api_search WHERE rowid = OLD.id * 2 + 1;
+        INSERT INTO supports_api_search
+            (rowid, title, body, kind, object_id, project_id)
+        VALUES (
+            NEW.id * 2 + 1, '', NEW.description, 'comment', NEW.id,
+            (SELECT project_id FROM supports_api_issue WHERE id = NEW.issue_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER supports_api_comment_search_ad
+    AFTER DELETE ON supports_api_comment
+    BEGIN
+        DELETE FROM supports_api_search WHERE rowid = OLD.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO supports_api_search (rowid, title, body, kind, object_id, project_id)
+    SELECT id * 2, title, description, 'issue', id, project_id
+    FROM supports_api_issue
+    """,
+    """
+    INSERT INTO supports_api_search (rowid, title, body, kind, object_id, project_id)
+    SELECT c.id * 2 + 1, '', c.description, 'comment', c.id, i.project_id
+    FROM supports_api_comment c
+    JOIN supports_api_issue i ON i.id = c.issue_id
+    """,
+]
+
+DROP_SEARCH_SCHEMA = [
+    "DROP TRIGGER IF EXISTS supports_api_comment_search_ad",
+    "DROP TRIGGER IF EXISTS supports_api_comment_search_au",
+    "DROP TRIGGER IF EXISTS supports_api_comment_search_ai",
+    "DROP TRIGGER IF EXISTS supports_api_issue_search_ad",
+    "DROP TRIGGER IF EXISTS supports_api_issue_search_au",
+    "DROP TRIGGER IF EXISTS supports_api_issue_search_ai",
+    "DROP TABLE IF EXISTS supports_api_search",
+]
+
+
+def create_search_index(apps, schema_editor):
+    """L'index FTS5 n'existe que sur SQLite"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in SEARCH_SCHEMA:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SEARCH_SCHEMA:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supports_api", "0002_alter_user_age"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supports_api", "0004_sync_feed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="pending_deletion",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name="DeletionTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("project", "Projet"), ("user", "Utilisateur")],
+                        max_length=7,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("requested_by_id", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("running", "En cours"),
+                            ("done", "Terminée"),
+                            ("failed", "Échec"),
+                        ],
+                        default="pending",
+                        max_length=7,
+                    ),
+                ),
+                ("step", models.PositiveSmallIntegerField(default=0)),
+                ("deleted_rows", models.PositiveIntegerField(default=0)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("created_time", models.DateTimeField(auto_now_add=True)),
+                ("updated_time", models.DateTimeField(auto_now=True)),
+                ("finished_time", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Suppression programmée",
+                "verbose_name_plural": "Suppressions programmées",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "id"], name="deletiontask_status_idx"
+                    ),
+                    models.Index(
+                        fields=["requested_by_id", "id"],
+                        name="deletiontask_requester_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def enqueue_unfinished_deletions(apps, schema_editor):
+    """Confie à la file les suppressions programmées avant son introduction"""
+    DeletionTask = apps.get_model("supports_api", "DeletionTask")
+    Job = apps.get_model("supports_api", "Job")
+    Job.objects.bulk_create(
+        Job(
+            queue="deletions",
+            name="deletion",
+            payload={"task": task_id},
+            max_attempts=10,
+        )
+        for task_id in DeletionTask.objects.exclude(status="done").values_list(
+            "id", flat=True
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supports_api", "0005_deletion_tasks"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("queue", models.CharField(default="default", max_length=50)),
+                ("name", models.CharField(max_length=100)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "En attente"),
+                            ("running", "En cours"),
+                            ("done", "Terminée"),
+                            ("failed", "Échec"),
+                        ],
+                        default="pending",
+                        max_length=7,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("max_attempts", models.PositiveSmallIntegerField(default=5)),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("locked_by", models.CharField(blank=True, max_length=64)),
+                ("locked_until", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("created_time", models.DateTimeField(auto_now_add=True)),
+                ("updated_time", models.DateTimeField(auto_now=True)),
+                ("finished_time", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Tâche d'arrière-plan",
+                "verbose_name_plural": "Tâches d'arrière-plan",
+                "indexes": [
+                    models.Index(
+                        fields=["queue", "status", "run_after"], name="job_claim_idx"
+                    ),
+                    models.Index(
+                        fields=["status", "finished_time"], name="job_finished_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(enqueue_unfinished_deletions, migrations.RunPython.noop),
+    ]
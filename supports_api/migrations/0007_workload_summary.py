@@ -0,0 +1,121 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_workload(apps, schema_editor):
+    """Synthèse initiale des problèmes existants (voir ``workload.compute``)"""
+    Issue = apps.get_model("supports_api", "Issue")
+    WorkloadSummary = apps.get_model("supports_api", "WorkloadSummary")
+    DeletionTask = apps.get_model("supports_api", "DeletionTask")
+    deleted_users = (
+        DeletionTask.objects.filter(kind="user")
+        .exclude(status="done")
+        .values("object_id")
+    )
+    rows = []
+    for role, column in (("assigned", "assigned_to_id"), ("authored", "author_id")):
+        for user_id, project_id, status, priority, count in (
+            Issue.objects.filter(
+                **{f"{column}__isnull": False}, project__pending_deletion=False
+            )
+            .exclude(**{f"{column}__in": deleted_users})
+            .order_by()
+            .values_list(column, "project_id", "status", "priority")
+            .annotate(count=Count("id"))
+        ):
+            rows.append(
+                WorkloadSummary(
+                    role=role,
+                    user_id=user_id,
+                    project_id=project_id,
+                    status=status,
+                    priority=priority,
+                    count=count,
+                )
+            )
+    WorkloadSummary.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supports_api", "0006_background_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkloadSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[("assigned", "Assigné"), ("authored", "Auteur")],
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("To Do", "À faire"),
+                            ("In Progress", "En cours"),
+                            ("Finished", "Terminé"),
+                        ],
+                        max_length=11,
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("LOW", "Faible"),
+                            ("MEDIUM", "Moyenne"),
+                            ("HIGH", "Élevée"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="supports_api.project",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Charge de travail",
+                "verbose_name_plural": "Charges de travail",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "role", "project", "status", "priority"),
+                        name="workload_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_workload, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supports_api", "0007_workload_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedIssue",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=128)),
+                ("description", models.TextField()),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("LOW", "Faible"),
+                            ("MEDIUM", "Moyenne"),
+                            ("HIGH", "Élevée"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("To Do", "À faire"),
+                            ("In Progress", "En cours"),
+                            ("Finished", "Terminé"),
+                        ],
+                        max_length=11,
+                    ),
+                ),
+                (
+                    "tag",
+                    models.CharField(
+                        choices=[
+                            ("BUG", "Bug"),
+                            ("FEATURE", "Fonctionnalité"),
+                            ("TASK", "Tâche"),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                ("created_time", models.DateTimeField()),
+                ("updated_time", models.DateTimeField()),
+                ("archived_time", models.DateTimeField()),
+                (
+                    "assigned_to",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_issues",
+                        to="supports_api.project",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Problème archivé",
+                "verbose_name_plural": "Problèmes archivés",
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedComment",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("description", models.TextField()),
+                ("uuid", models.UUIDField(unique=True)),
+                ("created_time", models.DateTimeField()),
+                ("updated_time", models.DateTimeField()),
+                ("archived_time", models.DateTimeField()),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "issue",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="comments",
+                        to="supports_api.archivedissue",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Commentaire archivé",
+                "verbose_name_plural": "Commentaires archivés",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedissue",
+            index=models.Index(
+                fields=["project", "updated_time"], name="archivedissue_project_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supports_api", "0008_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                ("jti_hash", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("expires_time", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "verbose_name": "Token révoqué",
+                "verbose_name_plural": "Tokens révoqués",
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("supports_api", "0010_user_lower_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["assigned_to", "status", "priority", "updated_time"],
+                name="issue_inbox_idx",
+            ),
+        ),
+    ]
@@ -3,6 +3,8 @@ import uuid
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -29,6 +31,11 @@ class User(AbstractUser):
     class Meta:
         verbose_name = "Utilisateur"
         verbose_name_plural = "Utilisateurs"
+        indexes = [
+            # Suggestions par préfixe insensible à la casse (autocomplete)
+            models.Index(Lower("username"), name="user_username_lower_idx"),
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+        ]
 
     def __str__(self):
         return self.username
@@ -59,12 +66,18 @@ class Project(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="authored_projects"
     )
+    # Suppression programmée, effectuée par lots (voir supports_api.deletion)
+    pending_deletion = models.BooleanField(default=False)
     created_time = models.DateTimeField(auto_now_add=True)
     updated_time = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Projet"
         verbose_name_plural = "Projets"
+        indexes = [
+            # Flux de synchronisation incrémentale (keyset sur updated_time, id)
+            models.Index(fields=["updated_time", "id"], name="project_updated_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -80,11 +93,17 @@ class Contributor(models.Model):
         Project, on_delete=models.CASCADE, related_name="contributors"
     )
     created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Contributeur"
         verbose_name_plural = "Contributeurs"
         unique_together = ["user", "project"]
+        indexes = [
+            models.Index(
+                fields=["updated_time", "id"], name="contributor_updated_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.project.title}"
@@ -137,6 +156,14 @@ class Issue(models.Model):
     class Meta:
         verbose_name = "Problème"
         verbose_name_plural = "Problèmes"
+        indexes = [
+            models.Index(fields=["updated_time", "id"], name="issue_updated_id_idx"),
+            # Boîte de réception : problèmes assignés, parcourus par keyset
+            models.Index(
+                fields=["assigned_to", "status", "priority", "updated_time"],
+                name="issue_inbox_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -157,6 +184,249 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Commentaire"
         verbose_name_plural = "Commentaires"
+        indexes = [
+            models.Index(fields=["updated_time", "id"], name="comment_updated_id_idx"),
+        ]
 
     def __str__(self):
         return f"Commentaire de {self.author.username} sur {self.issue.title}"
+
+
+class ArchivedIssue(models.Model):
+    """Problème terminé déplacé hors de la table chaude (voir
+    ``supports_api.archive``)
+
+    Mêmes colonnes que ``Issue`` et même identifiant : la restauration est
+    une copie inverse. Les dates d'origine sont conservées.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=128)
+    description = models.TextField()
+    priority = models.CharField(max_length=6, choices=Issue.PRIORITY_CHOICES)
+    status = models.CharField(max_length=11, choices=Issue.STATUS_CHOICES)
+    tag = models.CharField(max_length=7, choices=Issue.TAG_CHOICES)
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="archived_issues"
+    )
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    assigned_to = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_time = models.DateTimeField()
+    updated_time = models.DateTimeField()
+    archived_time = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Problème archivé"
+        verbose_name_plural = "Problèmes archivés"
+        indexes = [
+            models.Index(
+                fields=["project", "updated_time"], name="archivedissue_project_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    """Commentaire d'un problème archivé"""
+
+    id = models.BigIntegerField(primary_key=True)
+    description = models.TextField()
+    issue = models.ForeignKey(
+        ArchivedIssue, on_delete=models.CASCADE, related_name="comments"
+    )
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    uuid = models.UUIDField(unique=True)
+    created_time = models.DateTimeField()
+    updated_time = models.DateTimeField()
+    archived_time = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Commentaire archivé"
+        verbose_name_plural = "Commentaires archivés"
+
+    def __str__(self):
+        return f"Commentaire archivé #{self.pk}"
+
+
+class Tombstone(models.Model):
+    """Trace compacte d'une suppression, consommée par le flux de synchronisation
+
+    Une suppression en cascade n'est enregistrée qu'au niveau de l'objet
+    supprimé : la disparition d'un projet implique celle de ses problèmes,
+    commentaires et contributeurs, celle d'un problème implique celle de ses
+    commentaires. ``recipient`` cible un utilisateur précis lorsque le
+    périmètre du projet ne permet plus de retrouver les destinataires (projet
+    supprimé).
+    """
+
+    KIND_CHOICES = [
+        ("project", "Projet"),
+        ("issue", "Problème"),
+        ("comment", "Commentaire"),
+        ("contributor", "Contributeur"),
+    ]
+
+    kind = models.CharField(max_length=11, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    project_id = models.BigIntegerField()
+    recipient = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    deleted_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Suppression"
+        verbose_name_plural = "Suppressions"
+        indexes = [
+            models.Index(fields=["project_id", "id"], name="tombstone_project_idx"),
+            models.Index(fields=["recipient", "id"], name="tombstone_recipient_idx"),
+            models.Index(fields=["deleted_time"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} supprimé"
+
+
+class WorkloadSummary(models.Model):
+    """Nombre de problèmes d'un utilisateur par projet, statut et priorité
+
+    Une ligne par rôle (assigné ou auteur) : maintenue incrémentalement par
+    les signaux de ``Issue`` (voir ``supports_api.workload``), elle évite de
+    parcourir ``Issue`` par ``assigned_to`` ou ``author``.
+    """
+
+    ROLE_CHOICES = [
+        ("assigned", "Assigné"),
+        ("authored", "Auteur"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    role = models.CharField(max_length=8, choices=ROLE_CHOICES)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(max_length=11, choices=Issue.STATUS_CHOICES)
+    priority = models.CharField(max_length=6, choices=Issue.PRIORITY_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Charge de travail"
+        verbose_name_plural = "Charges de travail"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "role", "project", "status", "priority"],
+                name="workload_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.role} {self.project_id} : {self.count}"
+
+
+class DeletionTask(models.Model):
+    """Suppression d'un projet ou d'un compte, exécutée par lots en arrière-plan
+
+    ``step`` et ``deleted_rows`` sont mis à jour dans la transaction de
+    chaque lot : une tâche interrompue reprend là où elle s'était arrêtée.
+    ``object_id`` et ``requested_by_id`` ne sont pas des clés étrangères, les
+    objets référencés disparaissant pendant la tâche.
+    """
+
+    KIND_CHOICES = [
+        ("project", "Projet"),
+        ("user", "Utilisateur"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "En attente"),
+        ("running", "En cours"),
+        ("done", "Terminée"),
+        ("failed", "Échec"),
+    ]
+
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    requested_by_id = models.BigIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default="pending")
+    step = models.PositiveSmallIntegerField(default=0)
+    deleted_rows = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+    finished_time = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Suppression programmée"
+        verbose_name_plural = "Suppressions programmées"
+        indexes = [
+            models.Index(fields=["status", "id"], name="deletiontask_status_idx"),
+            models.Index(
+                fields=["requested_by_id", "id"], name="deletiontask_requester_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Suppression {self.kind} #{self.object_id} ({self.status})"
+
+
+class Job(models.Model):
+    """Tâche d'arrière-plan de la file locale (voir ``supports_api.jobs``)
+
+    Un worker réserve une tâche en la passant « en cours » avec un jeton
+    (``locked_by``) valable jusqu'à ``locked_until`` ; passé ce délai sans
+    renouvellement, la tâche redevient visible pour les autres workers.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "En attente"),
+        ("running", "En cours"),
+        ("done", "Terminée"),
+        ("failed", "Échec"),
+    ]
+
+    queue = models.CharField(max_length=50, default="default")
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_time = models.DateTimeField(auto_now_add=True)
+    updated_time = models.DateTimeField(auto_now=True)
+    finished_time = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tâche d'arrière-plan"
+        verbose_name_plural = "Tâches d'arrière-plan"
+        indexes = [
+            models.Index(fields=["queue", "status", "run_after"], name="job_claim_idx"),
+            models.Index(fields=["status", "finished_time"], name="job_finished_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class RevokedToken(models.Model):
+    """Token de rafraîchissement révoqué (déjà utilisé ou déconnecté)
+
+    Seuls 64 bits du SHA-256 du ``jti`` sont conservés, comme clé primaire :
+    la vérification est une lecture par clé. La ligne est inutile une fois le
+    token expiré et purgée ensuite (voir ``supports_api.tokens``).
+    """
+
+    jti_hash = models.BigIntegerField(primary_key=True)
+    expires_time = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Token révoqué"
+        verbose_name_plural = "Tokens révoqués"
+
+    def __str__(self):
+        return f"{self.jti_hash:x} (expire le {self.expires_time:%Y-%m-%d %H:%M})"
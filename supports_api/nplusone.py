@@ -0,0 +1,152 @@
+"""
+Détection automatique des requêtes N+1.
+
+Les requêtes SQL exécutées dans une portée (requête HTTP, test, bloc
+``with detect():``) sont regroupées par modèle normalisé : paramètres
+ignorés, listes ``IN (...)`` réduites. Un même modèle exécuté au moins
+``THRESHOLD`` fois avec des paramètres différents trahit une requête par
+ligne, typiquement un ``SerializerMethodField`` comme
+``get_comments_count`` ou un ``Contributor.objects.filter(...).exists()``
+dans une permission. Le rapport indique le site d'appel Python (premier
+cadre de la pile appartenant au projet) de ces requêtes.
+
+Selon ``SOFTDESK_NPLUSONE["MODE"]`` une détection est ignorée (``off``),
+journalisée (``log``, pour la préproduction) ou lève ``NPlusOneError``
+(``raise``, imposé à la suite de tests par ``supports_api.runner``).
+"""
+
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("supports_api.nplusone")
+
+DEFAULTS = {
+    "MODE": "off",
+    "THRESHOLD": 5,
+    # Expressions régulières des modèles SQL à ne jamais signaler
+    "IGNORE": [],
+}
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACES_RE = re.compile(r"\s+")
+
+_PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+# Cadres d'instrumentation à ignorer pour désigner le site d'appel
+_INFRASTRUCTURE_FILES = {
+    str(Path(__file__).resolve().parent / name)
+    for name in ("nplusone.py", "instrumentation.py", "middleware.py")
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_NPLUSONE", {}).get(name, DEFAULTS[name])
+
+
+class NPlusOneError(Exception):
+    """Requêtes répétées par ligne détectées"""
+
+
+def normalize(sql):
+    """Modèle d'une requête SQL, indépendant de ses paramètres"""
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _LITERAL_RE.sub("?", sql)
+    return _SPACES_RE.sub(" ", sql).strip()
+
+
+def call_site():
+    """Premier cadre de la pile appartenant au code du projet"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(_PROJECT_ROOT)
+            and filename not in _INFRASTRUCTURE_FILES
+            and "site-packages" not in filename
+        ):
+            relative = filename[len(_PROJECT_ROOT) + 1 :]
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<inconnu>"
+
+
+class QueryInspector:
+    """Regroupe les requêtes exécutées par modèle normalisé"""
+
+    def __init__(self, threshold=None, ignore=None):
+        self.threshold = threshold or get_setting("THRESHOLD")
+        self.ignore = [
+            re.compile(pattern)
+            for pattern in (ignore if ignore is not None else get_setting("IGNORE"))
+        ]
+        self.templates = Counter()
+        self.parameters = {}
+        self.sites = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper`` des connexions inspectées"""
+        if not many:
+            template = normalize(sql)
+            self.templates[template] += 1
+            self.parameters.setdefault(template, set()).add(repr(params))
+            self.sites.setdefault(template, Counter())[call_site()] += 1
+        return execute(sql, params, many, context)
+
+    def issues(self):
+        """Modèles répétés au moins ``threshold`` fois avec des paramètres
+        différents, du plus fréquent au moins fréquent"""
+        found = []
+        for template, count in self.templates.most_common():
+            if count < self.threshold or len(self.parameters[template]) < 2:
+                continue
+            if any(pattern.search(template) for pattern in self.ignore):
+                continue
+            found.append((template, count, self.sites[template].most_common(3)))
+        return found
+
+    def report(self, scope=None):
+        lines = [f"Requêtes N+1 détectées{f' dans {scope}' if scope else ''} :"]
+        for template, count, sites in self.issues():
+            lines.append(f"  {count}x {template}")
+            for site, hits in sites:
+                lines.append(f"      {hits}x depuis {site}")
+        return "\n".join(lines)
+
+    def check(self, scope=None, mode=None):
+        """Applique le mode configuré au résultat de l'inspection"""
+        mode = mode or get_setting("MODE")
+        if mode == "off" or not self.issues():
+            return
+        message = self.report(scope)
+        if mode == "raise":
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+@contextmanager
+def inspect_queries(inspector):
+    """Installe ``inspector`` sur toutes les connexions pendant le bloc"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(inspector))
+        yield inspector
+
+
+@contextmanager
+def detect(threshold=None, mode="raise", scope=None):
+    """Vérifie un bloc de code, par exemple dans un test ::
+
+    with nplusone.detect():
+        IssueSerializer(issues, many=True).data
+    """
+    inspector = QueryInspector(threshold)
+    with inspect_queries(inspector):
+        yield inspector
+    inspector.check(scope, mode)
@@ -0,0 +1,36 @@
+"""
+Métadonnées OpenAPI chargées seulement là où la documentation est servie.
+
+Avec ``drf_spectacular`` dans ``INSTALLED_APPS``, ce module réexporte ses
+décorateurs. Dans un profil API seule (``softdesk.settings_api``), ils sont
+remplacés par des équivalents sans effet : ni ``drf_spectacular`` ni ses
+dépendances (PyYAML, jsonschema, uritemplate...) ne sont importés par les
+workers.
+"""
+
+from django.conf import settings
+
+__all__ = ["OpenApiExample", "OpenApiParameter", "extend_schema", "extend_schema_view"]
+
+ENABLED = "drf_spectacular" in settings.INSTALLED_APPS
+
+if ENABLED:
+    from drf_spectacular.utils import (OpenApiExample, OpenApiParameter,
+                                       extend_schema, extend_schema_view)
+else:
+
+    class _Metadata:
+        """Métadonnée ignorée (exemple, paramètre)"""
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    OpenApiExample = OpenApiParameter = _Metadata
+
+    def extend_schema(*args, **kwargs):
+        def decorator(target):
+            return target
+
+        return decorator
+
+    extend_schema_view = extend_schema
@@ -0,0 +1,151 @@
+"""
+Pagination à comptage borné, pour l'API et l'administration.
+
+Un ``COUNT(*)`` exact parcourt toutes les lignes filtrées, quelle que soit
+la page demandée. ``CappedCountPaginator`` ne compte que jusqu'à
+``SOFTDESK_PAGINATION["COUNT_LIMIT"]`` lignes (ou jusqu'à la page demandée
+si elle est plus loin) : ``SELECT COUNT(*) FROM (... LIMIT n)``. Au-delà,
+le total est un minorant (« 10000+ ») et ``count_is_exact`` vaut ``False``.
+
+Le total exact reste disponible sur demande avec ``?count=exact``.
+"""
+
+from math import ceil
+
+from django.conf import settings
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+DEFAULTS = {
+    # None : comptage toujours exact
+    "COUNT_LIMIT": 10000,
+}
+
+EXACT_PARAM = "count"
+EXACT_VALUE = "exact"
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_PAGINATION", {}).get(name, DEFAULTS[name])
+
+
+def wants_exact_count(query_params):
+    return query_params.get(EXACT_PARAM) == EXACT_VALUE
+
+
+class CappedCountPaginator(Paginator):
+    """``Paginator`` dont le comptage s'arrête à ``limit`` lignes, ou à la fin
+    de la page demandée si elle est au-delà"""
+
+    def __init__(self, *args, limit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limit = limit
+        self.count_is_exact = True
+        self._pages = 1
+
+    def expect(self, number):
+        """Étend le comptage jusqu'à la page ``number``"""
+        try:
+            pages = int(number)
+        except (TypeError, ValueError):
+            return
+        if pages <= self._pages:
+            return
+        self._pages = pages
+        if not self.count_is_exact and pages * self.per_page > self.count:
+            del self.count
+            self.__dict__.pop("num_pages", None)
+
+    @cached_property
+    def count(self):
+        if self.limit is None or not isinstance(self.object_list, QuerySet):
+            return super().count
+        bound = max(self.limit, self._pages * self.per_page) + 1
+        counted = self.object_list.order_by()[:bound].count()
+        self.count_is_exact = counted < bound
+        return counted if self.count_is_exact else bound - 1
+
+    @cached_property
+    def num_pages(self):
+        if self.count == 0 and not self.allow_empty_first_page:
+            return 0
+        pages = ceil(max(1, self.count - self.orphans) / self.per_page)
+        # Au moins une ligne au-delà du total compté
+        return pages if self.count_is_exact else pages + 1
+
+    def page(self, number):
+        self.expect(number)
+        return super().page(number)
+
+
+class CappedCountPagination(PageNumberPagination):
+    """Pagination de l'API à comptage borné ; ``count_exact`` indique si
+    ``count`` est le total ou un minorant"""
+
+    def get_limit(self, request):
+        if wants_exact_count(request.query_params):
+            return None
+        return get_setting("COUNT_LIMIT")
+
+    def django_paginator_class(self, queryset, page_size):
+        return CappedCountPaginator(
+            queryset, page_size, limit=self.get_limit(self.request)
+        )
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(
+            {
+                "count": paginator.count,
+                "count_exact": paginator.count_is_exact,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_exact"] = {
+            "type": "boolean",
+            "description": "Faux si ``count`` est un minorant ; "
+            f"``?{EXACT_PARAM}={EXACT_VALUE}`` donne le total exact.",
+        }
+        return response_schema
+
+
+class CappedCountAdminMixin:
+    """Listes de l'administration à comptage borné (``?count=exact`` pour le
+    total exact)"""
+
+    show_full_result_count = False
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        # Absent hors de changelist_view (par exemple l'autocomplétion)
+        exact = getattr(request, "exact_count", None)
+        if exact is None:
+            exact = wants_exact_count(request.GET)
+        limit = None if exact else get_setting("COUNT_LIMIT")
+        if limit is not None:
+            # « Tout afficher » n'est proposé que sur un total exact
+            limit = max(limit, self.list_max_show_all)
+        paginator = CappedCountPaginator(
+            queryset, per_page, orphans, allow_empty_first_page, limit=limit
+        )
+        # La liste lit le total avant la page : le comptage doit la couvrir
+        paginator.expect(request.GET.get(PAGE_VAR))
+        return paginator
+
+    def changelist_view(self, request, extra_context=None):
+        # Paramètre retiré avant d'être pris pour un filtre
+        request.exact_count = wants_exact_count(request.GET)
+        if EXACT_PARAM in request.GET:
+            request.GET = request.GET.copy()
+            del request.GET[EXACT_PARAM]
+        return super().changelist_view(request, extra_context)
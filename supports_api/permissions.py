@@ -1,8 +1,32 @@
 from rest_framework import permissions
 
+from . import metrics
+from .authentication import MetricsTokenAuthentication
 from .models import Contributor, Project
 
 
+def request_cache(request):
+    """Cache propre à la requête HTTP, partagé par les sous-requêtes d'un lot
+    (voir ``supports_api.batch``)"""
+    http_request = getattr(request, "_request", request)
+    cache = getattr(http_request, "softdesk_cache", None)
+    if cache is None:
+        cache = http_request.softdesk_cache = {}
+    return cache
+
+
+def is_contributor(request, project_id):
+    """L'utilisateur contribue-t-il au projet ? Une requête SQL par projet et
+    par requête HTTP"""
+    cache = request_cache(request)
+    key = ("contributor", request.user.pk, project_id)
+    if key not in cache:
+        cache[key] = Contributor.objects.filter(
+            user=request.user, project_id=project_id
+        ).exists()
+    return cache[key]
+
+
 class IsProjectContributor(permissions.BasePermission):
     """Permission pour vérifier si l'utilisateur est contributeur du projet"""
 
@@ -14,12 +38,10 @@ class IsProjectContributor(permissions.BasePermission):
         """Vérifie si l'utilisateur est contributeur du projet"""
         if hasattr(obj, "project"):
             # Pour les issues et comments
-            return Contributor.objects.filter(
-                user=request.user, project=obj.project
-            ).exists()
+            return is_contributor(request, obj.project_id)
         elif isinstance(obj, Project):
             # Pour les projets
-            return Contributor.objects.filter(user=request.user, project=obj).exists()
+            return is_contributor(request, obj.pk)
         return False
 
 
@@ -51,7 +73,7 @@ class IsProjectAuthorOrReadOnly(permissions.BasePermission):
         """Vérifie les permissions sur le projet"""
         # Lecture autorisée pour tous les contributeurs
         if request.method in permissions.SAFE_METHODS:
-            return Contributor.objects.filter(user=request.user, project=obj).exists()
+            return is_contributor(request, obj.pk)
 
         # Modification/suppression uniquement pour l'auteur
         return obj.author == request.user
@@ -68,9 +90,7 @@ class IsCommentAuthorOrReadOnly(permissions.BasePermission):
         """Vérifie les permissions sur le commentaire"""
         # Lecture autorisée pour tous les contributeurs du projet
         if request.method in permissions.SAFE_METHODS:
-            return Contributor.objects.filter(
-                user=request.user, project=obj.issue.project
-            ).exists()
+            return is_contributor(request, obj.issue.project_id)
 
         # Modification/suppression uniquement pour l'auteur du commentaire
         return obj.author == request.user
@@ -87,9 +107,7 @@ class IsIssueAuthorOrReadOnly(permissions.BasePermission):
         """Vérifie les permissions sur l'issue"""
         # Lecture autorisée pour tous les contributeurs du projet
         if request.method in permissions.SAFE_METHODS:
-            return Contributor.objects.filter(
-                user=request.user, project=obj.project
-            ).exists()
+            return is_contributor(request, obj.project_id)
 
         # Modification/suppression uniquement pour l'auteur de l'issue
         return obj.author == request.user
@@ -110,3 +128,16 @@ class IsUserOwnerOrReadOnly(permissions.BasePermission):
 
         # Modification/suppression uniquement pour le propriétaire du compte
         return obj == request.user
+
+
+class IsAdminOrInternal(permissions.BasePermission):
+    """Accès réservé aux administrateurs, au collecteur Prometheus muni du
+    jeton ``SOFTDESK_METRICS["TOKEN"]`` ou aux adresses explicitement
+    déclarées dans ``SOFTDESK_METRICS["INTERNAL_IPS"]``"""
+
+    def has_permission(self, request, _):
+        if request.user and request.user.is_staff:
+            return True
+        if isinstance(request.successful_authenticator, MetricsTokenAuthentication):
+            return True
+        return request.META.get("REMOTE_ADDR") in metrics.get_setting("INTERNAL_IPS")
@@ -0,0 +1,162 @@
+"""
+Schéma OpenAPI précalculé.
+
+L'introspection de drf-spectacular (toutes les vues, tous les
+``extend_schema``) est faite une seule fois par version du code : le schéma
+est écrit dans ``SOFTDESK_SCHEMA["DIRECTORY"]`` en YAML et JSON, chacun
+accompagné de sa version gzip, puis servi depuis la mémoire avec des ETags
+forts. La version du code est ``SOFTDESK_SCHEMA["VERSION"]`` (par exemple le
+commit déployé) ou, à défaut, une empreinte des sources Python du projet.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib import import_module
+from pathlib import Path
+
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+from . import metrics
+
+DEFAULTS = {
+    "DIRECTORY": None,
+    "VERSION": None,
+}
+
+FORMATS = {
+    "yaml": "application/vnd.oai.openapi; charset=utf-8",
+    "json": "application/vnd.oai.openapi+json; charset=utf-8",
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_SCHEMA", {}).get(name, DEFAULTS[name])
+
+
+class MeteredJWTScheme(SimpleJWTScheme):
+    """Documente ``MeteredJWTAuthentication`` comme l'authentification JWT"""
+
+    target_class = "supports_api.authentication.MeteredJWTAuthentication"
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Version du code servant de clé au schéma généré"""
+    configured = get_setting("VERSION")
+    if configured:
+        return str(configured)
+
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(import_module(settings.ROOT_URLCONF).__file__).resolve().parent}
+    roots.update(
+        Path(config.path).resolve()
+        for config in apps.get_app_configs()
+        if Path(config.path).resolve().is_relative_to(base_dir)
+    )
+    digest = hashlib.sha256(drf_spectacular.__version__.encode())
+    for root in sorted(roots):
+        for path in sorted(root.rglob("*.py")):
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """Schéma rendu dans un format, brut et compressé"""
+
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+    @classmethod
+    def from_files(cls, path):
+        body = path.read_bytes()
+        return cls(
+            body=body,
+            gzipped=path.with_name(path.name + ".gz").read_bytes(),
+            etag='"{}"'.format(hashlib.sha256(body).hexdigest()[:32]),
+        )
+
+
+def _directory():
+    directory = get_setting("DIRECTORY")
+    return Path(directory) if directory else Path(settings.BASE_DIR) / "var" / "schema"
+
+
+def _path(format, version=None):
+    return _directory() / f"schema-{version or code_version()}.{format}"
+
+
+def is_generated(version=None):
+    """Le schéma de ``version`` (par défaut la version courante) existe-t-il
+    dans tous les formats ?"""
+    version = version or code_version()
+    return all(_path(format, version).exists() for format in FORMATS)
+
+
+def _write(path, content):
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+def generate():
+    """Introspecte l'API et écrit le schéma de la version courante ; les
+    schémas des versions précédentes sont supprimés"""
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import (OpenApiJsonRenderer,
+                                           OpenApiYamlRenderer)
+
+    data = SchemaGenerator().get_schema(request=None, public=True)
+    rendered = {
+        "yaml": OpenApiYamlRenderer().render(data),
+        "json": OpenApiJsonRenderer().render(data),
+    }
+
+    directory = _directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    version = code_version()
+    paths = []
+    for format, body in rendered.items():
+        path = _path(format, version)
+        # mtime=0 : fichier compressé identique d'une génération à l'autre
+        _write(path.with_name(path.name + ".gz"), gzip.compress(body, mtime=0))
+        _write(path, body)
+        paths.append(path)
+
+    current = {path.name for path in paths} | {path.name + ".gz" for path in paths}
+    for stale in directory.glob("schema-*"):
+        if stale.name not in current:
+            stale.unlink(missing_ok=True)
+    return paths
+
+
+_artifacts = {}
+_lock = threading.Lock()
+
+
+def load(format):
+    """Schéma de la version courante, généré au premier accès si besoin"""
+    artifact = _artifacts.get(format)
+    if artifact is not None:
+        metrics.cache_hit("openapi_schema")
+        return artifact
+
+    metrics.cache_miss("openapi_schema")
+    with _lock:
+        artifact = _artifacts.get(format)
+        if artifact is None:
+            if not is_generated():
+                generate()
+            for name in FORMATS:
+                _artifacts[name] = Artifact.from_files(_path(name))
+            artifact = _artifacts[format]
+    return artifact
@@ -0,0 +1,219 @@
+"""
+Recherche plein texte sur les problèmes et commentaires (SQLite FTS5).
+
+L'index ``supports_api_search`` est une table virtuelle FTS5 maintenue par
+des triggers SQLite (voir la migration ``0003_search_index``) : toute écriture
+sur ``Issue`` ou ``Comment``, y compris les ``update()`` et suppressions en
+masse, est répercutée sans passer par l'ORM.
+
+Chaque ligne de l'index utilise un ``rowid`` dérivé de l'objet indexé
+(``id * 2`` pour un problème, ``id * 2 + 1`` pour un commentaire), ce qui
+permet aux triggers de mettre à jour ou supprimer une entrée en O(1).
+"""
+
+import re
+
+from django.db import connection, transaction
+
+from . import jobs
+
+SEARCH_TABLE = "supports_api_search"
+
+# Pondération bm25 par colonne indexée : (title, body)
+BM25_WEIGHTS = (10.0, 1.0)
+
+SEARCH_KINDS = ("issue", "comment")
+
+_TERM_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def build_match_query(raw_query):
+    """Transforme une saisie utilisateur en requête FTS5 sûre.
+
+    Chaque terme est placé entre guillemets afin que la syntaxe FTS5
+    (opérateurs, colonnes, parenthèses) ne puisse pas être injectée ; un
+    ``*`` final est conservé pour la recherche par préfixe. Les termes sont
+    combinés par un ET implicite.
+    """
+    terms = []
+    for term in _TERM_RE.findall(raw_query or ""):
+        if term.endswith("*"):
+            terms.append(f'"{term[:-1]}"*')
+        else:
+            terms.append(f'"{term}"')
+    return " ".join(terms)
+
+
+def is_available():
+    """Indique si la base courante porte l'index FTS5"""
+    return connection.vendor == "sqlite"
+
+
+class SearchResults:
+    """Résultats paginables d'une recherche, classés par bm25.
+
+    Expose ``count()`` et le découpage par tranche utilisés par le
+    ``Paginator`` de Django : seule la page demandée est lue, avec un
+    ``LIMIT``/``OFFSET`` appliqué directement sur l'index.
+    """
+
+    def __init__(self, match, user, kind=None, project_id=None):
+        self.match = match
+        self.user = user
+        self.kind = kind
+        self.project_id = project_id
+        self._count = None
+
+    def _where(self):
+        """Clause WHERE commune : correspondance FTS et périmètre utilisateur"""
+        clauses = [
+            f"{SEARCH_TABLE} MATCH %s",
+            "project_id IN (SELECT project_id FROM supports_api_contributor "
+            "WHERE user_id = %s)",
+        ]
+        params = [self.match, self.user.pk]
+        if self.kind:
+            clauses.append("kind = %s")
+            params.append(self.kind)
+        if self.project_id is not None:
+            clauses.append("project_id = %s")
+            params.append(self.project_id)
+        return " AND ".join(clauses), params
+
+    def count(self):
+        """Nombre total de résultats visibles par l'utilisateur"""
+        if self._count is None:
+            where, params = self._where()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {where}", params
+                )
+                self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item : item + 1][0]
+        start = item.start or 0
+        stop = item.stop if item.stop is not None else self.count()
+        if stop <= start:
+            return []
+        return self._fetch(start, stop - start)
+
+    def _fetch(self, offset, limit):
+        """Lit une page classée puis la complète avec les objets liés"""
+        where, params = self._where()
+        weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+        sql = f"""
+            SELECT r.kind, r.object_id, r.project_id, r.snippet, r.score,
+                   c.uuid, COALESCE(c.issue_id, r.object_id), i.title
+            FROM (
+                SELECT kind, object_id, project_id,
+                       snippet({SEARCH_TABLE}, -1, '[', ']', '…', 16) AS snippet,
+                       bm25({SEARCH_TABLE}, {weights}) AS score
+                FROM {SEARCH_TABLE}
+                WHERE {where}
+                ORDER BY score
+                LIMIT %s OFFSET %s
+            ) r
+            LEFT JOIN supports_api_comment c
+                ON r.kind = 'comment' AND c.id = r.object_id
+            LEFT JOIN supports_api_issue i
+                ON i.id = COALESCE(c.issue_id, r.object_id)
+            ORDER BY r.score
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit, offset])
+            rows = cursor.fetchall()
+        return [
+            {
+                "type": kind,
+                "id": object_id,
+                "uuid": _format_uuid(comment_uuid) if kind == "comment" else None,
+                "issue": issue_id,
+                "project": project_id,
+                "title": title,
+                "snippet": snippet,
+                "score": -score,
+            }
+            for (
+                kind,
+                object_id,
+                project_id,
+                snippet,
+                score,
+                comment_uuid,
+                issue_id,
+                title,
+            ) in rows
+        ]
+
+
+def _format_uuid(value):
+    """SQLite stocke les UUID en hexadécimal sans tirets"""
+    if value is None:
+        return None
+    value = str(value).replace("-", "")
+    return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+
+
+def rebuild_index():
+    """Reconstruit entièrement l'index à partir des tables sources.
+
+    Retourne le nombre de lignes indexées. Sert à réparer un index
+    désynchronisé (restauration de sauvegarde, triggers désactivés, etc.).
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(f"""
+            INSERT INTO {SEARCH_TABLE}
+                (rowid, title, body, kind, object_id, project_id)
+            SELECT id * 2, title, description, 'issue', id, project_id
+            FROM supports_api_issue
+            """)
+        cursor.execute(f"""
+            INSERT INTO {SEARCH_TABLE}
+                (rowid, title, body, kind, object_id, project_id)
+            SELECT c.id * 2 + 1, '', c.description, 'comment', c.id, i.project_id
+            FROM supports_api_comment c
+            JOIN supports_api_issue i ON i.id = c.issue_id
+            """)
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        total = cursor.fetchone()[0]
+    optimize_index()
+    return total
+
+
+@jobs.handler("search.rebuild", queue="search", timeout=1800, max_attempts=3)
+def rebuild_job(job):
+    rebuild_index()
+
+
+def optimize_index():
+    """Fusionne les segments FTS5 pour accélérer les recherches"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+
+
+def check_index():
+    """Vérifie la cohérence interne de l'index FTS5.
+
+    Lève ``django.db.DatabaseError`` si l'index est corrompu.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('integrity-check')"
+        )
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        indexed = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT (SELECT COUNT(*) FROM supports_api_issue) "
+            "+ (SELECT COUNT(*) FROM supports_api_comment)"
+        )
+        expected = cursor.fetchone()[0]
+    return indexed, expected
@@ -1,10 +1,13 @@
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
-from .models import Comment, Contributor, Issue, Project, User
+from . import batch, hashing
+from .fieldsets import SelectableFieldsMixin
+from .models import (ArchivedComment, ArchivedIssue, Comment, Contributor,
+                     DeletionTask, Issue, Project, User)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
     """Sérialiseur pour les utilisateurs avec validation RGPD"""
 
     class Meta:
@@ -30,6 +33,13 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
 
+class UserSuggestionSerializer(serializers.Serializer):
+    """Suggestion d'utilisateur (sélecteur de contributeurs)"""
+
+    id = serializers.IntegerField()
+    username = serializers.CharField()
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     """Sérialiseur pour la création d'utilisateurs"""
 
@@ -55,13 +65,19 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        """Création d'un utilisateur avec mot de passe hashé"""
+        """Création d'un utilisateur avec mot de passe hashé (pool de hachage)"""
         validated_data.pop("password_confirm")
-        user = User.objects.create_user(**validated_data)
+        password = validated_data.pop("password")
+        user = User(**validated_data)
+        # Mêmes normalisations que create_user()
+        user.username = User.normalize_username(user.username)
+        user.email = User.objects.normalize_email(user.email)
+        user.password = hashing.make(password)
+        user.save()
         return user
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
     """Sérialiseur pour les projets"""
 
     author = UserSerializer(read_only=True)
@@ -86,7 +102,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         return obj.contributors.count()
 
 
-class ContributorSerializer(serializers.ModelSerializer):
+class ContributorSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
     """Sérialiseur pour les contributeurs"""
 
     user = UserSerializer(read_only=True)
@@ -123,7 +139,7 @@ class ContributorCreateSerializer(serializers.ModelSerializer):
         return Contributor.objects.create(user=user, **validated_data)
 
 
-class IssueSerializer(serializers.ModelSerializer):
+class IssueSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
     """Sérialiseur pour les problèmes"""
 
     author = UserSerializer(read_only=True)
@@ -154,6 +170,23 @@ class IssueSerializer(serializers.ModelSerializer):
         return obj.comments.count()
 
 
+class InboxIssueSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
+    """Sérialiseur allégé des problèmes de la boîte de réception"""
+
+    class Meta:
+        model = Issue
+        fields = [
+            "id",
+            "title",
+            "priority",
+            "status",
+            "tag",
+            "project",
+            "updated_time",
+        ]
+        read_only_fields = fields
+
+
 class IssueCreateSerializer(serializers.ModelSerializer):
     """Sérialiseur pour la création de problèmes"""
 
@@ -186,7 +219,7 @@ class IssueCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
     """Sérialiseur pour les commentaires"""
 
     author = UserSerializer(read_only=True)
@@ -212,3 +245,137 @@ class CommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ["description", "issue"]
+
+
+class ArchivedIssueSerializer(IssueSerializer):
+    """Sérialiseur (lecture seule) des problèmes archivés"""
+
+    class Meta(IssueSerializer.Meta):
+        model = ArchivedIssue
+        fields = IssueSerializer.Meta.fields + ["archived_time"]
+        read_only_fields = fields
+
+
+class ArchivedCommentSerializer(CommentSerializer):
+    """Sérialiseur (lecture seule) des commentaires archivés"""
+
+    issue = ArchivedIssueSerializer(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        model = ArchivedComment
+        fields = CommentSerializer.Meta.fields + ["archived_time"]
+        read_only_fields = fields
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) d'un résultat de recherche plein texte"""
+
+    type = serializers.ChoiceField(choices=["issue", "comment"])
+    id = serializers.IntegerField()
+    uuid = serializers.UUIDField(allow_null=True)
+    issue = serializers.IntegerField()
+    project = serializers.IntegerField()
+    title = serializers.CharField()
+    snippet = serializers.CharField()
+    score = serializers.FloatField()
+
+
+class AssigneeCountSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) du nombre de problèmes d'un assigné"""
+
+    id = serializers.IntegerField(allow_null=True)
+    username = serializers.CharField(allow_null=True)
+    count = serializers.IntegerField()
+
+
+class ProjectStatsSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) des statistiques d'un projet"""
+
+    project = serializers.IntegerField()
+    total = serializers.IntegerField()
+    status = serializers.DictField(child=serializers.IntegerField())
+    priority = serializers.DictField(child=serializers.IntegerField())
+    tag = serializers.DictField(child=serializers.IntegerField())
+    assignees = AssigneeCountSerializer(many=True)
+
+
+class ProjectWorkloadSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) de la charge d'un utilisateur sur un projet"""
+
+    project = serializers.IntegerField()
+    total = serializers.IntegerField()
+    open = serializers.IntegerField()
+
+
+class RoleWorkloadSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) de la charge d'un utilisateur pour un rôle"""
+
+    total = serializers.IntegerField()
+    open = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    open_by_priority = serializers.DictField(child=serializers.IntegerField())
+    projects = ProjectWorkloadSerializer(many=True)
+
+
+class WorkloadSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) de la charge de travail d'un utilisateur"""
+
+    user = serializers.IntegerField()
+    assigned = RoleWorkloadSerializer()
+    authored = RoleWorkloadSerializer()
+
+
+class DeletionTaskSerializer(serializers.ModelSerializer):
+    """Sérialiseur pour le suivi d'une suppression programmée"""
+
+    class Meta:
+        model = DeletionTask
+        fields = [
+            "id",
+            "kind",
+            "object_id",
+            "status",
+            "step",
+            "deleted_rows",
+            "created_time",
+            "updated_time",
+            "finished_time",
+        ]
+        read_only_fields = fields
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """Sous-requête d'une requête groupée"""
+
+    id = serializers.CharField(required=False, max_length=64)
+    method = serializers.ChoiceField(choices=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    path = serializers.RegexField(r"^/api/", max_length=2048)
+    body = serializers.JSONField(required=False)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """Requête groupée : sous-requêtes exécutées dans l'ordre"""
+
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        limit = batch.get_setting("MAX_REQUESTS")
+        if len(value) > limit:
+            raise serializers.ValidationError(
+                f"Au plus {limit} sous-requêtes par requête groupée."
+            )
+        return value
+
+
+class BatchResultSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) du résultat d'une sous-requête"""
+
+    id = serializers.CharField()
+    status = serializers.IntegerField()
+    body = serializers.JSONField(allow_null=True)
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    """Sérialiseur (documentation) de la réponse d'une requête groupée"""
+
+    responses = BatchResultSerializer(many=True)
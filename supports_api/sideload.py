@@ -0,0 +1,147 @@
+"""
+Objets liés inclus une seule fois : ``?include=users,projects``.
+
+Les lignes d'une liste (problèmes, commentaires, contributeurs) référencent
+leurs utilisateurs et projets par identifiant ; avec ``?include=``, la
+réponse porte en plus une section ``included`` où chaque objet référencé
+apparaît une fois, indexé par son identifiant ::
+
+    {"results": [...], "included": {"users": {"1": {...}}, "projects": {...}}}
+
+Les identifiants sont relevés dans les lignes déjà sérialisées, d'après
+les champs du sérialiseur (``?fields=`` et ``?expand=`` compris), puis chaque
+type est chargé par une requête ``pk__in`` et sérialisé par le sérialiseur
+compilé. Les auteurs des projets inclus sont ajoutés aux utilisateurs.
+
+Un objet référencé seulement par son identifiant qui n'est pas lui-même un
+type inclus (le problème d'un commentaire) est suivi jusqu'à ses types
+inclus (``THROUGH``) par une requête ``values_list`` : la liste des
+commentaires peut ainsi inclure les projets de leurs problèmes.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+from . import fast_serializers, fieldsets
+from .models import ArchivedIssue, Issue, Project, User
+from .serializers import ProjectSerializer, UserSerializer
+
+INCLUDE_PARAM = "include"
+
+# Type inclus -> (modèle, sérialiseur), dans l'ordre de chargement : les
+# projets avant les utilisateurs, qu'ils référencent
+KINDS = {
+    "projects": (Project, ProjectSerializer),
+    "users": (User, UserSerializer),
+}
+MODEL_KINDS = {model: kind for kind, (model, _) in KINDS.items()}
+
+# Modèle référencé par identifiant -> {type inclus: colonne à suivre}
+THROUGH = {
+    Issue: {"projects": "project_id"},
+    ArchivedIssue: {"projects": "project_id"},
+}
+
+
+def requested(request):
+    """Types demandés par ``?include=`` (tuple vide : pas de section)"""
+    names = fieldsets.parse(request.query_params.get(INCLUDE_PARAM))
+    return tuple(kind for kind in KINDS if kind in names)
+
+
+def _references(serializer, model, path):
+    """[(chemin, type, modèle intermédiaire)] des identifiants
+    d'utilisateurs et de projets ; le modèle intermédiaire vaut ``None``
+    pour une référence directe"""
+    found = []
+    for name, field in serializer.fields.items():
+        if field.write_only or not isinstance(
+            field, (serializers.PrimaryKeyRelatedField, serializers.Serializer)
+        ):
+            continue
+        try:
+            related = model._meta.get_field(field.source).related_model
+        except FieldDoesNotExist:
+            continue
+        if isinstance(field, serializers.Serializer):
+            found += _references(field, related, path + (name,))
+        elif related in MODEL_KINDS:
+            found.append((path + (name,), MODEL_KINDS[related], None))
+        else:
+            found += [
+                (path + (name,), kind, related) for kind in THROUGH.get(related, ())
+            ]
+    return found
+
+
+_references_cache = {}
+
+
+def references(serializer_class, context):
+    """Références d'une forme (sérialiseur, sélection), mises en cache"""
+    key = (serializer_class, fieldsets.selection_key(context))
+    try:
+        return _references_cache[key]
+    except KeyError:
+        pass
+    serializer = serializer_class(context=context)
+    found = _references(serializer, serializer.Meta.model, ())
+    return fieldsets.remember(_references_cache, key, found)
+
+
+def _collect(rows, refs, ids):
+    """Ajoute à ``ids`` les identifiants relevés dans ``rows`` ; une requête
+    par modèle intermédiaire pour les références indirectes"""
+    indirect = {}
+    for path, kind, through in refs:
+        if kind not in ids:
+            continue
+        found = (
+            ids[kind]
+            if through is None
+            else indirect.setdefault((through, kind), set())
+        )
+        for row in rows:
+            value = row
+            for name in path:
+                value = value.get(name) if value is not None else None
+            if value is not None:
+                found.add(value)
+    for (model, kind), pks in indirect.items():
+        if pks:
+            ids[kind].update(
+                model.objects.filter(pk__in=pks).values_list(
+                    THROUGH[model][kind], flat=True
+                )
+            )
+
+
+def _serialize(serializer_class, queryset, context):
+    compiled = fast_serializers.compile_serializer(serializer_class, context)
+    if compiled is None:
+        queryset = fieldsets.narrow(queryset, serializer_class, context)
+        return serializer_class(queryset, many=True, context=context).data
+    return compiled.serialize(compiled.values(queryset))
+
+
+def included(rows, serializer_class, context, kinds):
+    """Section ``included`` des ``rows`` sérialisées par ``serializer_class``"""
+    ids = {kind: set() for kind in kinds}
+    _collect(rows, references(serializer_class, context), ids)
+    # Objets inclus sous leur forme par défaut (objets liés en identifiants)
+    inner = {**context, "selection": fieldsets.Selection()}
+    section = {}
+    for kind in kinds:
+        model, kind_serializer = KINDS[kind]
+        objects = (
+            _serialize(
+                kind_serializer,
+                model.objects.filter(pk__in=ids[kind]).order_by("pk"),
+                inner,
+            )
+            if ids[kind]
+            else []
+        )
+        section[kind] = {str(obj["id"]): obj for obj in objects}
+        _collect(objects, references(kind_serializer, inner), ids)
+    return section
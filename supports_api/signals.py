@@ -0,0 +1,115 @@
+"""
+Signaux des modèles : alimentation du bus d'événements SSE, invalidation
+des statistiques de projet et synthèse des charges de travail.
+
+Les événements ne sont publiés qu'après validation de la transaction, afin
+qu'un client notifié puisse relire immédiatement l'objet concerné.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import events, stats, workload
+from .models import Comment, Issue
+
+# Champs d'une issue dont la modification est diffusée
+WATCHED_ISSUE_FIELDS = ("status", "assigned_to_id")
+
+
+def _isoformat(value):
+    return value.isoformat().replace("+00:00", "Z")
+
+
+@receiver(pre_save, sender=Issue)
+def remember_issue_state(sender, instance, raw=False, **kwargs):
+    """Mémorise l'état précédent d'une issue pour détecter les changements"""
+    if raw or instance.pk is None:
+        instance._previous_state = None
+        return
+    instance._previous_state = (
+        Issue.objects.filter(pk=instance.pk)
+        .values(*{*WATCHED_ISSUE_FIELDS, *workload.STATE_FIELDS})
+        .first()
+    )
+
+
+@receiver(post_save, sender=Issue)
+def update_workload(sender, instance, created, raw=False, **kwargs):
+    """Reporte la création ou la modification dans la synthèse, dans la
+    transaction de l'écriture"""
+    if raw:
+        return
+    previous = None if created else getattr(instance, "_previous_state", None)
+    workload.issue_changed(previous, workload.issue_state(instance))
+
+
+@receiver(post_delete, sender=Issue)
+def discount_workload(sender, instance, **kwargs):
+    workload.issue_changed(workload.issue_state(instance), None)
+
+
+@receiver(post_save, sender=Issue)
+@receiver(post_delete, sender=Issue)
+def invalidate_project_stats(sender, instance, raw=False, **kwargs):
+    """Invalide les statistiques du projet (et de l'ancien projet si l'issue
+    a été déplacée)"""
+    if raw:
+        return
+    project_ids = {instance.project_id}
+    previous = getattr(instance, "_previous_state", None)
+    if previous:
+        project_ids.add(previous["project_id"])
+    transaction.on_commit(lambda: stats.invalidate(*project_ids))
+
+
+@receiver(post_save, sender=Issue)
+def publish_issue_change(sender, instance, created, raw=False, **kwargs):
+    """Diffuse les changements de statut ou d'assignation d'une issue"""
+    previous = getattr(instance, "_previous_state", None)
+    if raw or created or previous is None:
+        return
+    changed = [
+        field
+        for field in WATCHED_ISSUE_FIELDS
+        if previous[field] != getattr(instance, field)
+    ]
+    if not changed:
+        return
+    event = {
+        "event": "issue.updated",
+        "project": instance.project_id,
+        "data": {
+            "id": instance.pk,
+            "project": instance.project_id,
+            "status": instance.status,
+            "assigned_to": instance.assigned_to_id,
+            "previous_status": previous["status"],
+            "previous_assigned_to": previous["assigned_to_id"],
+            "changed": [field.removesuffix("_id") for field in changed],
+            "updated_time": _isoformat(instance.updated_time),
+        },
+    }
+    transaction.on_commit(lambda: events.publish(event))
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_created(sender, instance, created, raw=False, **kwargs):
+    """Diffuse la création d'un commentaire"""
+    if raw or not created:
+        return
+    project_id = instance.issue.project_id
+    event = {
+        "event": "comment.created",
+        "project": project_id,
+        "data": {
+            "id": instance.pk,
+            "uuid": str(instance.uuid),
+            "description": instance.description,
+            "issue": instance.issue_id,
+            "project": project_id,
+            "author": instance.author_id,
+            "created_time": _isoformat(instance.created_time),
+        },
+    }
+    transaction.on_commit(lambda: events.publish(event))
@@ -0,0 +1,116 @@
+"""
+Statistiques des problèmes par projet pour le tableau de bord.
+
+Les répartitions par statut, priorité, tag et assigné de plusieurs projets
+sont calculées par une seule requête ``GROUP BY`` sur toutes ces colonnes ;
+les totaux par dimension sont ensuite additionnés en Python (quelques
+dizaines de lignes par projet). Le résultat de chaque projet est mis en
+cache (``SOFTDESK_STATS["CACHE"]``) et invalidé par les signaux de
+``Issue`` ; ``TIMEOUT`` borne l'obsolescence après une écriture qui ne passe
+pas par l'ORM.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from . import metrics
+from .models import Issue
+
+DEFAULTS = {
+    "CACHE": "stats",
+    "TIMEOUT": 300,
+}
+
+# Dimension de la réponse -> (colonne, valeurs possibles)
+DIMENSIONS = {
+    "status": ("status", Issue.STATUS_CHOICES),
+    "priority": ("priority", Issue.PRIORITY_CHOICES),
+    "tag": ("tag", Issue.TAG_CHOICES),
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_STATS", {}).get(name, DEFAULTS[name])
+
+
+def _cache():
+    return caches[get_setting("CACHE")]
+
+
+def _key(project_id):
+    return f"softdesk:stats:project:{project_id}"
+
+
+def _empty(project_id):
+    stats = {"project": project_id, "total": 0}
+    for name, (_, choices) in DIMENSIONS.items():
+        stats[name] = {value: 0 for value, _ in choices}
+    stats["assignees"] = {}
+    return stats
+
+
+def compute(project_ids):
+    """Statistiques de ``project_ids`` en une requête agrégée"""
+    results = {project_id: _empty(project_id) for project_id in project_ids}
+    rows = (
+        Issue.objects.filter(project_id__in=project_ids)
+        .values(
+            "project_id",
+            *(column for column, _ in DIMENSIONS.values()),
+            "assigned_to_id",
+            "assigned_to__username",
+        )
+        .order_by()
+        .annotate(count=Count("id"))
+    )
+    for row in rows:
+        stats = results[row["project_id"]]
+        count = row["count"]
+        stats["total"] += count
+        for name, (column, _) in DIMENSIONS.items():
+            stats[name][row[column]] = stats[name].get(row[column], 0) + count
+        assignee = stats["assignees"].setdefault(
+            row["assigned_to_id"],
+            {
+                "id": row["assigned_to_id"],
+                "username": row["assigned_to__username"],
+                "count": 0,
+            },
+        )
+        assignee["count"] += count
+    for stats in results.values():
+        stats["assignees"] = sorted(
+            stats["assignees"].values(),
+            key=lambda assignee: (assignee["id"] is None, -assignee["count"]),
+        )
+    return results
+
+
+def for_projects(project_ids):
+    """Statistiques de ``project_ids`` (dans cet ordre), depuis le cache puis
+    par une seule requête pour les projets manquants"""
+    cache = _cache()
+    cached = cache.get_many([_key(project_id) for project_id in project_ids])
+    results = {}
+    missing = []
+    for project_id in project_ids:
+        stats = cached.get(_key(project_id))
+        if stats is None:
+            missing.append(project_id)
+            metrics.cache_miss("project_stats")
+        else:
+            results[project_id] = stats
+            metrics.cache_hit("project_stats")
+    if missing:
+        computed = compute(missing)
+        cache.set_many(
+            {_key(project_id): stats for project_id, stats in computed.items()},
+            get_setting("TIMEOUT"),
+        )
+        results.update(computed)
+    return [results[project_id] for project_id in project_ids]
+
+
+def invalidate(*project_ids):
+    _cache().delete_many([_key(project_id) for project_id in project_ids])
@@ -0,0 +1,354 @@
+"""
+Flux de synchronisation incrémentale (« changes since »).
+
+Un client conserve un watermark opaque (signé) et ne récupère à chaque appel
+que les projets, problèmes, commentaires et contributeurs modifiés depuis,
+ainsi que les suppressions enregistrées dans la table ``Tombstone``.
+
+Chaque flux est parcouru par keyset sur ``(updated_time, id)``, couvert par
+les index ``*_updated_id_idx`` ; le watermark contient un curseur par flux
+et l'identifiant de la dernière suppression transmise.
+
+Les objets d'un projet rejoint depuis le dernier appel, antérieurs au
+watermark, sont rattrapés par pages eux aussi : chaque groupe de projets
+rejoints ensemble garde dans le watermark ses propres curseurs, jusqu'à ce
+que tous ses flux soient épuisés.
+"""
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Comment, Contributor, Issue, Project, Tombstone
+
+WATERMARK_SALT = "supports_api.sync"
+WATERMARK_VERSION = 1
+
+DEFAULTS = {
+    "PAGE_SIZE": 500,
+    "MAX_PAGE_SIZE": 2000,
+    "TOMBSTONE_RETENTION": timedelta(days=90),
+}
+
+
+class InvalidWatermark(Exception):
+    """Watermark illisible ou altéré"""
+
+
+class ExpiredWatermark(Exception):
+    """Watermark antérieur à la rétention des suppressions"""
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_SYNC", {}).get(name, DEFAULTS[name])
+
+
+def encode_watermark(state):
+    return signing.dumps(state, salt=WATERMARK_SALT, compress=True)
+
+
+def decode_watermark(token):
+    try:
+        state = signing.loads(token, salt=WATERMARK_SALT)
+    except signing.BadSignature:
+        raise InvalidWatermark(token)
+    if not isinstance(state, dict) or state.get("v") != WATERMARK_VERSION:
+        raise InvalidWatermark(token)
+    return state
+
+
+""" Flux """
+
+
+def _member_projects(user):
+    """Sous-requête des projets dont l'utilisateur est contributeur"""
+    return Contributor.objects.filter(user=user).values("project_id")
+
+
+# nom du flux, clé du curseur, modèle, filtre de périmètre, colonnes exposées
+STREAMS = (
+    (
+        "projects",
+        "p",
+        Project,
+        lambda members: Q(id__in=members),
+        (
+            "id",
+            "title",
+            "description",
+            "type",
+            "author_id",
+            "created_time",
+            "updated_time",
+        ),
+    ),
+    (
+        "issues",
+        "i",
+        Issue,
+        lambda members: Q(project_id__in=members),
+        (
+            "id",
+            "title",
+            "description",
+            "priority",
+            "status",
+            "tag",
+            "project_id",
+            "author_id",
+            "assigned_to_id",
+            "created_time",
+            "updated_time",
+        ),
+    ),
+    (
+        "comments",
+        "c",
+        Comment,
+        lambda members: Q(issue__project_id__in=members),
+        (
+            "id",
+            "uuid",
+            "description",
+            "issue_id",
+            "author_id",
+            "created_time",
+            "updated_time",
+        ),
+    ),
+    (
+        "contributors",
+        "k",
+        Contributor,
+        lambda members: Q(project_id__in=members),
+        ("id", "user_id", "project_id", "created_time", "updated_time"),
+    ),
+)
+
+# Filtre d'un flux restreint à un ensemble de projets (projets rejoints)
+BACKFILL_FILTERS = {
+    "projects": lambda ids: Q(id__in=ids),
+    "issues": lambda ids: Q(project_id__in=ids),
+    "comments": lambda ids: Q(issue__project_id__in=ids),
+    "contributors": lambda ids: Q(project_id__in=ids),
+}
+
+
+def _after(cursor):
+    """Condition keyset « strictement après (updated_time, id) »"""
+    if cursor is None:
+        return Q()
+    updated_time = datetime.fromisoformat(cursor[0])
+    return Q(updated_time__gt=updated_time) | Q(
+        updated_time=updated_time, id__gt=cursor[1]
+    )
+
+
+def _row(values, columns):
+    row = {}
+    for column in columns:
+        value = values[column]
+        if column.endswith("_id"):
+            column = column[:-3]
+        if isinstance(value, datetime):
+            value = value.isoformat().replace("+00:00", "Z")
+        elif column == "uuid":
+            value = str(value)
+        row[column] = value
+    return row
+
+
+def _page(queryset, cursor, columns, limit):
+    """Au plus ``limit`` lignes après ``cursor`` : (lignes, suite, curseur)"""
+    rows = list(
+        queryset.filter(_after(cursor))
+        .order_by("updated_time", "id")
+        .values(*columns)[: limit + 1]
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        cursor = [rows[-1]["updated_time"].isoformat(), rows[-1]["id"]]
+    return rows, more, cursor
+
+
+def _backfill(groups, members, limit, response):
+    """Une page du rattrapage des projets rejoints.
+
+    Chaque groupe vaut ``{"ids": projets, "done": flux épuisés}`` plus un
+    curseur par clé de flux de ``STREAMS``. Chaque flux dispose de ``limit``
+    lignes au total pour tous les groupes ; retourne les groupes incomplets.
+    """
+    budget = {name: limit for name, *_ in STREAMS}
+    pending = []
+    for group in groups:
+        group = dict(group, done=list(group.get("done", [])))
+        for name, key, model, scope, columns in STREAMS:
+            if key in group["done"] or not budget[name]:
+                continue
+            rows, more, group[key] = _page(
+                model.objects.filter(scope(members)).filter(
+                    BACKFILL_FILTERS[name](group["ids"])
+                ),
+                group.get(key),
+                columns,
+                budget[name],
+            )
+            budget[name] -= len(rows)
+            for row in rows:
+                response[name][row["id"]] = _row(row, columns)
+            if not more:
+                group["done"].append(key)
+        if len(group["done"]) < len(STREAMS):
+            pending.append(group)
+    return pending
+
+
+def changes_since(user, watermark=None, limit=None):
+    """Construit une réponse de synchronisation pour ``user``.
+
+    Sans watermark, tous les objets visibles sont transmis (synchronisation
+    initiale, par pages de ``limit`` lignes par flux). ``has_more`` indique
+    qu'un nouvel appel immédiat avec le watermark retourné est nécessaire.
+    """
+    limit = limit or get_setting("PAGE_SIZE")
+    issued_time = timezone.now()
+
+    if watermark:
+        state = decode_watermark(watermark)
+        previous_time = datetime.fromisoformat(state["t"])
+        if issued_time - previous_time > get_setting("TOMBSTONE_RETENTION"):
+            raise ExpiredWatermark(watermark)
+    else:
+        state = {
+            "d": Tombstone.objects.aggregate(last=Max("id"))["last"] or 0,
+        }
+        previous_time = None
+
+    members = _member_projects(user)
+    response = {}
+    new_state = {"v": WATERMARK_VERSION, "t": issued_time.isoformat()}
+    has_more = False
+
+    for name, key, model, scope, columns in STREAMS:
+        rows, more, new_state[key] = _page(
+            model.objects.filter(scope(members)), state.get(key), columns, limit
+        )
+        has_more = has_more or more
+        response[name] = {row["id"]: _row(row, columns) for row in rows}
+
+    # Projets rejoints depuis le dernier appel : leurs objets antérieurs au
+    # watermark n'ont jamais été transmis, ils sont rattrapés par pages.
+    groups = state.get("b", [])
+    if previous_time is not None:
+        joined = list(
+            Contributor.objects.filter(
+                user=user, created_time__gt=previous_time
+            ).values_list("project_id", flat=True)
+        )
+        if joined:
+            groups = groups + [{"ids": joined}]
+    if groups:
+        new_state["b"] = _backfill(groups, members, limit, response)
+        has_more = has_more or bool(new_state["b"])
+
+    tombstones = list(
+        Tombstone.objects.filter(id__gt=state.get("d", 0))
+        .filter(Q(project_id__in=members) | Q(recipient=user))
+        .order_by("id")
+        .values("id", "kind", "object_id", "project_id")[: limit + 1]
+    )
+    if len(tombstones) > limit:
+        has_more = True
+        tombstones = tombstones[:limit]
+    new_state["d"] = tombstones[-1]["id"] if tombstones else state.get("d", 0)
+
+    result = {"watermark": encode_watermark(new_state), "has_more": has_more}
+    for name, *_ in STREAMS:
+        result[name] = list(response[name].values())
+    result["deleted"] = [
+        {"type": row["kind"], "id": row["object_id"], "project": row["project_id"]}
+        for row in tombstones
+    ]
+    return result
+
+
+""" Enregistrement des suppressions """
+
+
+def record_project_deletion(project_ids):
+    """Une trace par projet et par contributeur : le projet supprimé ne permet
+    plus de retrouver ses destinataires"""
+    Tombstone.objects.bulk_create(
+        Tombstone(
+            kind="project",
+            object_id=project_id,
+            project_id=project_id,
+            recipient_id=user_id,
+        )
+        for user_id, project_id in Contributor.objects.filter(
+            project_id__in=project_ids
+        ).values_list("user_id", "project_id")
+    )
+
+
+def record_issue_deletion(issue):
+    Tombstone.objects.create(
+        kind="issue", object_id=issue.pk, project_id=issue.project_id
+    )
+
+
+def record_comment_deletion(comment):
+    Tombstone.objects.create(
+        kind="comment", object_id=comment.pk, project_id=comment.issue.project_id
+    )
+
+
+def record_user_deletion(user):
+    """Enregistre les suppressions induites par la suppression d'un compte.
+
+    Seuls les objets « racines » de la cascade sont tracés : projets de
+    l'utilisateur, puis, dans les autres projets, ses participations, ses
+    problèmes et ses commentaires sur des problèmes qui subsistent. Les
+    problèmes qui lui étaient assignés sont désassignés ici avec une date de
+    modification à jour, le ``SET_NULL`` du collecteur ne la modifiant pas.
+    """
+    own_projects = list(
+        Project.objects.filter(author=user).values_list("id", flat=True)
+    )
+    record_project_deletion(own_projects)
+
+    surviving_issues = Issue.objects.exclude(project_id__in=own_projects)
+    tombstones = [
+        Tombstone(kind="contributor", object_id=pk, project_id=project_id)
+        for pk, project_id in Contributor.objects.filter(user=user)
+        .exclude(project_id__in=own_projects)
+        .values_list("id", "project_id")
+    ]
+    tombstones += [
+        Tombstone(kind="issue", object_id=pk, project_id=project_id)
+        for pk, project_id in surviving_issues.filter(author=user).values_list(
+            "id", "project_id"
+        )
+    ]
+    tombstones += [
+        Tombstone(kind="comment", object_id=pk, project_id=project_id)
+        for pk, project_id in Comment.objects.filter(author=user)
+        .filter(issue__in=surviving_issues.exclude(author=user))
+        .values_list("id", "issue__project_id")
+    ]
+    Tombstone.objects.bulk_create(tombstones)
+
+    surviving_issues.filter(assigned_to=user).exclude(author=user).update(
+        assigned_to=None, updated_time=timezone.now()
+    )
+
+
+def prune_tombstones(now=None):
+    """Supprime les traces plus anciennes que la rétention configurée"""
+    limit = (now or timezone.now()) - get_setting("TOMBSTONE_RETENTION")
+    deleted, _ = Tombstone.objects.filter(deleted_time__lt=limit).delete()
+    return deleted
@@ -0,0 +1,67 @@
+"""
+Outils communs des tests de l'API.
+
+Les tests tournent avec ``supports_api.runner.NPlusOneTestRunner`` : toute
+requête HTTP qui déclenche une requête SQL par ligne fait échouer le test.
+"""
+
+from django.test import override_settings
+from rest_framework.test import APITestCase as BaseAPITestCase
+
+from supports_api.models import Comment, Contributor, Issue, Project, User
+
+PASSWORD = "mot-de-passe-de-test"
+
+# Réglages isolant les tests : hachage peu coûteux, pas de limitation de
+# débit ni de fichiers partagés dans var/, journal de performance coupé
+TEST_SETTINGS = {
+    "SOFTDESK_HASHING": {"PROFILE": "test", "PROFILES": {"test": 1000}},
+    "SOFTDESK_THROTTLE": {"ENABLED": False},
+    "SOFTDESK_METRICS": {"ENABLED": True, "DIRECTORY": None},
+    "SOFTDESK_PERF": {"LOG": False},
+    "CACHES": {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "stats": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "stats",
+        },
+    },
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class APITestCase(BaseAPITestCase):
+    """Deux utilisateurs et un projet chacun ; alice contribue aux deux"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            "alice", "alice@example.com", PASSWORD, age=30
+        )
+        cls.bob = User.objects.create_user("bob", "bob@example.com", PASSWORD, age=30)
+        cls.project = make_project(cls.alice, "Projet Alpha")
+        cls.other_project = make_project(cls.bob, "Projet Beta")
+        Contributor.objects.create(user=cls.alice, project=cls.other_project)
+
+    def login(self, user):
+        self.client.force_authenticate(user)
+        return self.client
+
+
+def make_project(author, title="Projet", **fields):
+    """Projet dont l'auteur est contributeur, comme à la création via l'API"""
+    fields.setdefault("description", "Description")
+    fields.setdefault("type", "back-end")
+    project = Project.objects.create(title=title, author=author, **fields)
+    Contributor.objects.create(user=author, project=project)
+    return project
+
+
+def make_issue(project, author, title="Problème", **fields):
+    fields.setdefault("description", "Description")
+    fields.setdefault("tag", "BUG")
+    return Issue.objects.create(project=project, author=author, title=title, **fields)
+
+
+def make_comment(issue, author, description="Commentaire"):
+    return Comment.objects.create(issue=issue, author=author, description=description)
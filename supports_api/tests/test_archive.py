@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.utils import timezone
+
+from supports_api import archive, workload
+from supports_api.models import (ArchivedComment, ArchivedIssue, Comment,
+                                 Contributor, Issue)
+
+from .base import APITestCase, make_comment, make_issue
+
+
+class ArchiveTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Contributor.objects.create(user=cls.bob, project=cls.project)
+        cls.issue = make_issue(
+            cls.project,
+            cls.alice,
+            "Crash archivé",
+            status="Finished",
+            assigned_to=cls.bob,
+        )
+        cls.comments = [
+            make_comment(cls.issue, cls.bob, "Même crash"),
+            make_comment(cls.issue, cls.alice),
+        ]
+        cls.live = make_issue(cls.project, cls.alice, "Crash en cours")
+
+    def setUp(self):
+        caches["stats"].clear()
+
+    def archive(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return archive.run(timezone.now() + timedelta(days=1), pause=0)
+
+    def restore(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.login(user).post(
+                f"/api/archive/issues/{self.issue.pk}/restore/"
+            )
+
+    def ids(self, url, **params):
+        response = self.login(self.alice).get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return {row["id"] for row in response.json()["results"]}
+
+    def project_stats(self):
+        return (
+            self.login(self.alice).get(f"/api/projects/{self.project.pk}/stats/").json()
+        )
+
+    def test_round_trip_keeps_ids_uuids_and_dates(self):
+        self.assertEqual(self.archive(), (1, 2))
+        self.assertFalse(Issue.objects.filter(pk=self.issue.pk).exists())
+        self.assertFalse(Comment.objects.filter(issue_id=self.issue.pk).exists())
+        self.assertEqual(ArchivedComment.objects.count(), 2)
+        self.assertEqual(archive.restore([self.issue.pk]), 1)
+
+        self.assertFalse(ArchivedIssue.objects.exists())
+        restored = Issue.objects.get(pk=self.issue.pk)
+        self.assertEqual(restored.created_time, self.issue.created_time)
+        self.assertGreater(restored.updated_time, self.issue.updated_time)
+        self.assertEqual(
+            {
+                (c.pk, c.uuid, c.created_time)
+                for c in Comment.objects.filter(issue=restored)
+            },
+            {(c.pk, c.uuid, c.created_time) for c in self.comments},
+        )
+
+    def test_detail_falls_back_to_the_archive(self):
+        self.archive()
+        response = self.login(self.bob).get(f"/api/issues/{self.issue.pk}/")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["title"], "Crash archivé")
+        self.assertIsNotNone(response.json()["archived_time"])
+        self.assertEqual(
+            self.ids("/api/archive/issues/", project=self.project.pk),
+            {self.issue.pk},
+        )
+
+    def test_lists_and_search_exclude_archived_rows(self):
+        self.archive()
+        self.assertEqual(self.ids("/api/issues/"), {self.live.pk})
+        self.assertEqual(self.ids("/api/comments/"), set())
+        results = self.login(self.alice).get("/api/search/", {"q": "crash"})
+        self.assertEqual(
+            {(row["type"], row["id"]) for row in results.json()["results"]},
+            {("issue", self.live.pk)},
+        )
+
+    def test_restore_is_limited_to_the_authors(self):
+        self.archive()
+        # bob est contributeur et assigné, mais ni auteur du problème ni du projet
+        self.assertEqual(self.restore(self.bob).status_code, 403)
+        self.assertTrue(ArchivedIssue.objects.filter(pk=self.issue.pk).exists())
+        response = self.restore(self.alice)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["id"], self.issue.pk)
+        self.assertIn(self.issue.pk, self.ids("/api/issues/"))
+
+    def test_workload_and_stats_follow_both_moves(self):
+        self.assertEqual(self.project_stats()["total"], 2)
+        self.archive()
+        self.assertEqual(workload.check(), {})
+        self.assertEqual(self.project_stats()["total"], 1)
+        self.assertEqual(
+            workload.summary(self.bob.pk, self.alice)["assigned"]["total"], 0
+        )
+        self.restore(self.alice)
+        self.assertEqual(workload.check(), {})
+        self.assertEqual(self.project_stats()["status"]["Finished"], 1)
+        self.assertEqual(
+            workload.summary(self.bob.pk, self.alice)["assigned"]["total"], 1
+        )
+
+    def test_sync_sees_the_archive_and_the_restore(self):
+        client = self.login(self.bob)
+        watermark = client.get("/api/sync/").json()["watermark"]
+        self.archive()
+        data = client.get("/api/sync/", {"since": watermark}).json()
+        self.assertEqual(
+            data["deleted"],
+            [{"type": "issue", "id": self.issue.pk, "project": self.project.pk}],
+        )
+
+        archive.restore([self.issue.pk])
+        data = client.get("/api/sync/", {"since": data["watermark"]}).json()
+        self.assertEqual([row["id"] for row in data["issues"]], [self.issue.pk])
+        self.assertEqual(
+            {row["id"] for row in data["comments"]},
+            {comment.pk for comment in self.comments},
+        )
+        self.assertEqual(data["deleted"], [])
@@ -0,0 +1,74 @@
+from supports_api import autocomplete
+from supports_api.models import Contributor, User
+
+from .base import PASSWORD, APITestCase
+
+URL = "/api/users/autocomplete/"
+
+
+def make_user(username, email):
+    return User.objects.create_user(username, email, PASSWORD, age=30)
+
+
+class AutocompleteTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alexandre = make_user("Alexandre", "alex@example.com")
+        # Trouvée par son email seulement, contributrice du projet d'alice
+        cls.zoe = make_user("zoe", "ALINE@example.com")
+        Contributor.objects.create(user=cls.zoe, project=cls.project)
+        make_user("marc", "marc@example.com")
+        inactive = make_user("albert", "albert@example.com")
+        User.objects.filter(pk=inactive.pk).update(is_active=False)
+
+    def suggest(self, user=None, **params):
+        response = self.login(user or self.alice).get(URL, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["username"] for row in response.json()]
+
+    def test_case_insensitive_username_and_email(self):
+        self.assertEqual(self.suggest(q="AL"), ["Alexandre", "alice", "zoe"])
+        self.assertEqual(self.suggest(q="aline@"), ["zoe"])
+        self.assertEqual(self.suggest(q="  Marc "), ["marc"])
+
+    def test_project_contributors_come_first(self):
+        self.assertEqual(
+            self.suggest(q="al", project=self.project.pk),
+            ["alice", "zoe", "Alexandre"],
+        )
+
+    def test_project_of_a_non_member_is_ignored(self):
+        # bob ne contribue pas au projet d'alice : pas de classement
+        self.assertEqual(
+            self.suggest(self.bob, q="al", project=self.project.pk),
+            ["Alexandre", "alice", "zoe"],
+        )
+
+    def test_limit_bounds(self):
+        User.objects.bulk_create(
+            User(username=f"lot{n:02}", email=f"lot{n:02}@example.com", age=30)
+            for n in range(autocomplete.MAX_LIMIT + 5)
+        )
+        self.assertEqual(self.suggest(q="lot", limit=3), ["lot00", "lot01", "lot02"])
+        self.assertEqual(self.suggest(q="lot", limit=0), ["lot00"])
+        self.assertEqual(len(self.suggest(q="lot", limit=500)), autocomplete.MAX_LIMIT)
+        self.assertEqual(len(self.suggest(q="lot")), autocomplete.LIMIT)
+
+    def test_invalid_parameters(self):
+        client = self.login(self.alice)
+        for params in (
+            {},
+            {"q": " "},
+            {"q": "al", "limit": "x"},
+            {"q": "al", "project": "x"},
+        ):
+            self.assertEqual(client.get(URL, params).status_code, 400, params)
+
+    def test_last_unicode_code_point(self):
+        last = chr(0x10FFFF)
+        user = User.objects.create(username=f"x{last}", email="x@example.com", age=30)
+        self.assertEqual(
+            autocomplete.suggest(f"x{last}"), [{"id": user.pk, "username": f"x{last}"}]
+        )
+        self.assertEqual(self.suggest(q=last), [])
@@ -0,0 +1,113 @@
+from supports_api.models import Issue
+
+from .base import APITestCase, make_issue, make_project
+
+URL = "/api/batch/"
+
+
+class BatchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.issue = make_issue(cls.project, cls.alice, "Visible")
+        cls.private = make_project(cls.bob, "Projet privé")
+
+    def batch(self, *requests):
+        response = self.login(self.alice).post(
+            URL, {"requests": list(requests)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return {item["id"]: item for item in response.json()["responses"]}
+
+    def test_authentication_is_required(self):
+        response = self.client.post(
+            URL,
+            {"requests": [{"method": "GET", "path": "/api/projects/"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_sub_requests_run_as_the_batch_user(self):
+        responses = self.batch(
+            {
+                "id": "mine",
+                "method": "GET",
+                "path": f"/api/projects/{self.project.pk}/",
+            },
+            {
+                "id": "private",
+                "method": "GET",
+                "path": f"/api/projects/{self.private.pk}/",
+            },
+            {"id": "list", "method": "GET", "path": "/api/projects/?fields=id"},
+        )
+        self.assertEqual(responses["mine"]["status"], 200)
+        self.assertEqual(responses["private"]["status"], 404)
+        self.assertEqual(
+            {row["id"] for row in responses["list"]["body"]["results"]},
+            {self.project.pk, self.other_project.pk},
+        )
+
+    def test_permissions_apply_to_each_sub_request(self):
+        responses = self.batch(
+            {
+                "id": "foreign",
+                "method": "PATCH",
+                "path": f"/api/projects/{self.other_project.pk}/",
+                "body": {"title": "Pris"},
+            },
+            {
+                "id": "own",
+                "method": "PATCH",
+                "path": f"/api/projects/{self.project.pk}/",
+                "body": {"title": "Renommé"},
+            },
+        )
+        self.assertEqual(responses["foreign"]["status"], 403)
+        self.assertEqual(responses["own"]["status"], 200)
+        self.other_project.refresh_from_db()
+        self.assertEqual(self.other_project.title, "Projet Beta")
+
+    def test_unknown_and_unavailable_paths(self):
+        responses = self.batch(
+            {"id": "unknown", "method": "GET", "path": "/api/inexistant/"},
+            {"id": "metrics", "method": "GET", "path": "/api/metrics/"},
+            {"id": "ok", "method": "GET", "path": "/api/issues/"},
+        )
+        self.assertEqual(responses["unknown"]["status"], 404)
+        self.assertEqual(responses["metrics"]["status"], 400)
+        # Une sous-requête en échec n'interrompt pas les autres
+        self.assertEqual(responses["ok"]["status"], 200)
+
+    def test_invalid_batches(self):
+        client = self.login(self.alice)
+        outside = {"requests": [{"method": "GET", "path": "/admin/"}]}
+        self.assertEqual(client.post(URL, outside, format="json").status_code, 400)
+        self.assertEqual(
+            client.post(URL, {"requests": []}, format="json").status_code, 400
+        )
+        with self.settings(SOFTDESK_BATCH={"MAX_REQUESTS": 2}):
+            too_many = {"requests": [{"method": "GET", "path": "/api/issues/"}] * 3}
+            self.assertEqual(client.post(URL, too_many, format="json").status_code, 400)
+
+    def test_reads_after_a_write_see_it(self):
+        responses = self.batch(
+            {
+                "id": "create",
+                "method": "POST",
+                "path": "/api/issues/",
+                "body": {
+                    "title": "Créé dans le lot",
+                    "description": "d",
+                    "tag": "TASK",
+                    "project": self.project.pk,
+                },
+            },
+            {"id": "list", "method": "GET", "path": "/api/issues/?fields=title"},
+        )
+        self.assertEqual(responses["create"]["status"], 201, responses["create"])
+        self.assertIn(
+            "Créé dans le lot",
+            [row["title"] for row in responses["list"]["body"]["results"]],
+        )
+        self.assertTrue(Issue.objects.filter(title="Créé dans le lot").exists())
@@ -0,0 +1,63 @@
+from supports_api import deletion
+from supports_api.models import Comment, Contributor, Issue, Project, User
+
+from .base import APITestCase, make_comment, make_issue
+
+
+def step_index(kind, name):
+    return [step for step, _ in deletion.STEPS[kind](0)].index(name)
+
+
+class DeletionTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Problème de bob dans le projet d'alice, toujours commentable
+        Contributor.objects.create(user=cls.bob, project=cls.project)
+        cls.issue = make_issue(cls.project, cls.bob, "Problème de bob")
+        make_comment(cls.issue, cls.alice)
+
+    def run_task(self, task, between=None, before_step=None):
+        """Exécute ``task`` ; ``between()`` est appelé une fois, juste avant
+        l'étape ``before_step``"""
+        called = []
+
+        def heartbeat():
+            if between and task.step == before_step and not called:
+                called.append(True)
+                between()
+
+        deletion.run(task, batch_size=2, pause=0, heartbeat=heartbeat)
+        return called
+
+    def test_comment_posted_before_the_issues_step(self):
+        task = deletion.schedule_user_deletion(self.bob)
+        called = self.run_task(
+            task,
+            between=lambda: make_comment(self.issue, self.alice, "Entre deux"),
+            before_step=step_index("user", "issues"),
+        )
+        self.assertEqual(called, [True])
+        task.refresh_from_db()
+        self.assertEqual(task.status, "done")
+        self.assertFalse(User.objects.filter(pk=self.bob.pk).exists())
+        self.assertFalse(Issue.objects.filter(pk=self.issue.pk).exists())
+        self.assertFalse(Comment.objects.filter(issue_id=self.issue.pk).exists())
+        self.assertTrue(Project.objects.filter(pk=self.project.pk).exists())
+
+    def test_project_deletion_in_batches(self):
+        for n in range(5):
+            make_comment(
+                make_issue(self.project, self.alice, f"Problème {n}"), self.bob
+            )
+        task = deletion.schedule_project_deletion(self.project, self.alice)
+        called = self.run_task(
+            task,
+            between=lambda: make_comment(self.issue, self.bob, "Entre deux"),
+            before_step=step_index("project", "issues"),
+        )
+        self.assertEqual(called, [True])
+        task.refresh_from_db()
+        self.assertEqual(task.status, "done")
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Issue.objects.filter(project_id=self.project.pk).exists())
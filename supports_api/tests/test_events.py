@@ -0,0 +1,84 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from supports_api import events
+from supports_api.models import Contributor, User
+
+from .base import APITestCase, make_project
+
+HEARTBEAT = 0.05
+
+
+def event(project, name="comment.created"):
+    return {"event": name, "project": project.pk, "data": {"project": project.pk}}
+
+
+@override_settings(SOFTDESK_EVENTS={"BACKEND": "memory", "HEARTBEAT": HEARTBEAT})
+class EventStreamTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.private = make_project(cls.bob, "Projet privé")
+
+    async def connect(self, user):
+        token = await sync_to_async(AccessToken.for_user)(user)
+        response = await self.async_client.get(
+            "/api/events/", headers={"authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        return stream
+
+    async def next_event(self, stream):
+        """Prochain bloc transmis, battements de cœur ignorés"""
+        while True:
+            chunk = await asyncio.wait_for(anext(stream), 1)
+            if not chunk.startswith(b": heartbeat"):
+                return chunk
+
+    async def publish(self, *published):
+        for item in published:
+            events.publish(item)
+        # Livraison par call_soon_threadsafe dans la boucle courante
+        await asyncio.sleep(0)
+
+    async def test_events_are_filtered_by_membership(self):
+        stream = await self.connect(self.alice)
+        await self.publish(event(self.private), event(self.project))
+        chunk = await self.next_event(stream)
+        self.assertIn(b"event: comment.created", chunk)
+        self.assertIn(f'"project":{self.project.pk}'.encode(), chunk)
+        await stream.aclose()
+
+    async def test_removed_contributor_stops_receiving_on_busy_bus(self):
+        stream = await self.connect(self.alice)
+        await self.publish(event(self.other_project))
+        self.assertIn(b"comment.created", await self.next_event(stream))
+
+        await sync_to_async(
+            Contributor.objects.filter(
+                user=self.alice, project=self.other_project
+            ).delete
+        )()
+        await asyncio.sleep(HEARTBEAT * 2)
+        # Des événements sont en attente : aucun délai d'attente n'expire
+        await self.publish(
+            event(self.other_project, "issue.updated"), event(self.project)
+        )
+        chunk = await self.next_event(stream)
+        self.assertIn(f'"project":{self.project.pk}'.encode(), chunk)
+        await stream.aclose()
+
+    async def test_deactivated_user_stream_is_closed(self):
+        stream = await self.connect(self.alice)
+        await sync_to_async(User.objects.filter(pk=self.alice.pk).update)(
+            is_active=False
+        )
+        await asyncio.sleep(HEARTBEAT * 2)
+        await self.publish(event(self.project))
+        with self.assertRaises(StopAsyncIteration):
+            await self.next_event(stream)
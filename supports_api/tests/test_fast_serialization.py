@@ -0,0 +1,74 @@
+from django.test import override_settings
+
+from supports_api import fast_serializers
+from supports_api.serializers import (CommentSerializer, IssueSerializer,
+                                      ProjectSerializer)
+
+from .base import APITestCase, make_comment, make_issue
+
+# Formes demandées : défaut, sélection de champs, objets liés développés
+ISSUE_QUERIES = [
+    {},
+    {"fields": "id,title,comments_count,updated_time"},
+    {"expand": "project,author,assigned_to"},
+    {"fields": "id,project.title,assigned_to", "expand": "project,assigned_to"},
+]
+PROJECT_QUERIES = [
+    {},
+    {"fields": "id,title,contributors_count"},
+    {"expand": "author"},
+]
+COMMENT_QUERIES = [
+    {},
+    {"fields": "id,uuid,issue"},
+    {"expand": "issue,issue.project,issue.assigned_to,author"},
+    {"fields": "id,issue.project.title,author", "expand": "issue,issue.project"},
+]
+
+
+class FastSerializationParityTests(APITestCase):
+    """Le chemin compilé produit exactement les octets du chemin standard"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        assigned = make_issue(
+            cls.project,
+            cls.alice,
+            "Écran « noir » ☂",
+            assigned_to=cls.bob,
+            priority="HIGH",
+        )
+        unassigned = make_issue(cls.other_project, cls.bob, "Sans responsable")
+        make_comment(assigned, cls.alice, "Reproduit à 100 %")
+        make_comment(assigned, cls.bob)
+        make_comment(unassigned, cls.alice, "")
+
+    def fetch(self, url, params, fast):
+        with self.settings(SOFTDESK_FAST_SERIALIZATION=fast):
+            response = self.login(self.alice).get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.content
+
+    def assertParity(self, url, queries):
+        for params in queries:
+            with self.subTest(params=params):
+                standard = self.fetch(url, params, fast=False)
+                self.assertEqual(self.fetch(url, params, fast=True), standard)
+
+    def test_issue_list(self):
+        self.assertParity("/api/issues/", ISSUE_QUERIES)
+
+    def test_project_list(self):
+        self.assertParity("/api/projects/", PROJECT_QUERIES)
+
+    def test_comment_list(self):
+        self.assertParity("/api/comments/", COMMENT_QUERIES)
+
+    @override_settings(SOFTDESK_FAST_SERIALIZATION=True)
+    def test_lists_are_compiled(self):
+        for serializer_class in (ProjectSerializer, IssueSerializer, CommentSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertIsNotNone(
+                    fast_serializers.compile_serializer(serializer_class)
+                )
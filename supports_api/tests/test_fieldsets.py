@@ -0,0 +1,70 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from supports_api import fieldsets
+
+from .base import APITestCase, make_comment, make_issue
+
+
+class FieldSelectionTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.issue = make_issue(cls.project, cls.alice, "Visible", assigned_to=cls.bob)
+        cls.comment = make_comment(cls.issue, cls.bob)
+
+    def first(self, url, **params):
+        response = self.login(self.alice).get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["results"][0]
+
+    def test_related_objects_are_ids_by_default(self):
+        row = self.first("/api/issues/")
+        self.assertEqual(row["project"], self.project.pk)
+        self.assertEqual(row["author"], self.alice.pk)
+        self.assertEqual(row["assigned_to"], self.bob.pk)
+
+    def test_fields_limit_the_response(self):
+        row = self.first("/api/issues/", fields="id, title")
+        self.assertEqual(row, {"id": self.issue.pk, "title": "Visible"})
+
+    def test_expand(self):
+        row = self.first("/api/comments/", expand="issue,issue.project")
+        self.assertEqual(row["issue"]["id"], self.issue.pk)
+        self.assertEqual(row["issue"]["project"]["title"], "Projet Alpha")
+        # Non étendu à l'intérieur de l'objet étendu
+        self.assertEqual(row["issue"]["author"], self.alice.pk)
+
+    def test_dotted_field_expands_its_parent(self):
+        row = self.first("/api/comments/", fields="uuid,issue.title")
+        self.assertEqual(
+            row, {"uuid": str(self.comment.uuid), "issue": {"title": "Visible"}}
+        )
+
+    def test_detail_and_unknown_fields(self):
+        response = self.login(self.alice).get(
+            f"/api/issues/{self.issue.pk}/", {"fields": "title,inexistant"}
+        )
+        self.assertEqual(response.json(), {"title": "Visible"})
+
+    def test_fields_are_ignored_on_writes(self):
+        response = self.login(self.alice).patch(
+            f"/api/issues/{self.issue.pk}/?fields=id",
+            {"status": "In Progress"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["status"], "In Progress")
+
+    def test_selection_narrows_the_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.first("/api/issues/", fields="id,title")
+        select = queries.captured_queries[-1]["sql"]
+        self.assertIn('"title"', select)
+        self.assertNotIn('"description"', select)
+        self.assertNotIn("supports_api_comment", select)
+
+    def test_parse_bounds_the_paths(self):
+        value = ",".join(f"f{n}" for n in range(fieldsets.MAX_PATHS + 5))
+        self.assertEqual(len(fieldsets.parse(value)), fieldsets.MAX_PATHS)
+        self.assertEqual(fieldsets.parse(" a, ,b.c "), frozenset({"a", "b.c"}))
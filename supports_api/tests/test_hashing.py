@@ -0,0 +1,74 @@
+import threading
+
+from supports_api import hashing
+
+from .base import PASSWORD, APITestCase
+
+LOGIN = "/api/auth/token/"
+
+PROFILES = {"test": 1000, "renforcé": 1200}
+
+
+class HashingTests(APITestCase):
+    def setUp(self):
+        hashing.reset_pool()
+        self.addCleanup(hashing.reset_pool)
+
+    def login_with(self, password):
+        return self.client.post(
+            LOGIN, {"username": "alice", "password": password}, format="json"
+        )
+
+    def stored_iterations(self):
+        self.alice.refresh_from_db()
+        algorithm, iterations, *_ = self.alice.password.split("$")
+        self.assertEqual(algorithm, "pbkdf2_sha256")
+        return int(iterations)
+
+    def test_profile_change_rehashes_on_next_login(self):
+        self.assertEqual(self.stored_iterations(), 1000)
+        with self.settings(
+            SOFTDESK_HASHING={"PROFILE": "renforcé", "PROFILES": PROFILES}
+        ):
+            self.assertEqual(self.login_with(PASSWORD).status_code, 200)
+            self.assertEqual(self.stored_iterations(), 1200)
+            # Le nouveau hachage reste vérifiable
+            self.assertEqual(self.login_with(PASSWORD).status_code, 200)
+
+    def test_wrong_password_is_not_rehashed(self):
+        before = self.alice.password
+        with self.settings(
+            SOFTDESK_HASHING={"PROFILE": "renforcé", "PROFILES": PROFILES}
+        ):
+            self.assertEqual(self.login_with("mauvais").status_code, 401)
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.password, before)
+
+    def test_full_pool_is_refused(self):
+        started, release = threading.Event(), threading.Event()
+
+        def occupy():
+            started.set()
+            release.wait(5)
+
+        with self.settings(
+            SOFTDESK_HASHING={
+                "PROFILE": "test",
+                "PROFILES": PROFILES,
+                "POOL_SIZE": 1,
+                "QUEUE": 0,
+            }
+        ):
+            hashing.reset_pool()
+            holder = threading.Thread(target=hashing.run, args=("check", occupy))
+            holder.start()
+            try:
+                started.wait(5)
+                response = self.login_with(PASSWORD)
+            finally:
+                release.set()
+                holder.join(5)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.data["detail"].code, "hashing_busy")
+            # Le pool libéré, la connexion aboutit
+            self.assertEqual(self.login_with(PASSWORD).status_code, 200)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from supports_api.models import Issue
+
+from .base import APITestCase, make_issue, make_project
+
+URL = "/api/issues/inbox/"
+
+
+class InboxTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now()
+        cls.expected = []
+        # Statuts et priorités mêlés : l'ordre ne suit que updated_time
+        for n, (status, priority) in enumerate(
+            [
+                ("To Do", "LOW"),
+                ("In Progress", "HIGH"),
+                ("To Do", "MEDIUM"),
+                ("To Do", "HIGH"),
+                ("In Progress", "LOW"),
+            ]
+        ):
+            issue = make_issue(
+                cls.project,
+                cls.bob,
+                f"Problème {n}",
+                assigned_to=cls.alice,
+                status=status,
+                priority=priority,
+            )
+            cls.expected.insert(0, issue.pk)
+        for offset, pk in enumerate(reversed(cls.expected)):
+            Issue.objects.filter(pk=pk).update(
+                updated_time=now + timedelta(minutes=offset)
+            )
+        cls.finished = make_issue(
+            cls.project, cls.bob, "Terminé", assigned_to=cls.alice, status="Finished"
+        )
+        make_issue(cls.project, cls.alice, "Assigné à bob", assigned_to=cls.bob)
+        # Assigné à alice dans un projet dont elle n'est pas contributrice
+        cls.foreign = make_issue(
+            make_project(cls.bob, "Projet privé"),
+            cls.bob,
+            "Étranger",
+            assigned_to=cls.alice,
+        )
+
+    def get(self, url=URL, **params):
+        response = self.login(self.alice).get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_open_issues_newest_first(self):
+        data = self.get()
+        self.assertEqual([row["id"] for row in data["results"]], self.expected)
+        self.assertIsNone(data["next"])
+
+    def test_cursor_pages_cover_the_list_once(self):
+        seen = []
+        data = self.get(page_size=2)
+        while True:
+            self.assertLessEqual(len(data["results"]), 2)
+            seen += [row["id"] for row in data["results"]]
+            if data["next"] is None:
+                break
+            data = self.get(data["next"])
+        self.assertEqual(seen, self.expected)
+
+    def test_filters(self):
+        data = self.get(priority="HIGH")
+        self.assertEqual(
+            [row["id"] for row in data["results"]],
+            [self.expected[1], self.expected[3]],
+        )
+        data = self.get(status="Finished")
+        self.assertEqual([row["id"] for row in data["results"]], [self.finished.pk])
+
+    def test_invalid_parameters(self):
+        client = self.login(self.alice)
+        for params in ({"cursor": "altéré"}, {"status": "Perdu"}, {"page_size": "x"}):
+            self.assertEqual(client.get(URL, params).status_code, 400, params)
+
+    def test_keys_are_read_in_index_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get(page_size=2)
+        (scan,) = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "UNION ALL" in query["sql"]
+        ]
+        # Un LIMIT par couple (statut, priorité) ouvert, dans une requête
+        self.assertEqual(scan.count("LIMIT"), 2 * 3)
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + scan)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertEqual(plan.count("COVERING INDEX issue_inbox_idx"), 2 * 3)
+        self.assertNotIn("TEMP B-TREE", plan)
@@ -0,0 +1,75 @@
+import json
+import re
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from supports_api.instrumentation import RequestProfile
+
+from .base import APITestCase, make_issue
+
+URL = "/api/issues/"
+
+ENTRY_RE = re.compile(r'^[a-z]+(;dur=\d+\.\d{2})?(;desc="[^"]+")?$')
+
+
+class ServerTimingTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        make_issue(cls.project, cls.alice, "Visible")
+
+    def timing(self, **perf):
+        with self.settings(SOFTDESK_PERF={"LOG": False, **perf}):
+            response = self.login(self.alice).get(URL)
+        self.assertEqual(response.status_code, 200)
+        return response.headers.get("Server-Timing")
+
+    def test_header_format(self):
+        header = self.timing()
+        entries = header.split(", ")
+        self.assertEqual(
+            [entry.split(";")[0] for entry in entries],
+            ["db", "dup", "perm", "ser", "total", "size"],
+        )
+        for entry in entries:
+            self.assertRegex(entry, ENTRY_RE)
+        self.assertRegex(header, r'size;desc="\d+ bytes"')
+
+    def test_queries_are_counted_through_the_connection(self):
+        with CaptureQueriesContext(connection) as queries:
+            header = self.timing()
+        counted = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', header)[1])
+        self.assertEqual(counted, len(queries))
+        self.assertGreater(counted, 0)
+
+    def test_sampling(self):
+        self.assertIsNone(self.timing(ENABLED=False))
+        self.assertIsNone(self.timing(SAMPLE_RATE=0.0))
+        self.assertIsNone(self.timing(SERVER_TIMING=False))
+        with mock.patch("supports_api.middleware.random.random", return_value=0.4):
+            self.assertIsNotNone(self.timing(SAMPLE_RATE=0.5))
+        with mock.patch("supports_api.middleware.random.random", return_value=0.6):
+            self.assertIsNone(self.timing(SAMPLE_RATE=0.5))
+
+    def test_log_line(self):
+        with self.assertLogs("supports_api.perf", "INFO") as logs:
+            self.timing(LOG=True)
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line["view"], "IssueViewSet.list")
+        self.assertEqual((line["method"], line["status"]), ("GET", 200))
+        self.assertGreater(line["queries"], 0)
+
+
+class RequestProfileTests(APITestCase):
+    def test_duplicated_queries(self):
+        profile = RequestProfile()
+        with connection.execute_wrapper(profile.record_query):
+            for pk in (self.alice.pk, self.alice.pk, self.bob.pk):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT id FROM supports_api_user WHERE id = %s", [pk]
+                    )
+        self.assertEqual((profile.queries, profile.duplicates), (3, 1))
+        self.assertGreater(profile.db_time, 0)
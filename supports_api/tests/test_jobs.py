@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from supports_api import jobs
+from supports_api.models import Job
+
+from .base import APITestCase
+
+QUEUE = "tests"
+
+performed = []
+
+
+@jobs.handler("tests.ok", queue=QUEUE)
+def ok(job):
+    performed.append(job.pk)
+
+
+@jobs.handler("tests.fail", queue=QUEUE, max_attempts=2)
+def fail(job):
+    raise RuntimeError("échec voulu")
+
+
+@jobs.handler("tests.heartbeat", queue=QUEUE)
+def beat(job):
+    jobs.heartbeat(job)
+
+
+@override_settings(SOFTDESK_JOBS={"QUEUES": {QUEUE: {"CONCURRENCY": 2}}, "BACKOFF": 10})
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        performed.clear()
+
+    def expire(self, job):
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_a_job_is_claimed_once(self):
+        job = jobs.enqueue("tests.ok")
+        claimed = jobs.claim(QUEUE)
+        self.assertEqual(
+            (claimed.pk, claimed.status, claimed.attempts), (job.pk, "running", 1)
+        )
+        self.assertIsNone(jobs.claim(QUEUE))
+
+    def test_claim_is_conditional(self):
+        job = jobs.enqueue("tests.ok")
+        table = connection.ops.quote_name(Job._meta.db_table)
+
+        def concurrent_claim(execute, sql, params, many, context):
+            # Un autre worker réserve la tâche entre la lecture et l'écriture
+            if sql.startswith(f"UPDATE {table} SET status = 'running'"):
+                execute(
+                    f"UPDATE {table} SET status = 'running', locked_by = 'autre', "
+                    "attempts = attempts + 1, locked_until = %s WHERE id = %s",
+                    [jobs._adapt(timezone.now() + timedelta(minutes=5)), job.pk],
+                    many,
+                    context,
+                )
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(concurrent_claim):
+            self.assertIsNone(jobs.claim(QUEUE))
+        job.refresh_from_db()
+        self.assertEqual((job.locked_by, job.attempts), ("autre", 1))
+
+    def test_concurrency_limit(self):
+        for _ in range(3):
+            jobs.enqueue("tests.ok")
+        first, second = jobs.claim(QUEUE), jobs.claim(QUEUE)
+        self.assertIsNotNone(second)
+        self.assertIsNone(jobs.claim(QUEUE))
+        self.assertEqual(jobs.perform(first), "done")
+        self.assertIsNotNone(jobs.claim(QUEUE))
+
+    def test_expired_lease_is_reclaimed(self):
+        jobs.enqueue("tests.ok")
+        stale = jobs.claim(QUEUE)
+        self.expire(stale)
+        fresh = jobs.claim(QUEUE)
+        self.assertEqual((fresh.pk, fresh.attempts), (stale.pk, 2))
+        self.assertNotEqual(fresh.locked_by, stale.locked_by)
+
+        # Le premier worker ne peut plus ni prolonger ni conclure la tâche
+        with self.assertRaises(jobs.LeaseLost):
+            jobs.heartbeat(stale)
+        jobs.perform(stale)
+        row = Job.objects.get(pk=stale.pk)
+        self.assertEqual((row.status, row.locked_by), ("running", fresh.locked_by))
+        self.assertEqual(jobs.perform(fresh), "done")
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, "done")
+
+    def test_lost_lease_inside_the_handler(self):
+        jobs.enqueue("tests.heartbeat")
+        job = jobs.claim(QUEUE)
+        Job.objects.filter(pk=job.pk).update(locked_by="autre")
+        with self.assertLogs("supports_api.jobs", "WARNING"):
+            self.assertEqual(jobs.perform(job), "lost")
+        self.assertEqual(Job.objects.get(pk=job.pk).locked_by, "autre")
+
+    def test_retry_then_failed(self):
+        jobs.enqueue("tests.fail")
+        job = jobs.claim(QUEUE)
+        with self.assertLogs("supports_api.jobs"):
+            self.assertEqual(jobs.perform(job), "retry")
+        job.refresh_from_db()
+        self.assertEqual(job.status, "pending")
+        self.assertIn("échec voulu", job.error)
+        # Relance différée : 5 à 10 secondes pour le premier essai
+        delay = (job.run_after - timezone.now()).total_seconds()
+        self.assertTrue(4 < delay <= 10, delay)
+        self.assertIsNone(jobs.claim(QUEUE))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        job = jobs.claim(QUEUE)
+        with self.assertLogs("supports_api.jobs"):
+            self.assertEqual(jobs.perform(job), "failed")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+        self.assertIsNotNone(job.finished_time)
+        self.assertIsNone(jobs.claim(QUEUE))
+
+    def test_reap_fails_the_last_expired_attempt(self):
+        jobs.enqueue("tests.fail")
+        job = jobs.claim(QUEUE)
+        Job.objects.filter(pk=job.pk).update(attempts=2)
+        self.assertEqual(jobs.reap(), 0)
+        self.expire(job)
+        self.assertIsNone(jobs.claim(QUEUE))
+        self.assertEqual(jobs.reap(), 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, "failed")
+
+    def test_work_once(self):
+        created = [jobs.enqueue("tests.ok").pk for _ in range(3)]
+        jobs.enqueue("tests.ok", delay=60)
+        self.assertEqual(jobs.work([QUEUE], once=True), 3)
+        self.assertEqual(performed, created)
+        self.assertEqual(jobs.stats()[QUEUE], {"done": 3, "pending": 1})
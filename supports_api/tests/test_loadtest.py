@@ -0,0 +1,39 @@
+from django.core.wsgi import get_wsgi_application
+from django.test import TransactionTestCase, override_settings
+
+from supports_api import loadtest
+
+from .base import TEST_SETTINGS
+
+PREFIX = "loadtest-smoke-"
+
+
+@override_settings(**TEST_SETTINGS, ALLOWED_HOSTS=["localhost", "127.0.0.1"])
+class LoadTestSmokeTests(TransactionTestCase):
+    """Quelques requêtes de chaque scénario : le banc de charge fonctionne
+    encore. Les clients travaillent hors de la transaction du test ; un seul
+    client par mode, la base de test en mémoire verrouillant ses tables au
+    lieu d'attendre comme une base fichier."""
+
+    def setUp(self):
+        self.clients = loadtest.seed(PREFIX, 1)
+        self.addCleanup(loadtest.cleanup, PREFIX)
+
+    def run_loadtest(self, scenarios, **options):
+        mix = {name: 1 for name in scenarios}
+        report = loadtest.run(get_wsgi_application(), self.clients, mix, 24, **options)
+        self.assertEqual(report["total"]["requests"], 24)
+        self.assertEqual(report["total"]["errors"], 0, report["scenarios"])
+        self.assertEqual(set(report["scenarios"]), set(scenarios))
+        return report
+
+    def test_threads(self):
+        report = self.run_loadtest(loadtest.SCENARIOS, workers="thread")
+        self.assertGreater(report["total"]["queries"], 0)
+        self.assertEqual(loadtest.compare(report, report, 0.0), [])
+
+    def test_processes_over_a_socket(self):
+        # add_contributor prépare ses données côté client : dans un processus
+        # fils, sur sa copie de la base en mémoire, invisible du serveur
+        scenarios = set(loadtest.SCENARIOS) - {"add_contributor"}
+        self.run_loadtest(scenarios, workers="process", transport="socket")
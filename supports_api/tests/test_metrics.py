@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from supports_api import metrics
+
+from .base import TEST_SETTINGS, APITestCase
+
+URL = "/api/metrics/"
+TOKEN = "jeton-du-collecteur"
+
+
+@override_settings(
+    SOFTDESK_METRICS={**TEST_SETTINGS["SOFTDESK_METRICS"], "TOKEN": TOKEN}
+)
+class MetricsAccessTests(APITestCase):
+    def test_anonymous_local_address_is_refused(self):
+        # Le client de test se présente depuis 127.0.0.1
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+    def test_contributor_is_refused(self):
+        self.assertEqual(self.login(self.alice).get(URL).status_code, 403)
+
+    def test_staff_reads_metrics(self):
+        self.alice.is_staff = True
+        response = self.login(self.alice).get(URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE softdesk_http_requests_total counter", response.content)
+
+    def test_scrape_token(self):
+        response = self.client.get(URL, headers={"authorization": f"Bearer {TOKEN}"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(URL, headers={"authorization": "Bearer autre"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_declared_internal_address(self):
+        with self.settings(
+            SOFTDESK_METRICS={"DIRECTORY": None, "INTERNAL_IPS": ["127.0.0.1"]}
+        ):
+            self.assertEqual(self.client.get(URL).status_code, 200)
+
+
+def dead_pid():
+    """PID d'un processus déjà terminé"""
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+class WorkerFilesTests(SimpleTestCase):
+    KEY = ("softdesk_test_total", (("worker", "any"),))
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(SOFTDESK_METRICS={"DIRECTORY": self.directory})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write(self, pid, value):
+        counters = {self.KEY: value}
+        path = self.directory / f"metrics-{pid}.json"
+        path.write_text(json.dumps(metrics._encode(counters, {})))
+        return path
+
+    def total(self):
+        counters, _ = metrics.collect()
+        return counters.get(self.KEY, 0)
+
+    def test_live_worker_files_are_kept(self):
+        path = self.write(os.getppid(), 3)
+        self.assertEqual(self.total(), 3)
+        self.assertTrue(path.exists())
+
+    def test_dead_worker_counters_are_retired(self):
+        path = self.write(dead_pid(), 5)
+        self.write(os.getppid(), 3)
+        self.assertEqual(self.total(), 8)
+        self.assertFalse(path.exists())
+
+        # Un second worker arrêté s'ajoute au cumul sans le remplacer
+        self.write(dead_pid(), 2)
+        self.assertEqual(self.total(), 10)
+        self.assertEqual(self.total(), 10)
+        self.assertEqual(
+            sorted(path.name for path in self.directory.glob("*.json")),
+            sorted([metrics.RETIRED_FILE, f"metrics-{os.getppid()}.json"]),
+        )
@@ -0,0 +1,82 @@
+from supports_api import nplusone
+from supports_api.models import Issue, User
+
+from .base import PASSWORD, APITestCase, make_comment, make_issue, make_project
+
+# Au-delà du seuil de détection : une requête par ligne serait signalée
+ROWS = nplusone.DEFAULTS["THRESHOLD"] * 2
+
+
+def authors_of(issues):
+    """Lecture volontairement naïve : une requête par problème"""
+    names = []
+    for issue in issues:
+        names.append(issue.author.username)
+    return names
+
+
+class NPlusOneTests(APITestCase):
+    """Lectures de l'API sous ``NPlusOneTestRunner`` (mode ``raise``) : une
+    requête SQL par ligne lève ``NPlusOneError`` dans le client de test"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for n in range(ROWS):
+            user = User.objects.create_user(
+                f"user{n}", f"user{n}@example.com", PASSWORD, age=30
+            )
+            project = make_project(user, f"Projet {n}")
+            project.contributors.create(user=cls.alice)
+            issue = make_issue(project, user, f"Problème {n}", assigned_to=cls.alice)
+            make_comment(issue, user)
+            make_comment(issue, cls.alice)
+        cls.issue = Issue.objects.filter(project__title="Projet 0").get()
+        cls.comment = cls.issue.comments.first()
+
+    def get(self, url, **params):
+        response = self.login(self.alice).get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_runner_raises(self):
+        self.assertEqual(nplusone.get_setting("MODE"), "raise")
+
+    def test_lists_and_details(self):
+        lists = [
+            ("/api/projects/", {}),
+            ("/api/issues/", {}),
+            ("/api/issues/", {"expand": "project,author,assigned_to"}),
+            ("/api/comments/", {}),
+            ("/api/comments/", {"expand": "issue,issue.project,author"}),
+            (f"/api/projects/{self.issue.project_id}/contributors/", {}),
+        ]
+        for url, params in lists:
+            with self.subTest(url=url, params=params):
+                data = self.get(url, page_size=ROWS * 2, **params)
+                rows = data["results"] if isinstance(data, dict) else data
+                self.assertGreaterEqual(len(rows), 2)
+        details = [
+            f"/api/projects/{self.issue.project_id}/",
+            f"/api/issues/{self.issue.pk}/",
+            f"/api/comments/{self.comment.uuid}/",
+        ]
+        for url in details:
+            with self.subTest(url=url):
+                self.get(url, expand="project,issue,author")
+
+    def test_per_row_query_is_reported_with_its_call_site(self):
+        with self.assertRaises(nplusone.NPlusOneError) as raised:
+            with nplusone.detect(scope="authors_of"):
+                authors_of(Issue.objects.all())
+        report = str(raised.exception)
+        self.assertIn("dans authors_of", report)
+        self.assertIn('FROM "supports_api_user"', report)
+        self.assertRegex(
+            report, r"depuis supports_api/tests/test_nplusone\.py:\d+ in authors_of"
+        )
+
+    def test_prefetched_reads_are_not_reported(self):
+        with nplusone.detect() as inspector:
+            authors_of(Issue.objects.select_related("author"))
+        self.assertEqual(inspector.issues(), [])
@@ -0,0 +1,70 @@
+from django.test import override_settings
+
+from supports_api.models import User
+
+from .base import PASSWORD, APITestCase, make_issue
+
+
+@override_settings(SOFTDESK_PAGINATION={"COUNT_LIMIT": 3})
+class CappedCountTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for n in range(6):
+            make_issue(cls.project, cls.alice, f"Problème {n}")
+
+    def test_count_is_capped(self):
+        data = self.login(self.alice).get("/api/issues/", {"page_size": 2}).json()
+        self.assertEqual((data["count"], data["count_exact"]), (3, False))
+        self.assertIsNotNone(data["next"])
+
+    def test_exact_count_on_request(self):
+        data = (
+            self.login(self.alice)
+            .get("/api/issues/", {"page_size": 2, "count": "exact"})
+            .json()
+        )
+        self.assertEqual((data["count"], data["count_exact"]), (6, True))
+
+    def test_count_covers_the_requested_page(self):
+        data = (
+            self.login(self.alice)
+            .get("/api/issues/", {"page_size": 2, "page": 3})
+            .json()
+        )
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNone(data["next"])
+
+
+@override_settings(SOFTDESK_PAGINATION={"COUNT_LIMIT": 3})
+class CappedCountAdminTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = User.objects.create_superuser(
+            "admin", "admin@example.com", PASSWORD, age=40
+        )
+        for n in range(6):
+            make_issue(cls.project, cls.alice, f"Problème {n}")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist(self):
+        response = self.client.get("/admin/supports_api/issue/")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/admin/supports_api/issue/", {"count": "exact"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_autocomplete_uses_the_paginator_outside_the_changelist(self):
+        response = self.client.get(
+            "/admin/autocomplete/",
+            {
+                "app_label": "supports_api",
+                "model_name": "comment",
+                "field_name": "issue",
+                "term": "Problème",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 6)
@@ -0,0 +1,32 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from supports_api import schema
+
+
+class GenerateSchemaTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            SOFTDESK_SCHEMA={"DIRECTORY": directory.name, "VERSION": "test"}
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        schema.code_version.cache_clear()
+        self.addCleanup(schema.code_version.cache_clear)
+
+    def generate(self, *args):
+        output = StringIO()
+        call_command("generate_schema", *args, stdout=output)
+        return output.getvalue()
+
+    def test_if_missing_skips_an_existing_schema(self):
+        self.assertFalse(schema.is_generated())
+        self.assertIn("Schéma généré", self.generate("--if-missing"))
+        self.assertTrue(schema.is_generated())
+        self.assertFalse(schema.is_generated("autre"))
+        self.assertIn("déjà généré", self.generate("--if-missing"))
@@ -0,0 +1,84 @@
+from supports_api import search
+from supports_api.models import Issue
+
+from .base import APITestCase, make_comment, make_issue, make_project
+
+URL = "/api/search/"
+
+
+class SearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.crash = make_issue(
+            cls.project, cls.alice, "Crash au démarrage", description="Écran noir"
+        )
+        cls.slow = make_issue(
+            cls.project,
+            cls.alice,
+            "Lenteur de la liste",
+            description="La liste rame puis crash",
+        )
+        cls.comment = make_comment(cls.slow, cls.alice, "Même crash sur iOS")
+        # Projet de bob seul : jamais visible par alice
+        cls.private = make_project(cls.bob, "Projet privé")
+        cls.hidden = make_issue(cls.private, cls.bob, "Crash confidentiel")
+
+    def search(self, **params):
+        response = self.login(self.alice).get(URL, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_results_are_limited_to_member_projects(self):
+        results = self.search(q="crash")["results"]
+        self.assertEqual(
+            {(row["type"], row["id"]) for row in results},
+            {
+                ("issue", self.crash.pk),
+                ("issue", self.slow.pk),
+                ("comment", self.comment.pk),
+            },
+        )
+
+    def test_title_matches_rank_first(self):
+        results = self.search(q="crash")["results"]
+        self.assertEqual(
+            (results[0]["type"], results[0]["id"]), ("issue", self.crash.pk)
+        )
+        scores = [row["score"] for row in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_comment_result_points_to_its_issue(self):
+        (row,) = self.search(q="ios")["results"]
+        self.assertEqual(row["uuid"], str(self.comment.uuid))
+        self.assertEqual(row["issue"], self.slow.pk)
+        self.assertEqual(row["title"], self.slow.title)
+
+    def test_type_and_project_filters(self):
+        results = self.search(q="crash", type="comment")["results"]
+        self.assertEqual([row["id"] for row in results], [self.comment.pk])
+        self.assertEqual(self.search(q="crash", project=self.private.pk)["count"], 0)
+
+    def test_prefix_and_diacritics(self):
+        self.assertEqual(self.search(q="demar*")["count"], 1)
+        self.assertEqual(self.search(q="ecran")["count"], 1)
+
+    def test_fts_syntax_is_not_injected(self):
+        data = self.search(q='crash" OR title:* NOT (')
+        self.assertEqual(data["count"], 0)
+
+    def test_invalid_parameters(self):
+        client = self.login(self.alice)
+        self.assertEqual(client.get(URL, {"q": "!!"}).status_code, 400)
+        self.assertEqual(client.get(URL, {"q": "a", "type": "x"}).status_code, 400)
+        self.assertEqual(client.get(URL, {"q": "a", "project": "x"}).status_code, 400)
+
+    def test_index_follows_writes(self):
+        Issue.objects.filter(pk=self.crash.pk).update(title="Plantage")
+        self.assertEqual(self.search(q="plantage")["count"], 1)
+        self.slow.delete()
+        self.assertEqual([row["id"] for row in self.search(q="crash")["results"]], [])
+
+    def test_rebuild_matches_triggers(self):
+        self.assertEqual(search.rebuild_index(), Issue.objects.count() + 1)
+        self.assertEqual(self.search(q="crash")["count"], 3)
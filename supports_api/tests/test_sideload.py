@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import APITestCase, make_comment, make_issue
+
+
+class IncludedTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.issue = make_issue(cls.project, cls.alice, "Alpha", assigned_to=cls.bob)
+        cls.other = make_issue(cls.other_project, cls.bob, "Beta")
+        make_comment(cls.issue, cls.bob)
+        make_comment(cls.other, cls.alice)
+
+    def get(self, url, **params):
+        response = self.login(self.alice).get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_no_section_by_default(self):
+        self.assertNotIn("included", self.get("/api/issues/"))
+
+    def test_issue_list_includes_each_object_once(self):
+        data = self.get("/api/issues/", include="users,projects")
+        self.assertEqual(
+            set(data["included"]["projects"]),
+            {str(self.project.pk), str(self.other_project.pk)},
+        )
+        self.assertEqual(
+            set(data["included"]["users"]), {str(self.alice.pk), str(self.bob.pk)}
+        )
+        # Les lignes gardent les identifiants
+        self.assertIsInstance(data["results"][0]["project"], int)
+        project = data["included"]["projects"][str(self.project.pk)]
+        self.assertEqual(project["title"], "Projet Alpha")
+
+    def test_comment_list_includes_projects_through_issues(self):
+        data = self.get("/api/comments/", include="projects")
+        self.assertEqual(
+            set(data["included"]["projects"]),
+            {str(self.project.pk), str(self.other_project.pk)},
+        )
+        self.assertNotIn("users", data["included"])
+
+    def test_projects_follow_the_selected_fields(self):
+        data = self.get("/api/comments/", include="projects", fields="id,author")
+        self.assertEqual(data["included"], {"projects": {}})
+        data = self.get("/api/comments/", include="projects", fields="id,issue.project")
+        self.assertEqual(len(data["included"]["projects"]), 2)
+
+    def test_project_authors_are_included(self):
+        data = self.get("/api/comments/", include="users,projects", fields="id")
+        self.assertEqual(data["included"]["projects"], {})
+        data = self.get("/api/comments/", include="users,projects", fields="issue")
+        # Auteurs des projets, repris des projets inclus
+        self.assertEqual(
+            set(data["included"]["users"]), {str(self.alice.pk), str(self.bob.pk)}
+        )
+
+    def test_one_query_per_kind(self):
+        with CaptureQueriesContext(connection) as plain:
+            self.get("/api/comments/")
+        with CaptureQueriesContext(connection) as included:
+            self.get("/api/comments/", include="users,projects")
+        # Problèmes -> projets, projets, utilisateurs
+        self.assertEqual(len(included) - len(plain), 3)
+
+    def test_unpaginated_list_moves_under_results(self):
+        data = self.get(
+            f"/api/projects/{self.project.pk}/contributors/", include="users"
+        )
+        self.assertEqual({row["user"] for row in data["results"]}, {self.alice.pk})
+        self.assertEqual(set(data["included"]["users"]), {str(self.alice.pk)})
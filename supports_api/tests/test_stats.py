@@ -0,0 +1,43 @@
+from django.core.cache import caches
+
+from supports_api import stats
+
+from .base import APITestCase, make_issue
+
+
+class ProjectStatsTests(APITestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["stats"].clear()
+
+    def project_stats(self):
+        response = self.login(self.alice).get(f"/api/projects/{self.project.pk}/stats/")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_counts_are_cached_in_the_stats_cache(self):
+        make_issue(self.project, self.alice, priority="HIGH")
+        data = self.project_stats()
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["priority"]["HIGH"], 1)
+
+        key = stats._key(self.project.pk)
+        self.assertIsNotNone(caches["stats"].get(key))
+        self.assertIsNone(caches["default"].get(key))
+
+    def test_issue_writes_invalidate_the_project(self):
+        self.assertEqual(self.project_stats()["total"], 0)
+        # L'invalidation a lieu à la validation de la transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = make_issue(self.project, self.alice, assigned_to=self.bob)
+        data = self.project_stats()
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["status"]["To Do"], 1)
+
+        issue.status = "Finished"
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.save()
+        self.assertEqual(self.project_stats()["status"]["Finished"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.delete()
+        self.assertEqual(self.project_stats()["total"], 0)
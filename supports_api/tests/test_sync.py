@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from supports_api import sync
+from supports_api.models import Contributor, Tombstone
+
+from .base import APITestCase, make_comment, make_issue, make_project
+
+URL = "/api/sync/"
+
+
+class SyncTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.issue = make_issue(cls.project, cls.alice, "Visible")
+        cls.comment = make_comment(cls.issue, cls.alice)
+        cls.private = make_project(cls.bob, "Projet privé")
+        cls.hidden = make_issue(cls.private, cls.bob, "Invisible")
+
+    def sync(self, since=None, **params):
+        if since:
+            params["since"] = since
+        response = self.login(self.alice).get(URL, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_initial_sync_returns_visible_objects(self):
+        data = self.sync()
+        self.assertEqual(
+            {row["id"] for row in data["projects"]},
+            {self.project.pk, self.other_project.pk},
+        )
+        self.assertEqual([row["id"] for row in data["issues"]], [self.issue.pk])
+        self.assertEqual(data["comments"][0]["uuid"], str(self.comment.uuid))
+        self.assertEqual(data["issues"][0]["project"], self.project.pk)
+        self.assertFalse(data["has_more"])
+        self.assertEqual(data["deleted"], [])
+
+    def test_incremental_sync_returns_only_changes(self):
+        watermark = self.sync()["watermark"]
+        self.assertEqual(self.sync(watermark)["issues"], [])
+
+        self.issue.title = "Modifié"
+        self.issue.save()
+        data = self.sync(watermark)
+        self.assertEqual([row["title"] for row in data["issues"]], ["Modifié"])
+        self.assertEqual(data["projects"], [])
+
+    def test_deletions_are_reported_as_tombstones(self):
+        watermark = self.sync()["watermark"]
+        response = self.login(self.alice).delete(f"/api/issues/{self.issue.pk}/")
+        self.assertEqual(response.status_code, 204)
+
+        data = self.sync(watermark)
+        self.assertEqual(
+            data["deleted"],
+            [{"type": "issue", "id": self.issue.pk, "project": self.project.pk}],
+        )
+        # Déjà transmise : absente de l'appel suivant
+        self.assertEqual(self.sync(data["watermark"])["deleted"], [])
+
+    def test_tombstones_of_other_projects_are_hidden(self):
+        watermark = self.sync()["watermark"]
+        sync.record_issue_deletion(self.hidden)
+        self.assertEqual(self.sync(watermark)["deleted"], [])
+
+    def test_pages_resume_from_watermark(self):
+        issues = [self.issue] + [
+            make_issue(self.project, self.alice, f"Problème {n}") for n in range(4)
+        ]
+        seen, watermark = [], None
+        while True:
+            data = self.sync(watermark, limit=2)
+            seen += [row["id"] for row in data["issues"]]
+            watermark = data["watermark"]
+            if not data["has_more"]:
+                break
+        self.assertEqual(sorted(seen), sorted(issue.pk for issue in issues))
+
+    def test_joined_project_is_backfilled(self):
+        watermark = self.sync()["watermark"]
+        Contributor.objects.create(user=self.alice, project=self.private)
+        data = self.sync(watermark)
+        self.assertIn(self.hidden.pk, [row["id"] for row in data["issues"]])
+        self.assertIn(self.private.pk, [row["id"] for row in data["projects"]])
+
+    def test_joined_project_backfill_is_paged(self):
+        hidden = [self.hidden] + [
+            make_issue(self.private, self.bob, f"Antérieur {n}") for n in range(4)
+        ]
+        watermark = self.sync()["watermark"]
+        Contributor.objects.create(user=self.alice, project=self.private)
+        seen = []
+        while True:
+            data = self.sync(watermark, limit=2)
+            self.assertLessEqual(len(data["issues"]), 2)
+            seen += [row["id"] for row in data["issues"]]
+            watermark = data["watermark"]
+            if not data["has_more"]:
+                break
+        self.assertEqual(sorted(seen), sorted(issue.pk for issue in hidden))
+        self.assertEqual(self.sync(watermark)["issues"], [])
+
+    def test_invalid_and_expired_watermarks(self):
+        client = self.login(self.alice)
+        self.assertEqual(client.get(URL, {"since": "altéré"}).status_code, 400)
+
+        issued = timezone.now() - sync.get_setting("TOMBSTONE_RETENTION")
+        expired = sync.encode_watermark(
+            {
+                "v": sync.WATERMARK_VERSION,
+                "t": (issued - timedelta(minutes=1)).isoformat(),
+                "d": 0,
+            }
+        )
+        self.assertEqual(client.get(URL, {"since": expired}).status_code, 410)
+
+    def test_prune_tombstones(self):
+        sync.record_issue_deletion(self.issue)
+        later = timezone.now() + sync.get_setting("TOMBSTONE_RETENTION")
+        self.assertEqual(sync.prune_tombstones(later + timedelta(seconds=1)), 1)
+        self.assertFalse(Tombstone.objects.exists())
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.test import override_settings
+
+from supports_api import throttling
+
+from .base import APITestCase
+
+LOGIN = "/api/auth/token/"
+REFRESH = "/api/auth/token/refresh/"
+
+RATES = {
+    "read": "600/min",
+    "write": "120/min",
+    "login": "2/min",
+    "refresh": "2/min",
+    "revoke": "2/min",
+}
+
+
+@override_settings(SOFTDESK_THROTTLE={"ENABLED": True, "PATH": None, "RATES": RATES})
+class AuthThrottleTests(APITestCase):
+    def setUp(self):
+        # Table neuve (en mémoire) pour chaque test
+        throttling._table = None
+        self.addCleanup(setattr, throttling, "_table", None)
+
+    def login_attempt(self, forwarded=None):
+        headers = {"x-forwarded-for": forwarded} if forwarded else {}
+        return self.client.post(
+            LOGIN,
+            {"username": "alice", "password": "faux"},
+            format="json",
+            headers=headers,
+        ).status_code
+
+    def test_login_budget(self):
+        self.assertEqual([self.login_attempt() for _ in range(3)], [401, 401, 429])
+
+    def test_endpoints_have_separate_budgets(self):
+        for _ in range(3):
+            self.login_attempt()
+        response = self.client.post(REFRESH, {"refresh": "invalide"}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_forwarded_address_is_ignored_without_trusted_proxies(self):
+        attempts = [self.login_attempt(f"203.0.113.{n}") for n in range(3)]
+        self.assertEqual(attempts, [401, 401, 429])
+
+    def test_forwarded_address_behind_trusted_proxy(self):
+        with self.settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        ):
+            self.assertEqual(self.login_attempt("198.51.100.1, 203.0.113.1"), 401)
+            self.assertEqual(self.login_attempt("203.0.113.1"), 401)
+            self.assertEqual(self.login_attempt("203.0.113.1"), 429)
+            # Autre client derrière le même proxy : son propre budget
+            self.assertEqual(self.login_attempt("203.0.113.2"), 401)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from supports_api import tokens
+from supports_api.models import RevokedToken
+
+from .base import PASSWORD, APITestCase
+
+LOGIN = "/api/auth/token/"
+REFRESH = "/api/auth/token/refresh/"
+REVOKE = "/api/auth/token/revoke/"
+
+
+class TokenRotationTests(APITestCase):
+    def obtain(self):
+        response = self.client.post(
+            LOGIN, {"username": "alice", "password": PASSWORD}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def refresh(self, token):
+        return self.client.post(REFRESH, {"refresh": token}, format="json")
+
+    def test_refresh_rotates_and_revokes_the_presented_token(self):
+        first = self.obtain()["refresh"]
+        response = self.refresh(first)
+        self.assertEqual(response.status_code, 200, response.content)
+        second = response.json()["refresh"]
+        self.assertNotEqual(second, first)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+        # Token réutilisé (volé ?) : refusé ; le nouveau reste valide
+        self.assertEqual(self.refresh(first).status_code, 401)
+        self.assertEqual(self.refresh(second).status_code, 200)
+
+    def test_access_token_authenticates(self):
+        access = self.obtain()["access"]
+        response = self.client.get(
+            "/api/projects/", headers={"authorization": f"Bearer {access}"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_revoke(self):
+        refresh = self.obtain()["refresh"]
+        response = self.client.post(REVOKE, {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+        # Déjà révoqué
+        response = self.client.post(REVOKE, {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_prune_removes_only_expired_revocations(self):
+        now = timezone.now()
+        for jti, expires_time in [
+            ("expiré", now - timedelta(minutes=1)),
+            ("valide", now + timedelta(days=1)),
+        ]:
+            RevokedToken.objects.create(
+                jti_hash=tokens.jti_hash(jti), expires_time=expires_time
+            )
+        self.assertEqual(tokens.prune(), 1)
+        self.assertTrue(tokens.is_revoked("valide"))
+        self.assertFalse(tokens.is_revoked("expiré"))
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from supports_api import warmup
+
+from .base import APITestCase
+
+URL = "/api/health/"
+
+
+class WarmupTests(APITestCase):
+    def setUp(self):
+        ready, failed = warmup.is_ready(), warmup.has_failed()
+        self.addCleanup(self.restore, ready, failed)
+        warmup._ready.clear()
+        warmup._failed.clear()
+
+    @staticmethod
+    def restore(ready, failed):
+        for event, value in ((warmup._ready, ready), (warmup._failed, failed)):
+            event.set() if value else event.clear()
+
+    def probe(self):
+        response = self.client.get(URL)
+        return response.status_code, response.json()["status"]
+
+    def boot(self, mode, **patch):
+        with (
+            self.settings(SOFTDESK_WARMUP={"MODE": mode}),
+            mock.patch.object(warmup, "warmup", **patch) as run,
+        ):
+            warmup.boot()
+            if mode == "background":
+                # Attend la fin du thread de préchauffage
+                for thread in warmup.threading.enumerate():
+                    if thread.name == "warmup":
+                        thread.join(5)
+        return run
+
+    def test_probe_turns_ready_after_warmup(self):
+        self.assertEqual(self.probe(), (503, "starting"))
+        self.assertEqual(self.client.get(URL)["Retry-After"], "1")
+        timings = warmup.warmup(caches=False)
+        self.assertEqual(set(timings), {"urls", "serializers", "jwt", "database"})
+        self.assertEqual(self.probe(), (200, "ready"))
+
+    def test_off_mode_is_ready_without_warmup(self):
+        run = self.boot("off")
+        run.assert_not_called()
+        self.assertEqual(self.probe(), (200, "ready"))
+
+    def test_sync_and_background_modes_run_warmup(self):
+        for mode in ("sync", "background"):
+            with self.subTest(mode=mode):
+                run = self.boot(mode, side_effect=warmup.mark_ready)
+                run.assert_called_once_with()
+                self.assertEqual(self.probe(), (200, "ready"))
+                warmup._ready.clear()
+
+    def test_failed_warmup_is_not_ready(self):
+        for mode in ("sync", "background"):
+            with self.subTest(mode=mode), self.assertLogs("supports_api.warmup"):
+                self.boot(mode, side_effect=RuntimeError("base injoignable"))
+                self.assertEqual(self.probe(), (503, "degraded"))
+                self.assertFalse(warmup.is_ready())
+                warmup._failed.clear()
+
+    def test_successful_warmup_clears_a_failure(self):
+        warmup.mark_failed()
+        warmup.warmup(caches=False)
+        self.assertEqual(self.probe(), (200, "ready"))
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from supports_api import archive, deletion, workload
+from supports_api.models import Contributor, WorkloadSummary
+
+from .base import APITestCase, make_issue, make_project
+
+
+class WorkloadMaintenanceTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Contributor.objects.create(user=cls.bob, project=cls.project)
+        cls.issue = make_issue(cls.project, cls.alice, "Alpha", assigned_to=cls.bob)
+        make_issue(cls.other_project, cls.bob, "Beta", assigned_to=cls.alice)
+
+    def assertConsistent(self):
+        self.assertEqual(workload.check(), {})
+
+    def test_single_writes(self):
+        self.assertConsistent()
+        issue = make_issue(self.project, self.bob, "Nouveau", priority="HIGH")
+        self.assertConsistent()
+        issue.assigned_to = self.alice
+        issue.save()
+        self.assertConsistent()
+        issue.status, issue.priority = "In Progress", "LOW"
+        issue.save()
+        self.assertConsistent()
+        issue.assigned_to = None
+        issue.save()
+        self.assertConsistent()
+        issue.delete()
+        self.assertConsistent()
+
+    def test_writes_through_the_api(self):
+        client = self.login(self.alice)
+        response = client.patch(
+            f"/api/issues/{self.issue.pk}/",
+            {"status": "Finished", "assigned_to": self.alice.pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertConsistent()
+        self.assertEqual(
+            client.delete(f"/api/issues/{self.issue.pk}/").status_code, 204
+        )
+        self.assertConsistent()
+
+    def test_user_deletion(self):
+        task = deletion.schedule_user_deletion(self.bob)
+        self.assertConsistent()
+        deletion.run(task, batch_size=1, pause=0)
+        self.assertConsistent()
+
+    def test_project_deletion(self):
+        task = deletion.schedule_project_deletion(self.project, self.alice)
+        self.assertConsistent()
+        deletion.run(task, batch_size=1, pause=0)
+        self.assertConsistent()
+
+    def test_archive_and_restore(self):
+        self.issue.status = "Finished"
+        self.issue.save()
+        archived, _ = archive.run(timezone.now() + timedelta(days=1), pause=0)
+        self.assertEqual(archived, 1)
+        self.assertConsistent()
+        self.assertEqual(
+            workload.summary(self.bob.pk, self.bob)["assigned"]["total"], 0
+        )
+        archive.restore([self.issue.pk])
+        self.assertConsistent()
+        self.assertEqual(
+            workload.summary(self.bob.pk, self.bob)["assigned"]["total"], 1
+        )
+
+    def test_rebuild_repairs_drift(self):
+        WorkloadSummary.objects.update(count=7)
+        self.assertNotEqual(workload.check(), {})
+        workload.rebuild()
+        self.assertConsistent()
+
+
+class WorkloadEndpointTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Contributor.objects.create(user=cls.bob, project=cls.project)
+        make_issue(cls.project, cls.alice, "Partagé", assigned_to=cls.bob)
+        # Projet de bob dont alice n'est pas contributrice
+        private = make_project(cls.bob, "Projet privé")
+        make_issue(private, cls.bob, "Privé", assigned_to=cls.bob, priority="HIGH")
+
+    def workload(self, viewer, user):
+        response = self.login(viewer).get(f"/api/users/{user.pk}/workload/")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_owner_sees_every_project(self):
+        assigned = self.workload(self.bob, self.bob)["assigned"]
+        self.assertEqual((assigned["total"], assigned["open"]), (2, 2))
+        self.assertEqual(assigned["open_by_priority"]["HIGH"], 1)
+        self.assertEqual(len(assigned["projects"]), 2)
+
+    def test_viewer_only_sees_shared_projects(self):
+        data = self.workload(self.alice, self.bob)
+        self.assertEqual(data["user"], self.bob.pk)
+        self.assertEqual(
+            data["assigned"]["projects"],
+            [{"project": self.project.pk, "total": 1, "open": 1}],
+        )
+        self.assertEqual(data["assigned"]["open_by_priority"]["HIGH"], 0)
+        # Le seul problème écrit par bob est dans son projet privé
+        self.assertEqual(data["authored"]["total"], 0)
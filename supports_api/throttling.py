@@ -0,0 +1,211 @@
+"""
+Limitation de débit par seau à jetons, partagée entre les workers.
+
+Chaque seau (utilisateur ou IP, vue, lecture/écriture) occupe un
+emplacement de 24 octets — empreinte de la clé, jetons restants, date de
+mise à jour — dans une table de hachage de taille fixe projetée en mémoire
+(``mmap``) depuis ``SOFTDESK_THROTTLE["PATH"]``. Tous les processus d'une
+machine partagent ce fichier ; une vérification lit et réécrit au plus
+``PROBES`` emplacements sous un verrou ``fcntl`` limité à cette plage :
+coût constant, aucune requête SQL. Lorsque la plage est pleine, le seau
+inactif depuis le plus longtemps est recyclé (il serait de toute façon plein).
+
+Sans ``PATH`` (ou hors POSIX), la table est propre au processus.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows : table propre au processus
+    fcntl = None
+
+DEFAULTS = {
+    "ENABLED": True,
+    "PATH": None,
+    "SLOTS": 65536,
+    # "nombre/période" : capacité du seau et recharge sur la période
+    "RATES": {
+        "read": "600/min",
+        "write": "120/min",
+        # Endpoints de token, par IP (``throttle_scope`` de la vue)
+        "login": "10/min",
+        "refresh": "30/min",
+        "revoke": "30/min",
+    },
+    # Budgets propres à une vue : "ViewSet.read" / "ViewSet.write"
+    "OVERRIDES": {},
+}
+
+PROBES = 8
+SLOT = struct.Struct("<Qdd")
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_THROTTLE", {}).get(name, DEFAULTS[name])
+
+
+def parse_rate(rate):
+    """``"120/min"`` -> (capacité, jetons rechargés par seconde)"""
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / PERIODS[period.strip()[0]]
+
+
+class BucketTable:
+    """Table de seaux à jetons en mémoire partagée"""
+
+    def __init__(self, path, slots):
+        self.slots = slots
+        size = (slots + PROBES) * SLOT.size
+        self._lock = threading.Lock()
+        self._fd = None
+        if path and fcntl is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+        else:
+            self._map = mmap.mmap(-1, size)
+
+    @contextmanager
+    def _locked(self, start):
+        # Verrou de thread (les verrous fcntl sont propres au processus) puis
+        # verrou de la plage d'emplacements entre processus
+        with self._lock:
+            if self._fd is None:
+                yield
+                return
+            offset, length = start * SLOT.size, PROBES * SLOT.size
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, offset)
+
+    def consume(self, key, capacity, refill, now=None):
+        """Retire un jeton du seau ``key`` ; retourne (autorisé, attente en s)"""
+        now = time.time() if now is None else now
+        digest = int.from_bytes(
+            hashlib.blake2b(key.encode(), digest_size=8).digest(), "little"
+        )
+        digest = digest or 1  # 0 marque un emplacement libre
+        start = digest % self.slots
+
+        with self._locked(start):
+            target, tokens = None, float(capacity)
+            free = oldest = None
+            oldest_time = float("inf")
+            for index in range(start, start + PROBES):
+                stored, stored_tokens, updated = SLOT.unpack_from(
+                    self._map, index * SLOT.size
+                )
+                if stored == digest:
+                    target = index
+                    elapsed = max(now - updated, 0.0)
+                    tokens = min(float(capacity), stored_tokens + elapsed * refill)
+                    break
+                if stored == 0:
+                    if free is None:
+                        free = index
+                elif updated < oldest_time:
+                    oldest, oldest_time = index, updated
+            if target is None:
+                target = free if free is not None else oldest
+
+            if tokens >= 1:
+                allowed, wait = True, 0.0
+                tokens -= 1
+            else:
+                allowed, wait = False, (1 - tokens) / refill
+            SLOT.pack_into(self._map, target * SLOT.size, digest, tokens, now)
+        return allowed, wait
+
+
+_table = None
+_table_lock = threading.Lock()
+_table_pid = None
+
+
+def get_table():
+    """Table du processus courant (rouverte après un fork)"""
+    global _table, _table_pid
+    if _table is None or _table_pid != os.getpid():
+        with _table_lock:
+            if _table is None or _table_pid != os.getpid():
+                path = get_setting("PATH")
+                _table = BucketTable(str(path) if path else None, get_setting("SLOTS"))
+                _table_pid = os.getpid()
+    return _table
+
+
+""" Throttles DRF """
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base des limitations par seau à jetons"""
+
+    def get_scope(self, request, view):
+        raise NotImplementedError
+
+    def get_key(self, request, view, scope):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}:{scope}"
+        return f"ip:{self.get_ident(request)}:{scope}"
+
+    def get_rate(self, scope):
+        kind = scope.rsplit(".", 1)[-1]
+        return get_setting("OVERRIDES").get(scope) or get_setting("RATES")[kind]
+
+    def allow_request(self, request, view):
+        if not get_setting("ENABLED"):
+            return True
+        scope = self.get_scope(request, view)
+        capacity, refill = parse_rate(self.get_rate(scope))
+        allowed, self._wait = get_table().consume(
+            self.get_key(request, view, scope), capacity, refill
+        )
+        if not allowed:
+            metrics.inc("softdesk_throttled_requests_total", (("scope", scope),))
+        return allowed
+
+    def wait(self):
+        return getattr(self, "_wait", None)
+
+
+class EndpointThrottle(TokenBucketThrottle):
+    """Budgets de lecture et d'écriture distincts par vue, par utilisateur
+    (ou par IP pour les actions anonymes comme l'inscription)"""
+
+    def get_scope(self, request, view):
+        kind = "read" if request.method in ("GET", "HEAD", "OPTIONS") else "write"
+        return f"{type(view).__name__}.{kind}"
+
+
+class AuthThrottle(TokenBucketThrottle):
+    """Budget par IP de chaque endpoint de token (``throttle_scope`` de la
+    vue : ``login``, ``refresh`` ou ``revoke``).
+
+    L'IP est celle du client d'après ``X-Forwarded-For`` lorsque
+    ``REST_FRAMEWORK["NUM_PROXIES"]`` déclare les proxies de confiance,
+    sinon ``REMOTE_ADDR`` (voir ``BaseThrottle.get_ident``).
+    """
+
+    def get_scope(self, request, view):
+        return getattr(view, "throttle_scope", "login")
+
+    def get_key(self, request, view, scope):
+        return f"ip:{self.get_ident(request)}:{scope}"
@@ -0,0 +1,114 @@
+"""
+Rotation des tokens de rafraîchissement et liste de révocation compacte.
+
+Chaque rafraîchissement révoque le token présenté et en émet un nouveau
+(``ROTATE_REFRESH_TOKENS``) : un token volé puis réutilisé est refusé. La
+liste de révocation (``RevokedToken``) ne garde qu'un condensé de 64 bits du
+``jti`` et la date d'expiration du token ; sa taille est bornée par le
+nombre de rotations sur une durée de vie de token.
+
+- Vérification : une lecture par clé primaire.
+- Révocation : une insertion ; une clé déjà présente signifie que le token a
+  déjà servi (deux rafraîchissements concurrents avec le même token n'en
+  produisent qu'un).
+- Purge : les lignes expirées sont supprimées au plus toutes les
+  ``PRUNE_INTERVAL`` secondes par processus, par lots de ``PRUNE_BATCH``.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (TokenBlacklistSerializer,
+                                                  TokenRefreshSerializer)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+DEFAULTS = {
+    "PRUNE_INTERVAL": 3600,
+    "PRUNE_BATCH": 5000,
+}
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_TOKENS", {}).get(name, DEFAULTS[name])
+
+
+def jti_hash(jti):
+    """64 premiers bits (signés) du SHA-256 du ``jti``"""
+    digest = hashlib.sha256(str(jti).encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def is_revoked(jti):
+    return RevokedToken.objects.filter(jti_hash=jti_hash(jti)).exists()
+
+
+def revoke(jti, expires_time):
+    """Révoque ``jti`` ; retourne ``False`` s'il l'était déjà"""
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(
+                jti_hash=jti_hash(jti), expires_time=expires_time
+            )
+    except IntegrityError:
+        return False
+    maybe_prune()
+    return True
+
+
+def prune():
+    """Supprime un lot de révocations expirées ; retourne le nombre supprimé"""
+    expired = RevokedToken.objects.filter(expires_time__lt=timezone.now()).values(
+        "jti_hash"
+    )[: get_setting("PRUNE_BATCH")]
+    deleted, _ = RevokedToken.objects.filter(jti_hash__in=expired).delete()
+    return deleted
+
+
+_last_prune = 0.0
+
+
+def maybe_prune():
+    global _last_prune
+    now = time.monotonic()
+    if now - _last_prune < get_setting("PRUNE_INTERVAL"):
+        return
+    _last_prune = now
+    prune()
+
+
+class RevocableRefreshToken(RefreshToken):
+    """Token de rafraîchissement vérifié contre ``RevokedToken``"""
+
+    def verify(self):
+        super().verify()
+        if is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError("Token révoqué")
+
+    def blacklist(self):
+        if not revoke(self[api_settings.JTI_CLAIM], datetime_from_epoch(self["exp"])):
+            raise TokenError("Token révoqué")
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """Rafraîchissement avec rotation : le token présenté est révoqué"""
+
+    token_class = RevocableRefreshToken
+
+    def validate(self, attrs):
+        # Révocation et nouveau token dans la même transaction
+        with transaction.atomic():
+            return super().validate(attrs)
+
+
+class RevokeTokenSerializer(TokenBlacklistSerializer):
+    """Déconnexion : révoque le token de rafraîchissement"""
+
+    token_class = RevocableRefreshToken
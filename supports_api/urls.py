@@ -1,10 +1,17 @@
 from django.urls import include, path
-from drf_spectacular.utils import OpenApiExample, extend_schema
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import (TokenObtainPairView,
+from rest_framework_simplejwt.views import (TokenBlacklistView,
+                                            TokenObtainPairView,
                                             TokenRefreshView)
 
-from .views import CommentViewSet, IssueViewSet, ProjectViewSet, UserViewSet
+from .authentication import MeteredTokenViewMixin
+from .instrumentation import InstrumentedViewMixin
+from .openapi import OpenApiExample, extend_schema
+from .throttling import AuthThrottle
+from .views import (ArchivedIssueViewSet, BatchView, CommentViewSet,
+                    DeletionTaskViewSet, IssueViewSet, MetricsView,
+                    ProjectViewSet, SearchViewSet, SyncViewSet, UserViewSet,
+                    event_stream, health)
 
 # Configuration du router pour les ViewSets
 router = DefaultRouter()
@@ -12,11 +19,20 @@ router.register(r"users", UserViewSet)
 router.register(r"projects", ProjectViewSet, basename="project")
 router.register(r"issues", IssueViewSet, basename="issue")
 router.register(r"comments", CommentViewSet, basename="comment")
+router.register(r"search", SearchViewSet, basename="search")
+router.register(r"sync", SyncViewSet, basename="sync")
+router.register(r"deletions", DeletionTaskViewSet, basename="deletion")
+router.register(r"archive/issues", ArchivedIssueViewSet, basename="archived-issue")
 
 # Vues d'authentification avec documentation Swagger
 
 
-class DocumentedTokenObtainPairView(TokenObtainPairView):
+class DocumentedTokenObtainPairView(
+    InstrumentedViewMixin, MeteredTokenViewMixin, TokenObtainPairView
+):
+    throttle_classes = [AuthThrottle]
+    throttle_scope = "login"
+
     @extend_schema(
         summary="Obtenir un token JWT",
         description="Authentifie un utilisateur et retourne un token d'accès et de rafraîchissement.",
@@ -45,10 +61,18 @@ class DocumentedTokenObtainPairView(TokenObtainPairView):
         return super().post(request, *args, **kwargs)
 
 
-class DocumentedTokenRefreshView(TokenRefreshView):
+class DocumentedTokenRefreshView(
+    InstrumentedViewMixin, MeteredTokenViewMixin, TokenRefreshView
+):
+    failure_reason = "refresh"
+    throttle_classes = [AuthThrottle]
+    throttle_scope = "refresh"
+
     @extend_schema(
         summary="Rafraîchir un token JWT",
-        description="Rafraîchit un token d'accès expiré en utilisant le token de rafraîchissement.",
+        description="Rafraîchit un token d'accès expiré en utilisant le token de "
+        "rafraîchissement. Le token présenté est révoqué et remplacé par le "
+        "token de rafraîchissement retourné.",
         tags=["auth"],
         examples=[
             OpenApiExample(
@@ -59,10 +83,44 @@ class DocumentedTokenRefreshView(TokenRefreshView):
             200: {
                 "type": "object",
                 "properties": {
-                    "access": {"type": "string", "description": "Nouveau token d'accès"}
+                    "access": {
+                        "type": "string",
+                        "description": "Nouveau token d'accès",
+                    },
+                    "refresh": {
+                        "type": "string",
+                        "description": "Nouveau token de rafraîchissement",
+                    },
                 },
             },
-            401: {"description": "Token de rafraîchissement invalide"},
+            401: {"description": "Token de rafraîchissement invalide ou révoqué"},
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+class DocumentedTokenRevokeView(
+    InstrumentedViewMixin, MeteredTokenViewMixin, TokenBlacklistView
+):
+    failure_reason = "revoke"
+    throttle_classes = [AuthThrottle]
+    throttle_scope = "revoke"
+
+    @extend_schema(
+        summary="Révoquer un token de rafraîchissement",
+        description="Déconnexion : le token de rafraîchissement ne peut plus être "
+        "utilisé. Les tokens d'accès déjà émis restent valides jusqu'à leur "
+        "expiration.",
+        tags=["auth"],
+        examples=[
+            OpenApiExample(
+                "Exemple révocation", value={"refresh": "votre_refresh_token"}
+            )
+        ],
+        responses={
+            200: {"type": "object"},
+            401: {"description": "Token de rafraîchissement invalide ou révoqué"},
         },
     )
     def post(self, request, *args, **kwargs):
@@ -73,11 +131,24 @@ class DocumentedTokenRefreshView(TokenRefreshView):
 auth_urls = [
     path("token/", DocumentedTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", DocumentedTokenRefreshView.as_view(), name="token_refresh"),
+    path("token/revoke/", DocumentedTokenRevokeView.as_view(), name="token_revoke"),
 ]
 
 urlpatterns = [
     # Routes pour l'authentification
     path("auth/", include(auth_urls)),
+    # Flux d'événements temps réel (SSE, ASGI uniquement)
+    path("events/", event_stream, name="events"),
+    # Sonde de disponibilité (prête après le préchauffage)
+    path("health/", health, name="health"),
+    # Métriques Prometheus (administrateurs ou jeton du collecteur)
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    # Requêtes groupées vers les ViewSets du router
+    path(
+        "batch/",
+        BatchView.as_view(viewsets=tuple(viewset for _, viewset, _ in router.registry)),
+        name="batch",
+    ),
     # Routes pour l'API
     path("", include(router.urls)),
 ]
@@ -1,23 +1,47 @@
-from django.db import IntegrityError
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.http import (Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import (OpenApiExample, extend_schema,
-                                   extend_schema_view)
+from django.views.decorators.http import require_safe
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 
-from .models import Comment, Contributor, Issue, Project, User
-from .permissions import (IsCommentAuthorOrReadOnly, IsIssueAuthorOrReadOnly,
-                          IsProjectAuthorOrReadOnly, IsUserOwnerOrReadOnly)
-from .serializers import (CommentCreateSerializer, CommentSerializer,
+from . import (archive, autocomplete, batch, deletion, events,
+               fast_serializers, fieldsets, inbox, metrics, search, sideload,
+               stats, sync, warmup, workload)
+from .authentication import (MeteredJWTAuthentication,
+                             MetricsTokenAuthentication)
+from .instrumentation import InstrumentedViewMixin
+from .models import (ArchivedComment, ArchivedIssue, Comment, Contributor,
+                     DeletionTask, Issue, Project, User)
+from .openapi import (OpenApiExample, OpenApiParameter, extend_schema,
+                      extend_schema_view)
+from .pagination import CappedCountPagination
+from .permissions import (IsAdminOrInternal, IsCommentAuthorOrReadOnly,
+                          IsIssueAuthorOrReadOnly, IsProjectAuthorOrReadOnly,
+                          IsUserOwnerOrReadOnly, is_contributor)
+from .serializers import (ArchivedCommentSerializer, ArchivedIssueSerializer,
+                          BatchRequestSerializer, BatchResponseSerializer,
+                          CommentCreateSerializer, CommentSerializer,
                           ContributorCreateSerializer, ContributorSerializer,
+                          DeletionTaskSerializer, InboxIssueSerializer,
                           IssueCreateSerializer, IssueSerializer,
-                          ProjectSerializer, UserCreateSerializer,
-                          UserSerializer)
+                          ProjectSerializer, ProjectStatsSerializer,
+                          SearchResultSerializer, UserCreateSerializer,
+                          UserSerializer, UserSuggestionSerializer,
+                          WorkloadSerializer)
 
 
-class StandardResultsSetPagination(PageNumberPagination):
+class StandardResultsSetPagination(CappedCountPagination):
     """Pagination standard pour optimiser les performances (green code)"""
 
     page_size = 10
@@ -25,11 +49,128 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class IncludedMixin:
+    """``?include=users,projects`` (voir ``supports_api.sideload``) : section
+    ``included`` ajoutée aux réponses de liste"""
+
+    def list_response(self, data, serializer_class, paginated=False):
+        """Réponse d'une liste sérialisée ; sans pagination, la liste est
+        placée sous ``results`` si des objets liés sont inclus"""
+        if paginated:
+            response = self.get_paginated_response(data)
+        elif sideload.requested(self.request):
+            response = Response({"results": data})
+        else:
+            return Response(data)
+        return self.include_related(response, data, serializer_class)
+
+    def include_related(self, response, data, serializer_class):
+        """Ajoute la section ``included`` à ``response`` si elle est demandée"""
+        kinds = sideload.requested(self.request)
+        if kinds:
+            response.data["included"] = sideload.included(
+                data, serializer_class, self.get_serializer_context(), kinds
+            )
+        return response
+
+
+class FastListMixin(IncludedMixin):
+    """Liste en lecture seule via le sérialiseur compilé (``values_list``).
+
+    Produit le même JSON que le sérialiseur de la vue en ne lisant que les
+    colonnes nécessaires ; se replie sur le chemin standard si le
+    sérialiseur n'est pas compilable.
+    """
+
+    def serialize_list(self, queryset, serializer_class=None, paginate=True):
+        """Sérialise ``queryset`` (paginé si possible) et construit la réponse"""
+        serializer_class = serializer_class or self.get_serializer_class()
+        compiled = fast_serializers.compile_serializer(
+            serializer_class, self.get_serializer_context()
+        )
+        if compiled is None:
+            page = self.paginate_queryset(queryset) if paginate else None
+            if page is not None:
+                serializer = serializer_class(
+                    page, many=True, context=self.get_serializer_context()
+                )
+                return self.list_response(
+                    serializer.data, serializer_class, paginated=True
+                )
+            serializer = serializer_class(
+                queryset, many=True, context=self.get_serializer_context()
+            )
+            return self.list_response(serializer.data, serializer_class)
+
+        rows = compiled.values(queryset)
+        page = self.paginate_queryset(rows) if paginate else None
+        if page is not None:
+            return self.list_response(
+                compiled.serialize(page), serializer_class, paginated=True
+            )
+        return self.list_response(compiled.serialize(rows), serializer_class)
+
+    def list(self, request, *args, **kwargs):
+        return self.serialize_list(self.filter_queryset(self.get_queryset()))
+
+
+class FieldSelectionMixin:
+    """``?fields=`` et ``?expand=`` (voir ``supports_api.fieldsets``) : la
+    sélection est transmise aux sérialiseurs et restreint les colonnes et
+    jointures des lectures"""
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["selection"] = fieldsets.Selection.from_request(self.request)
+        return context
+
+    def narrow_queryset(self, queryset, serializer_class=None):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset
+        return fieldsets.narrow(
+            queryset,
+            serializer_class or self.get_serializer_class(),
+            self.get_serializer_context(),
+        )
+
+    def filter_queryset(self, queryset):
+        return self.narrow_queryset(super().filter_queryset(queryset))
+
+
+# Paramètres de sélection des champs, documentés sur les lectures
+SELECTION_PARAMETERS = [
+    OpenApiParameter(
+        fieldsets.FIELDS_PARAM,
+        str,
+        description="Champs retournés, séparés par des virgules (``issue.title`` "
+        "pour un champ d'un objet lié)",
+    ),
+    OpenApiParameter(
+        fieldsets.EXPAND_PARAM,
+        str,
+        description="Objets liés retournés en entier plutôt que par leur "
+        "identifiant (``issue,issue.project``)",
+    ),
+]
+
+# Listes pouvant inclure leurs utilisateurs et projets une seule fois
+INCLUDED_PARAMETERS = [
+    *SELECTION_PARAMETERS,
+    OpenApiParameter(
+        sideload.INCLUDE_PARAM,
+        str,
+        description="Objets liés ajoutés une seule fois à une section "
+        "``included`` indexée par identifiant (``users,projects``)",
+    ),
+]
+
+
 @extend_schema_view(
     list=extend_schema(
         summary="Lister tous les utilisateurs",
         description="Récupère la liste paginée de tous les utilisateurs. Nécessite une authentification.",
         tags=["users"],
+        parameters=SELECTION_PARAMETERS,
     ),
     create=extend_schema(
         summary="Créer un nouvel utilisateur",
@@ -54,6 +195,7 @@ class StandardResultsSetPagination(PageNumberPagination):
         summary="Récupérer un utilisateur",
         description="Récupère les détails d'un utilisateur spécifique.",
         tags=["users"],
+        parameters=SELECTION_PARAMETERS,
     ),
     update=extend_schema(
         summary="Modifier un utilisateur",
@@ -67,14 +209,17 @@ class StandardResultsSetPagination(PageNumberPagination):
     ),
     destroy=extend_schema(
         summary="Supprimer un utilisateur",
-        description="Supprime un utilisateur (propriétaire uniquement, droit à l'oubli RGPD).",
+        description="Désactive le compte et programme sa suppression par lots "
+        "(propriétaire uniquement, droit à l'oubli RGPD).",
         tags=["users"],
+        responses={202: DeletionTaskSerializer},
     ),
 )
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(InstrumentedViewMixin, FieldSelectionMixin, viewsets.ModelViewSet):
     """Vue pour la gestion des utilisateurs avec RGPD"""
 
-    queryset = User.objects.all()
+    # Les comptes en cours de suppression sont désactivés et masqués
+    queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated, IsUserOwnerOrReadOnly]
     pagination_class = StandardResultsSetPagination
@@ -91,6 +236,13 @@ class UserViewSet(viewsets.ModelViewSet):
             return [permissions.AllowAny()]
         return super().get_permissions()
 
+    def destroy(self, request, *args, **kwargs):
+        """Désactive le compte et programme sa suppression en arrière-plan"""
+        task = deletion.schedule_user_deletion(self.get_object())
+        return Response(
+            DeletionTaskSerializer(task).data, status=status.HTTP_202_ACCEPTED
+        )
+
     @extend_schema(
         summary="Gérer le profil utilisateur",
         description="Permet de consulter et modifier le profil utilisateur (propriétaire uniquement, RGPD).",
@@ -124,19 +276,75 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @extend_schema(
         summary="Supprimer le compte (droit à l'oubli)",
-        description="Supprime complètement le compte utilisateur selon le RGPD (propriétaire uniquement).",
+        description="Désactive immédiatement le compte puis le supprime complètement "
+        "en arrière-plan selon le RGPD (propriétaire uniquement).",
         tags=["users"],
-        responses={204: None, 403: None},
+        responses={202: DeletionTaskSerializer, 403: None},
     )
     @action(detail=True, methods=["delete"])
     def delete_account(self, request, pk=None):
         """Droit à l'oubli (RGPD)"""
+        return self.destroy(request, pk=pk)
+
+    @extend_schema(
+        summary="Charge de travail",
+        description="Problèmes assignés à l'utilisateur et problèmes dont il est "
+        "l'auteur, par statut, priorité (problèmes ouverts) et projet, limités aux "
+        "projets dont le demandeur est contributeur. Lu dans une table de "
+        "synthèse maintenue à chaque écriture.",
+        tags=["users"],
+        responses={200: WorkloadSerializer},
+    )
+    @action(detail=True, methods=["get"])
+    def workload(self, request, pk=None):
+        """Charge de travail d'un utilisateur"""
         user = self.get_object()
-        user.delete()
-        return Response(
-            {"message": "Compte supprimé avec succès"},
-            status=status.HTTP_204_NO_CONTENT,
-        )
+        return Response(workload.summary(user.pk, request.user))
+
+    @extend_schema(
+        summary="Suggestions d'utilisateurs",
+        description="Utilisateurs dont le nom ou l'email commence par ``q`` (sans "
+        "tenir compte de la casse), pour choisir un contributeur ou un assigné. "
+        "Les contributeurs de ``project`` sont proposés en premier.",
+        tags=["users"],
+        parameters=[
+            OpenApiParameter("q", str, description="Début du nom ou de l'email"),
+            OpenApiParameter(
+                "project",
+                int,
+                description="Projet dont les contributeurs passent en premier",
+            ),
+            OpenApiParameter(
+                "limit",
+                int,
+                description=f"1 à {autocomplete.MAX_LIMIT} "
+                f"(défaut {autocomplete.LIMIT})",
+            ),
+        ],
+        responses={200: UserSuggestionSerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """Suggestions d'utilisateurs par préfixe"""
+        params = request.query_params
+        prefix = params.get("q", "")
+        if not prefix.strip():
+            raise ValidationError({"q": "Préfixe requis."})
+        try:
+            limit = int(params.get("limit", autocomplete.LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Entier attendu."})
+        limit = min(max(limit, 1), autocomplete.MAX_LIMIT)
+        project_id = params.get("project")
+        if project_id is not None:
+            if not project_id.isdigit():
+                raise ValidationError({"project": "Identifiant de projet invalide."})
+            # Classement réservé aux projets du demandeur
+            project_id = int(project_id)
+            if not is_contributor(request, project_id):
+                project_id = None
+        suggestions = autocomplete.suggest(prefix, limit, project_id)
+        return Response(UserSuggestionSerializer(suggestions, many=True).data)
 
 
 """ Project ViewSet """
@@ -147,6 +355,7 @@ class UserViewSet(viewsets.ModelViewSet):
         summary="Lister les projets",
         description="Récupère la liste paginée des projets de l'utilisateur connecté.",
         tags=["projects"],
+        parameters=SELECTION_PARAMETERS,
     ),
     create=extend_schema(
         summary="Créer un nouveau projet",
@@ -167,6 +376,7 @@ class UserViewSet(viewsets.ModelViewSet):
         summary="Récupérer un projet",
         description="Récupère les détails d'un projet spécifique.",
         tags=["projects"],
+        parameters=SELECTION_PARAMETERS,
     ),
     update=extend_schema(
         summary="Modifier un projet",
@@ -180,11 +390,15 @@ class UserViewSet(viewsets.ModelViewSet):
     ),
     destroy=extend_schema(
         summary="Supprimer un projet",
-        description="Supprime un projet (auteur uniquement).",
+        description="Retire immédiatement le projet et programme la suppression "
+        "de ses problèmes et commentaires en arrière-plan (auteur uniquement).",
         tags=["projects"],
+        responses={202: DeletionTaskSerializer},
     ),
 )
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(
+    InstrumentedViewMixin, FieldSelectionMixin, FastListMixin, viewsets.ModelViewSet
+):
     """Vue pour la gestion des projets"""
 
     queryset = Project.objects.all()
@@ -201,19 +415,60 @@ class ProjectViewSet(viewsets.ModelViewSet):
         project = serializer.save(author=self.request.user)
         Contributor.objects.create(user=self.request.user, project=project)
 
+    def destroy(self, request, *args, **kwargs):
+        """Retire le projet et programme sa suppression en arrière-plan"""
+        task = deletion.schedule_project_deletion(self.get_object(), request.user)
+        return Response(
+            DeletionTaskSerializer(task).data, status=status.HTTP_202_ACCEPTED
+        )
+
+    @extend_schema(
+        summary="Statistiques des projets",
+        description="Nombre de problèmes par statut, priorité, tag et assigné pour "
+        "chaque projet de l'utilisateur (liste paginée), calculé par une seule "
+        "requête agrégée et mis en cache par projet.",
+        tags=["projects"],
+        responses={200: ProjectStatsSerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """Statistiques de tous les projets de l'utilisateur"""
+        project_ids = self.paginate_queryset(
+            self.get_queryset().order_by("id").values_list("id", flat=True)
+        )
+        return self.get_paginated_response(stats.for_projects(list(project_ids)))
+
+    @extend_schema(
+        summary="Statistiques d'un projet",
+        description="Nombre de problèmes du projet par statut, priorité, tag et "
+        "assigné.",
+        tags=["projects"],
+        responses={200: ProjectStatsSerializer},
+    )
+    @action(detail=True, methods=["get"], url_path="stats", url_name="detail-stats")
+    def project_stats(self, request, pk=None):
+        """Statistiques d'un projet"""
+        project = self.get_object()
+        return Response(stats.for_projects([project.pk])[0])
+
     @extend_schema(
         summary="Lister les contributeurs",
         description="Récupère la liste des contributeurs d'un projet.",
         tags=["projects"],
+        parameters=INCLUDED_PARAMETERS,
         responses={200: ContributorSerializer(many=True)},
     )
     @action(detail=True, methods=["get"])
     def contributors(self, request, pk=None):
         """Liste des contributeurs d'un projet"""
         project = self.get_object()
-        contributors = project.contributors.all()
-        serializer = ContributorSerializer(contributors, many=True)
-        return Response(serializer.data)
+        contributors = self.narrow_queryset(
+            project.contributors.all(), ContributorSerializer
+        )
+        serializer = ContributorSerializer(
+            contributors, many=True, context=self.get_serializer_context()
+        )
+        return self.list_response(serializer.data, ContributorSerializer)
 
     @extend_schema(
         summary="Ajouter un contributeur",
@@ -252,6 +507,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         summary="Lister les problèmes",
         description="Récupère la liste paginée des problèmes des projets de l'utilisateur.",
         tags=["issues"],
+        parameters=INCLUDED_PARAMETERS,
     ),
     create=extend_schema(
         summary="Créer un nouveau problème",
@@ -276,6 +532,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         summary="Récupérer un problème",
         description="Récupère les détails d'un problème spécifique.",
         tags=["issues"],
+        parameters=SELECTION_PARAMETERS,
     ),
     update=extend_schema(
         summary="Modifier un problème",
@@ -293,7 +550,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
         tags=["issues"],
     ),
 )
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(
+    InstrumentedViewMixin, FieldSelectionMixin, FastListMixin, viewsets.ModelViewSet
+):
     """Vue pour la gestion des problèmes"""
 
     queryset = Issue.objects.all()
@@ -317,19 +576,137 @@ class IssueViewSet(viewsets.ModelViewSet):
         """Crée l'issue avec l'auteur"""
         serializer.save(author=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        """Détail d'un problème, cherché dans l'archive s'il a été archivé"""
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            archived = (
+                ArchivedIssue.objects.filter(
+                    pk=kwargs["pk"], project__contributors__user=request.user
+                )
+                .select_related("project__author", "author", "assigned_to")
+                .first()
+                if kwargs["pk"].isdigit()
+                else None
+            )
+            if archived is None:
+                raise
+            return Response(
+                ArchivedIssueSerializer(
+                    archived, context=self.get_serializer_context()
+                ).data
+            )
+
+    def perform_destroy(self, instance):
+        """Supprime l'issue en traçant la suppression pour la synchronisation"""
+        with transaction.atomic():
+            sync.record_issue_deletion(instance)
+            instance.delete()
+
+    @extend_schema(
+        summary="Boîte de réception",
+        description="Problèmes assignés à l'utilisateur dans ses projets, du plus "
+        "récemment modifié au plus ancien (par défaut ceux à faire ou en "
+        "cours). Pagination par curseur : suivre le lien `next`.",
+        tags=["issues"],
+        parameters=[
+            OpenApiParameter("cursor", str, description="Curseur opaque"),
+            OpenApiParameter(
+                "page_size",
+                int,
+                description="Lignes par page (maximum "
+                f"{inbox.get_setting('MAX_PAGE_SIZE')})",
+            ),
+            OpenApiParameter(
+                "status",
+                str,
+                enum=[value for value, _ in Issue.STATUS_CHOICES],
+                description="Restreindre à un statut",
+            ),
+            OpenApiParameter(
+                "priority",
+                str,
+                enum=[value for value, _ in Issue.PRIORITY_CHOICES],
+                description="Restreindre à une priorité",
+            ),
+            *INCLUDED_PARAMETERS,
+        ],
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "next": {"type": "string", "nullable": True},
+                    "results": {"type": "array", "items": {"type": "object"}},
+                },
+            },
+            400: None,
+        },
+    )
+    @action(detail=False, methods=["get"])
+    def inbox(self, request):
+        """Problèmes assignés à l'utilisateur, par curseur"""
+        params = request.query_params
+        statuses = inbox.OPEN_STATUSES
+        if "status" in params:
+            if params["status"] not in dict(Issue.STATUS_CHOICES):
+                raise ValidationError({"status": "Statut inconnu."})
+            statuses = (params["status"],)
+        priority = params.get("priority")
+        if priority is not None and priority not in dict(Issue.PRIORITY_CHOICES):
+            raise ValidationError({"priority": "Priorité inconnue."})
+        try:
+            limit = int(params.get("page_size", inbox.get_setting("PAGE_SIZE")))
+        except ValueError:
+            raise ValidationError({"page_size": "Entier attendu"})
+        limit = max(1, min(limit, inbox.get_setting("MAX_PAGE_SIZE")))
+
+        compiled = fast_serializers.compile_serializer(
+            InboxIssueSerializer, self.get_serializer_context()
+        )
+
+        def load(queryset):
+            if compiled is None:
+                queryset = self.narrow_queryset(queryset, InboxIssueSerializer)
+                return InboxIssueSerializer(
+                    queryset, many=True, context=self.get_serializer_context()
+                ).data
+            return compiled.serialize(compiled.values(queryset))
+
+        try:
+            rows, cursor = inbox.page(
+                request.user,
+                load,
+                cursor=params.get("cursor"),
+                limit=limit,
+                statuses=statuses,
+                priority=priority,
+            )
+        except inbox.InvalidCursor:
+            raise ValidationError({"cursor": "Curseur invalide"})
+        next_link = None
+        if cursor is not None:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), "cursor", cursor
+            )
+        return self.include_related(
+            Response({"next": next_link, "results": rows}), rows, InboxIssueSerializer
+        )
+
     @extend_schema(
         summary="Lister les commentaires",
         description="Récupère la liste des commentaires d'un problème.",
         tags=["issues"],
+        parameters=INCLUDED_PARAMETERS,
         responses={200: CommentSerializer(many=True)},
     )
     @action(detail=True, methods=["get"])
     def comments(self, request, pk=None):
         """Liste des commentaires d'une issue"""
         issue = self.get_object()
-        comments = issue.comments.all()
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        return self.serialize_list(
+            issue.comments.all(), serializer_class=CommentSerializer, paginate=False
+        )
 
 
 """ Comment ViewSet """
@@ -340,6 +717,7 @@ class IssueViewSet(viewsets.ModelViewSet):
         summary="Lister les commentaires",
         description="Récupère la liste paginée des commentaires des projets de l'utilisateur.",
         tags=["comments"],
+        parameters=INCLUDED_PARAMETERS,
     ),
     create=extend_schema(
         summary="Créer un nouveau commentaire",
@@ -356,6 +734,7 @@ class IssueViewSet(viewsets.ModelViewSet):
         summary="Récupérer un commentaire",
         description="Récupère les détails d'un commentaire spécifique (par UUID).",
         tags=["comments"],
+        parameters=SELECTION_PARAMETERS,
     ),
     update=extend_schema(
         summary="Modifier un commentaire",
@@ -373,7 +752,9 @@ class IssueViewSet(viewsets.ModelViewSet):
         tags=["comments"],
     ),
 )
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    InstrumentedViewMixin, FieldSelectionMixin, FastListMixin, viewsets.ModelViewSet
+):
     """Vue pour la gestion des commentaires"""
 
     queryset = Comment.objects.all()
@@ -398,15 +779,469 @@ class CommentViewSet(viewsets.ModelViewSet):
         """Crée le commentaire avec l'auteur"""
         serializer.save(author=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        """Détail d'un commentaire, cherché dans l'archive s'il a été archivé"""
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            archived = (
+                ArchivedComment.objects.filter(
+                    uuid=kwargs[self.lookup_url_kwarg or self.lookup_field],
+                    issue__project__contributors__user=request.user,
+                )
+                .select_related(
+                    "author",
+                    "issue__project__author",
+                    "issue__author",
+                    "issue__assigned_to",
+                )
+                .first()
+            )
+            if archived is None:
+                raise
+            return Response(
+                ArchivedCommentSerializer(
+                    archived, context=self.get_serializer_context()
+                ).data
+            )
+
+    def perform_destroy(self, instance):
+        """Supprime le commentaire en traçant la suppression pour la synchronisation"""
+        with transaction.atomic():
+            sync.record_comment_deletion(instance)
+            instance.delete()
+
     def get_object(self):
         """Récupère un commentaire par UUID au lieu de l'ID par défaut"""
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
         uuid_value = self.kwargs[lookup_url_kwarg]
 
         try:
-            return get_object_or_404(Comment, uuid=uuid_value)
+            return get_object_or_404(
+                self.narrow_queryset(Comment.objects.all()), uuid=uuid_value
+            )
         except ValueError:
             # Si l'UUID n'est pas valide, retourner une erreur 400
-            from rest_framework.exceptions import ValidationError
-
             raise ValidationError(f"'{uuid_value}' n'est pas un UUID valide")
+
+
+""" Archive ViewSet """
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="Lister les problèmes archivés",
+        description="Problèmes terminés archivés des projets de l'utilisateur, du "
+        "plus récemment modifié au plus ancien.",
+        tags=["archive"],
+        parameters=[
+            OpenApiParameter("project", int, description="Restreindre à un projet"),
+            *INCLUDED_PARAMETERS,
+        ],
+    ),
+    retrieve=extend_schema(
+        summary="Récupérer un problème archivé",
+        tags=["archive"],
+        parameters=SELECTION_PARAMETERS,
+    ),
+)
+class ArchivedIssueViewSet(
+    InstrumentedViewMixin,
+    FieldSelectionMixin,
+    FastListMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    """Vue en lecture des problèmes archivés"""
+
+    serializer_class = ArchivedIssueSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        """Problèmes archivés des projets de l'utilisateur"""
+        queryset = ArchivedIssue.objects.filter(
+            project__contributors__user=self.request.user
+        )
+        project = self.request.query_params.get("project")
+        if project is not None:
+            if not project.isdigit():
+                raise ValidationError({"project": "Identifiant de projet invalide."})
+            queryset = queryset.filter(project_id=project)
+        return queryset.order_by("-updated_time", "-id")
+
+    @extend_schema(
+        summary="Lister les commentaires archivés",
+        description="Commentaires d'un problème archivé.",
+        tags=["archive"],
+        parameters=INCLUDED_PARAMETERS,
+        responses={200: ArchivedCommentSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def comments(self, request, pk=None):
+        """Commentaires d'un problème archivé"""
+        issue = self.get_object()
+        return self.serialize_list(
+            issue.comments.order_by("id"),
+            serializer_class=ArchivedCommentSerializer,
+            paginate=False,
+        )
+
+    @extend_schema(
+        summary="Restaurer un problème archivé",
+        description="Replace le problème et ses commentaires dans les données "
+        "actives (auteur du problème ou du projet).",
+        tags=["archive"],
+        request=None,
+        responses={200: IssueSerializer, 403: None},
+    )
+    @action(detail=True, methods=["post"])
+    def restore(self, request, pk=None):
+        """Restaure un problème archivé"""
+        issue = self.get_object()
+        if request.user.pk not in (issue.author_id, issue.project.author_id):
+            return Response({"error": "Non autorisé"}, status=status.HTTP_403_FORBIDDEN)
+        archive.restore([issue.pk])
+        restored = get_object_or_404(Issue, pk=issue.pk)
+        return Response(
+            IssueSerializer(restored, context=self.get_serializer_context()).data
+        )
+
+
+""" Search ViewSet """
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="Rechercher dans les problèmes et commentaires",
+        description="Recherche plein texte (FTS5, classement bm25) dans les titres et "
+        "descriptions des problèmes et dans les commentaires des projets de "
+        "l'utilisateur.",
+        tags=["search"],
+        parameters=[
+            OpenApiParameter("q", str, description="Termes recherchés (préfixe: mot*)"),
+            OpenApiParameter("type", str, enum=list(search.SEARCH_KINDS)),
+            OpenApiParameter("project", int, description="Restreindre à un projet"),
+        ],
+        responses={200: SearchResultSerializer(many=True)},
+    ),
+)
+class SearchViewSet(InstrumentedViewMixin, viewsets.GenericViewSet):
+    """Vue pour la recherche plein texte"""
+
+    serializer_class = SearchResultSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def list(self, request):
+        """Recherche classée et paginée, limitée aux projets de l'utilisateur"""
+        if not search.is_available():
+            return Response(
+                {"error": "Recherche indisponible sur cette base de données"},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+
+        match = search.build_match_query(request.query_params.get("q"))
+        if not match:
+            raise ValidationError({"q": "Ce paramètre est requis"})
+
+        kind = request.query_params.get("type")
+        if kind and kind not in search.SEARCH_KINDS:
+            raise ValidationError(
+                {"type": f"Valeurs possibles : {search.SEARCH_KINDS}"}
+            )
+
+        project_id = request.query_params.get("project")
+        if project_id is not None:
+            try:
+                project_id = int(project_id)
+            except ValueError:
+                raise ValidationError({"project": "Identifiant de projet invalide"})
+
+        results = search.SearchResults(
+            match, request.user, kind=kind, project_id=project_id
+        )
+        page = self.paginate_queryset(results)
+        return self.get_paginated_response(page)
+
+
+""" Sync ViewSet """
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="Synchroniser les changements",
+        description="Retourne les projets, problèmes, commentaires et contributeurs "
+        "modifiés depuis le watermark fourni, ainsi que les suppressions. Sans "
+        "watermark, retourne l'état complet. Rappeler immédiatement avec le "
+        "nouveau watermark tant que `has_more` vaut `true`.",
+        tags=["sync"],
+        parameters=[
+            OpenApiParameter("since", str, description="Watermark opaque"),
+            OpenApiParameter("limit", int, description="Lignes maximum par flux"),
+        ],
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "watermark": {"type": "string"},
+                    "has_more": {"type": "boolean"},
+                    "projects": {"type": "array", "items": {"type": "object"}},
+                    "issues": {"type": "array", "items": {"type": "object"}},
+                    "comments": {"type": "array", "items": {"type": "object"}},
+                    "contributors": {"type": "array", "items": {"type": "object"}},
+                    "deleted": {"type": "array", "items": {"type": "object"}},
+                },
+            },
+            400: {"description": "Watermark invalide"},
+            410: {"description": "Watermark expiré, synchronisation complète requise"},
+        },
+    ),
+)
+class SyncViewSet(InstrumentedViewMixin, viewsets.GenericViewSet):
+    """Vue pour la synchronisation incrémentale des clients"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        """Changements visibles par l'utilisateur depuis le watermark"""
+        try:
+            limit = int(
+                request.query_params.get("limit", sync.get_setting("PAGE_SIZE"))
+            )
+        except ValueError:
+            raise ValidationError({"limit": "Entier attendu"})
+        limit = max(1, min(limit, sync.get_setting("MAX_PAGE_SIZE")))
+
+        try:
+            data = sync.changes_since(
+                request.user, request.query_params.get("since"), limit=limit
+            )
+        except sync.InvalidWatermark:
+            raise ValidationError({"since": "Watermark invalide"})
+        except sync.ExpiredWatermark:
+            return Response(
+                {"error": "Watermark expiré, synchronisation complète requise"},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(data)
+
+
+""" Deletion ViewSet """
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="Lister les suppressions programmées",
+        description="Suppressions de projets demandées par l'utilisateur et leur "
+        "progression.",
+        tags=["deletions"],
+    ),
+    retrieve=extend_schema(
+        summary="Suivre une suppression programmée",
+        description="Étape courante et nombre de lignes supprimées.",
+        tags=["deletions"],
+    ),
+)
+class DeletionTaskViewSet(InstrumentedViewMixin, viewsets.ReadOnlyModelViewSet):
+    """Vue pour le suivi des suppressions en arrière-plan"""
+
+    serializer_class = DeletionTaskSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        return DeletionTask.objects.filter(
+            requested_by_id=self.request.user.pk
+        ).order_by("-id")
+
+
+""" Batch View """
+
+
+class BatchView(InstrumentedViewMixin, APIView):
+    """Requêtes groupées vers les ViewSets du router"""
+
+    permission_classes = [permissions.IsAuthenticated]
+    # ViewSets accessibles, renseignés par supports_api.urls
+    viewsets = ()
+
+    @extend_schema(
+        summary="Requête groupée",
+        description="Exécute plusieurs sous-requêtes vers l'API (même "
+        "utilisateur, permissions et limitations de débit de chaque vue) et "
+        "retourne leurs réponses dans l'ordre. Les lectures consécutives "
+        "s'exécutent en parallèle ; chaque écriture attend les précédentes.",
+        tags=["batch"],
+        request=BatchRequestSerializer,
+        responses={200: BatchResponseSerializer},
+        examples=[
+            OpenApiExample(
+                "Écran d'un projet",
+                value={
+                    "requests": [
+                        {"id": "project", "method": "GET", "path": "/api/projects/1/"},
+                        {
+                            "id": "contributors",
+                            "method": "GET",
+                            "path": "/api/projects/1/contributors/",
+                        },
+                        {"id": "issues", "method": "GET", "path": "/api/issues/"},
+                    ]
+                },
+                request_only=True,
+            )
+        ],
+    )
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = batch.execute(
+            request, serializer.validated_data["requests"], self.viewsets
+        )
+        return Response({"responses": responses})
+
+
+""" Metrics View """
+
+
+@extend_schema(exclude=True)
+class MetricsView(InstrumentedViewMixin, APIView):
+    """Métriques Prometheus agrégées sur tous les workers"""
+
+    authentication_classes = [MetricsTokenAuthentication, MeteredJWTAuthentication]
+    permission_classes = [IsAdminOrInternal]
+    renderer_classes = [metrics.PrometheusRenderer]
+    throttle_classes = []
+
+    def get(self, request):
+        response = Response(metrics.render())
+        response["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+        return response
+
+
+""" Health """
+
+
+def health(request):
+    """Sonde de disponibilité : 503 tant que le préchauffage n'est pas terminé,
+    ``degraded`` s'il a échoué"""
+    if not warmup.is_ready():
+        status = "degraded" if warmup.has_failed() else "starting"
+        response = JsonResponse({"status": status}, status=503)
+        response["Retry-After"] = "1"
+        return response
+    return JsonResponse({"status": "ready"})
+
+
+""" OpenAPI Schema """
+
+
+@require_safe
+def openapi_schema(request):
+    """Schéma OpenAPI précalculé (YAML par défaut, JSON via ``?format=json``
+    ou un en-tête ``Accept`` JSON), compressé et validable par ETag"""
+    # Importé à la demande : drf-spectacular n'est pas chargé par les workers
+    # du profil API seule
+    from . import schema
+
+    format = request.GET.get("format")
+    if format not in schema.FORMATS:
+        format = "json" if "json" in request.headers.get("Accept", "") else "yaml"
+    artifact = schema.load(format)
+
+    compressed = "gzip" in request.headers.get("Accept-Encoding", "")
+    # ETag fort propre à chaque représentation
+    etag = artifact.etag[:-1] + '-gzip"' if compressed else artifact.etag
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponse(status=304)
+    elif compressed:
+        response = HttpResponse(artifact.gzipped, content_type=schema.FORMATS[format])
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(artifact.body, content_type=schema.FORMATS[format])
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    response["Vary"] = "Accept, Accept-Encoding"
+    return response
+
+
+""" Server-Sent Events """
+
+
+def _authenticate_stream(request):
+    """Authentifie la connexion SSE par JWT (en-tête Authorization)"""
+    try:
+        result = MeteredJWTAuthentication().authenticate(request)
+    except APIException:
+        return None
+    return result[0] if result else None
+
+
+def _stream_project_ids(user):
+    """Projets suivis par le flux, ou ``None`` si le compte a été supprimé ou
+    désactivé depuis l'ouverture de la connexion"""
+    if not User.objects.filter(pk=user.pk, is_active=True).exists():
+        return None
+    return set(
+        Contributor.objects.filter(user=user).values_list("project_id", flat=True)
+    )
+
+
+async def event_stream(request):
+    """Flux SSE des nouveaux commentaires et changements d'issues.
+
+    Seuls les événements des projets dont l'utilisateur est contributeur sont
+    transmis ; l'appartenance (et l'état du compte) est réévaluée à chaque
+    battement de cœur, que des événements arrivent ou non. Ce flux de longue
+    durée nécessite l'application ASGI (``softdesk.asgi``).
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Méthode non autorisée"}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "Le flux d'événements nécessite un serveur ASGI"}, status=501
+        )
+
+    user = await sync_to_async(_authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({"error": "Authentification requise"}, status=401)
+
+    project_ids = await sync_to_async(_stream_project_ids)(user)
+    heartbeat = events.get_setting("HEARTBEAT")
+    bus = events.get_bus()
+    subscription = bus.subscribe()
+
+    async def stream():
+        nonlocal project_ids
+        deadline = time.monotonic() + heartbeat
+        try:
+            yield f"retry: {heartbeat * 1000}\n\n"
+            while True:
+                try:
+                    event = await subscription.get(max(0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    event = None
+                if time.monotonic() >= deadline:
+                    # Avant toute transmission : un contributeur retiré ne
+                    # reçoit plus rien du projet
+                    project_ids = await sync_to_async(_stream_project_ids)(user)
+                    deadline = time.monotonic() + heartbeat
+                    if project_ids is None:
+                        return
+                    if event is None:
+                        yield ": heartbeat\n\n"
+                if event is None:
+                    continue
+                if event is events.OVERFLOW:
+                    # Le client doit se reconnecter et rafraîchir ses données
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                if event["project"] in project_ids:
+                    yield events.format_sse(event)
+        finally:
+            bus.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
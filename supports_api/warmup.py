@@ -0,0 +1,257 @@
+"""
+Préchauffage des workers.
+
+Sans préchauffage, les premières requêtes d'un worker construisent
+paresseusement le résolveur d'URL, les champs des sérialiseurs, les
+réglages ``SIMPLE_JWT`` et le backend de tokens, les catalogues de
+traduction et les connexions à la base. ``warmup()`` fait ce travail une
+fois, avant le fork (``gunicorn --preload``) ou au démarrage du worker
+(voir ``softdesk.wsgi``), puis marque le processus prêt : ``/api/health/``
+répond 503 jusque-là. Un préchauffage en échec (base injoignable...) laisse
+le processus servir, mais non prêt : la sonde répond 503 ``degraded``.
+
+Les connexions ouvertes avant un fork ne doivent pas être partagées entre
+processus : elles sont fermées juste avant chaque ``fork()``.
+"""
+
+import inspect
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+from django.utils import translation
+from django.utils.module_loading import import_string
+from rest_framework import serializers as drf_serializers
+
+logger = logging.getLogger("supports_api.warmup")
+
+DEFAULTS = {
+    # "sync" (bloque le démarrage), "background" (thread) ou "off"
+    "MODE": "sync",
+    "CACHES": True,
+    # Fonctions supplémentaires (chemins pointés) appelées sans argument
+    "HOOKS": [],
+}
+
+_ready = threading.Event()
+_failed = threading.Event()
+_fork_hook_registered = False
+
+
+def get_setting(name):
+    return getattr(settings, "SOFTDESK_WARMUP", {}).get(name, DEFAULTS[name])
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def has_failed():
+    return _failed.is_set()
+
+
+def mark_ready():
+    _failed.clear()
+    _ready.set()
+
+
+def mark_failed():
+    _failed.set()
+
+
+""" Étapes """
+
+
+def _iter_patterns(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            nested = namespace
+            if pattern.namespace:
+                nested = (
+                    f"{namespace}:{pattern.namespace}"
+                    if namespace
+                    else pattern.namespace
+                )
+            yield from _iter_patterns(pattern.url_patterns, nested)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield (
+                f"{namespace}:{pattern.name}" if namespace else pattern.name
+            ), pattern
+
+
+def _sample_kwargs(pattern):
+    """Arguments factices satisfaisant les groupes nommés d'une route"""
+    kwargs = {}
+    for name in pattern.pattern.regex.groupindex:
+        kwargs[name] = "json" if name == "format" else "1"
+    return kwargs
+
+
+def prime_urls():
+    """Construit le résolveur et résout chaque route nommée ; retourne les
+    vues rencontrées"""
+    resolver = get_resolver()
+    views = {}
+    for name, pattern in _iter_patterns(resolver.url_patterns):
+        try:
+            path = reverse(name, kwargs=_sample_kwargs(pattern))
+            match = resolve(path)
+        except Exception:  # route non inversible (regex libre) : ignorée
+            continue
+        views[id(match.func)] = match.func
+    return list(views.values())
+
+
+def _prime_serializer(serializer, seen):
+    if isinstance(serializer, drf_serializers.ListSerializer):
+        serializer = serializer.child
+    if (
+        not isinstance(serializer, drf_serializers.Serializer)
+        or type(serializer) in seen
+    ):
+        return
+    seen.add(type(serializer))
+    for field in serializer.fields.values():
+        # Messages d'erreur paresseux : force le chargement des traductions
+        for message in field.error_messages.values():
+            str(message)
+        _prime_serializer(field, seen)
+
+
+def _serializer_classes(views):
+    """Sérialiseurs des vues résolues, action par action, et ceux du module
+    ``supports_api.serializers`` utilisés directement dans les actions"""
+    from . import serializers
+
+    classes = {
+        cls
+        for _, cls in inspect.getmembers(serializers, inspect.isclass)
+        if issubclass(cls, drf_serializers.BaseSerializer)
+        and cls.__module__ == serializers.__name__
+    }
+    for func in views:
+        view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+        if view_class is None or not hasattr(view_class, "get_serializer_class"):
+            continue
+        actions = getattr(func, "actions", None) or {"post": None}
+        for action in actions.values():
+            view = view_class(**getattr(func, "initkwargs", {}))
+            view.action = action
+            view.request = view.format_kwarg = None
+            try:
+                classes.add(view.get_serializer_class())
+            except Exception:  # vue sans sérialiseur pour cette action
+                continue
+    return classes
+
+
+def prime_serializers(views):
+    """Construit les champs de chaque sérialiseur et sa version compilée"""
+    from . import fast_serializers, fieldsets
+
+    seen = set()
+    # Forme par défaut des réponses (objets liés représentés par leur id)
+    context = {"selection": fieldsets.Selection()}
+    with translation.override(settings.LANGUAGE_CODE):
+        for cls in _serializer_classes(views):
+            _prime_serializer(cls(context={}), seen)
+            fast_serializers.compile_serializer(cls, context)
+    return len(seen)
+
+
+def prime_jwt():
+    """Charge les réglages ``SIMPLE_JWT``, les classes de tokens et le backend
+    de signature (encodage et décodage d'un token factice)"""
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.state import token_backend
+
+    # Lecture des réglages : importe les classes de tokens configurées
+    api_settings.AUTH_TOKEN_CLASSES
+    token = token_backend.encode(
+        {api_settings.TOKEN_TYPE_CLAIM: "warmup", "exp": int(time.time()) + 60}
+    )
+    token_backend.decode(token)
+
+
+def prime_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    _register_fork_hook()
+
+
+def _close_connections_before_fork():
+    connections.close_all()
+
+
+def _register_fork_hook():
+    global _fork_hook_registered
+    if not _fork_hook_registered and hasattr(os, "register_at_fork"):
+        os.register_at_fork(before=_close_connections_before_fork)
+        _fork_hook_registered = True
+
+
+def prime_caches():
+    """Caches applicatifs : schéma OpenAPI (si la documentation est servie)
+    et fonctions de ``HOOKS``"""
+    from .openapi import ENABLED as openapi_enabled
+
+    if openapi_enabled:
+        from . import schema
+
+        for format in schema.FORMATS:
+            schema.load(format)
+    for hook in get_setting("HOOKS"):
+        import_string(hook)()
+
+
+""" Point d'entrée """
+
+
+def warmup(caches=None):
+    """Exécute toutes les étapes et marque le processus prêt ; retourne la
+    durée (ms) de chaque étape"""
+    caches = get_setting("CACHES") if caches is None else caches
+    timings = {}
+
+    def step(name, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    views = step("urls", prime_urls)
+    step("serializers", prime_serializers, views)
+    step("jwt", prime_jwt)
+    step("database", prime_connections)
+    if caches:
+        step("caches", prime_caches)
+    mark_ready()
+    logger.info("Préchauffage terminé : %s", timings)
+    return timings
+
+
+def boot():
+    """Crochet de démarrage (``softdesk.wsgi`` / ``softdesk.asgi``) selon
+    ``SOFTDESK_WARMUP["MODE"]``"""
+    mode = get_setting("MODE")
+    if mode == "off":
+        mark_ready()
+    elif mode == "background":
+        threading.Thread(target=_warmup_safely, name="warmup", daemon=True).start()
+    else:
+        _warmup_safely()
+
+
+def _warmup_safely():
+    try:
+        warmup()
+    except Exception:
+        # Le worker sert quand même, mais la sonde le signale non prêt
+        logger.exception("Échec du préchauffage")
+        mark_failed()
@@ -0,0 +1,221 @@
+"""
+Charge de travail par utilisateur, maintenue incrémentalement.
+
+``WorkloadSummary`` compte les problèmes de chaque utilisateur par rôle
+(assigné, auteur), projet, statut et priorité. Les signaux de ``Issue``
+appliquent le delta de chaque écriture dans la même transaction ; les
+écritures en masse (suppressions et désassignations par lots) appellent
+``remove_issues()`` avant d'écrire. La lecture de la charge d'un
+utilisateur ne touche que ses quelques lignes de synthèse.
+
+``rebuild_workload`` recalcule la table depuis ``Issue`` (ou la vérifie).
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from . import jobs
+from .models import DeletionTask, Issue, WorkloadSummary
+
+OPEN_STATUSES = ("To Do", "In Progress")
+
+# Rôle -> colonne de ``Issue`` désignant l'utilisateur
+ROLES = {"assigned": "assigned_to_id", "authored": "author_id"}
+
+STATE_FIELDS = ("author_id", "assigned_to_id", "project_id", "status", "priority")
+
+
+def issue_state(issue):
+    return {field: getattr(issue, field) for field in STATE_FIELDS}
+
+
+def _keys(state, roles=ROLES):
+    for role in roles:
+        user_id = state[ROLES[role]]
+        if user_id is not None:
+            yield (
+                role,
+                user_id,
+                state["project_id"],
+                state["status"],
+                state["priority"],
+            )
+
+
+def apply(deltas):
+    """Ajoute ``deltas`` {(rôle, user, projet, statut, priorité): n} à la table"""
+    for (role, user_id, project_id, status, priority), delta in deltas.items():
+        if not delta:
+            continue
+        rows = WorkloadSummary.objects.filter(
+            role=role,
+            user_id=user_id,
+            project_id=project_id,
+            status=status,
+            priority=priority,
+        )
+        if rows.update(count=F("count") + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                WorkloadSummary.objects.create(
+                    role=role,
+                    user_id=user_id,
+                    project_id=project_id,
+                    status=status,
+                    priority=priority,
+                    count=delta,
+                )
+        except IntegrityError:  # ligne créée entre-temps par une autre écriture
+            rows.update(count=F("count") + delta)
+
+
+def issue_changed(previous, current):
+    """Applique le passage d'un problème de l'état ``previous`` à ``current``
+    (``None`` pour une création ou une suppression)"""
+    deltas = Counter()
+    if previous is not None:
+        deltas.subtract(_keys(previous))
+    if current is not None:
+        deltas.update(_keys(current))
+    apply(deltas)
+
+
+def _count_issues(issues, roles, sign):
+    deltas = Counter()
+    for row in issues.order_by().values(*STATE_FIELDS).annotate(total=Count("id")):
+        for key in _keys(row, roles):
+            deltas[key] += sign * row["total"]
+    apply(deltas)
+
+
+def remove_issues(issues, roles=ROLES):
+    """Retire ``issues`` de la synthèse avant une écriture en masse
+    (suppression, ou désassignation avec ``roles=("assigned",)``)"""
+    _count_issues(issues, roles, -1)
+
+
+def add_issues(issues, roles=ROLES):
+    """Ajoute ``issues`` à la synthèse après une insertion en masse"""
+    _count_issues(issues, roles, 1)
+
+
+def forget_project(*project_ids):
+    WorkloadSummary.objects.filter(project_id__in=project_ids).delete()
+
+
+def forget_user(user_id):
+    WorkloadSummary.objects.filter(user_id=user_id).delete()
+
+
+""" Lecture """
+
+
+def _empty_role():
+    return {
+        "total": 0,
+        "open": 0,
+        "by_status": {value: 0 for value, _ in Issue.STATUS_CHOICES},
+        "open_by_priority": {value: 0 for value, _ in Issue.PRIORITY_CHOICES},
+        "projects": {},
+    }
+
+
+def summary(user_id, viewer):
+    """Charge de ``user_id`` dans les projets dont ``viewer`` est contributeur"""
+    result = {"user": user_id, **{role: _empty_role() for role in ROLES}}
+    rows = WorkloadSummary.objects.filter(
+        user_id=user_id, count__gt=0, project__contributors__user=viewer
+    ).values_list("role", "project_id", "status", "priority", "count")
+    for role, project_id, status, priority, count in rows:
+        section = result[role]
+        is_open = status in OPEN_STATUSES
+        project = section["projects"].setdefault(
+            project_id, {"project": project_id, "total": 0, "open": 0}
+        )
+        for totals in (section, project):
+            totals["total"] += count
+            totals["open"] += count if is_open else 0
+        section["by_status"][status] += count
+        if is_open:
+            section["open_by_priority"][priority] += count
+    for role in ROLES:
+        result[role]["projects"] = sorted(
+            result[role]["projects"].values(), key=lambda project: project["project"]
+        )
+    return result
+
+
+""" Reconstruction """
+
+
+def compute():
+    """Synthèse recalculée depuis ``Issue`` (une agrégation par rôle) ; les
+    projets et comptes en cours de suppression, retirés de la synthèse dès la
+    demande, sont ignorés"""
+    deleted_users = (
+        DeletionTask.objects.filter(kind="user")
+        .exclude(status="done")
+        .values("object_id")
+    )
+    counts = {}
+    for role, column in ROLES.items():
+        rows = (
+            Issue.objects.filter(
+                **{f"{column}__isnull": False}, project__pending_deletion=False
+            )
+            .exclude(**{f"{column}__in": deleted_users})
+            .order_by()
+            .values_list(column, "project_id", "status", "priority")
+            .annotate(total=Count("id"))
+        )
+        for user_id, project_id, status, priority, total in rows:
+            counts[(role, user_id, project_id, status, priority)] = total
+    return counts
+
+
+def stored():
+    return {
+        (role, user_id, project_id, status, priority): count
+        for role, user_id, project_id, status, priority, count in (
+            WorkloadSummary.objects.filter(count__gt=0).values_list(
+                "role", "user_id", "project_id", "status", "priority", "count"
+            )
+        )
+    }
+
+
+def check():
+    """Différences {clé: (stocké, attendu)} entre la table et ``Issue``"""
+    expected, actual = compute(), stored()
+    return {
+        key: (actual.get(key, 0), expected.get(key, 0))
+        for key in expected.keys() | actual.keys()
+        if actual.get(key, 0) != expected.get(key, 0)
+    }
+
+
+def rebuild():
+    """Recalcule entièrement la table ; retourne le nombre de lignes"""
+    with transaction.atomic():
+        counts = compute()
+        WorkloadSummary.objects.all().delete()
+        WorkloadSummary.objects.bulk_create(
+            WorkloadSummary(
+                role=role,
+                user_id=user_id,
+                project_id=project_id,
+                status=status,
+                priority=priority,
+                count=count,
+            )
+            for (role, user_id, project_id, status, priority), count in counts.items()
+        )
+    return len(counts)
+
+
+@jobs.handler("workload.rebuild", max_attempts=3)
+def rebuild_job(job):
+    rebuild()